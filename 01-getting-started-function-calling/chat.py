@@ -16,16 +16,31 @@ Sections:
 # 1) Imports & Setup
 # =============================================================================
 
+import os
 import chainlit as cl
 from uuid import uuid4
 from chainlit.logger import logger
 
-from realtime2 import RealtimeClient
+from realtime2 import (
+    OutputAudioStreamer,
+    RealtimeClient,
+    RealtimeSessionPool,
+    SessionRecorder,
+)
 from dotenv import load_dotenv
 
 # Load environment variables from a .env file if present
 load_dotenv(override=True)
 
+# Optional pool of pre-connected sessions shared by every chat in this process
+POOL_SIZE = int(os.getenv("REALTIME_POOL_SIZE", "0"))
+session_pool = RealtimeSessionPool(POOL_SIZE) if POOL_SIZE > 0 else None
+
+# Optional folder where every chat session is recorded, for SessionReplayer
+RECORD_DIR = os.getenv("REALTIME_RECORD_DIR")
+if RECORD_DIR:
+    os.makedirs(RECORD_DIR, exist_ok=True)
+
 
 # =============================================================================
 # 2) Assistant Configuration
@@ -110,12 +125,37 @@ main_assistant = {
 
 async def setup_openai_realtime():
     """Initialize and configure the OpenAI Realtime Client with event handlers."""
+    # Record the session when REALTIME_RECORD_DIR is set
+    recorder = None
+    if RECORD_DIR:
+        recorder = SessionRecorder(
+            os.path.join(RECORD_DIR, f"{cl.user_session.get('id')}.jsonl")
+        )
+
     # Create a RealtimeClient with an empty system prompt
-    openai_realtime = RealtimeClient(system_prompt="")
+    openai_realtime = RealtimeClient(
+        system_prompt="", session_pool=session_pool, recorder=recorder
+    )
 
     # Set a unique track ID for each user session, used to identify audio streams
     cl.user_session.set("track_id", str(uuid4()))
 
+    async def send_audio_chunk(data):
+        """Send a paced chunk of assistant audio to the current playback track."""
+        await cl.context.emitter.send_audio_chunk(
+            cl.OutputAudioChunk(
+                mimeType="pcm16",
+                data=data,
+                track=cl.user_session.get("track_id"),
+            )
+        )
+
+    # Pace assistant audio to the browser through a small jitter buffer
+    audio_streamer = OutputAudioStreamer(
+        send_audio_chunk, openai_realtime.conversation.default_frequency
+    )
+    cl.user_session.set("audio_streamer", audio_streamer)
+
     # ----------------------------- Event Handlers -----------------------------
 
     async def handle_conversation_updated(event):
@@ -139,15 +179,11 @@ async def setup_openai_realtime():
                     "Audio transcription event received, but no transcript found."
                 )
 
-        # If there's delta data and "audio" in delta, send audio chunks
+    def handle_audio_delta(event):
+        """Queue assistant audio in arrival order; the streamer paces playback."""
+        delta = event.get("delta")
         if delta and "audio" in delta:
-            await cl.context.emitter.send_audio_chunk(
-                cl.OutputAudioChunk(
-                    mimeType="pcm16",
-                    data=delta["audio"],
-                    track=cl.user_session.get("track_id"),
-                )
-            )
+            audio_streamer.push(delta["audio"])
 
     async def handle_item_completed(item):
         """Process items that the conversation has completed, such as final message content."""
@@ -156,6 +192,10 @@ async def setup_openai_realtime():
             if content["type"] == "audio":
                 await cl.Message(content=content["transcript"]).send()
 
+    def handle_audio_interrupt(event):
+        """Drop queued assistant audio as soon as the user interrupts."""
+        audio_streamer.interrupt()
+
     async def handle_conversation_interrupt(event):
         """Handle conversation interruptions."""
         # Generate a new track ID to start a new audio stream
@@ -168,7 +208,9 @@ async def setup_openai_realtime():
 
     # ----------------------- Register Event Handlers --------------------------
     openai_realtime.on("conversation.updated", handle_conversation_updated)
+    openai_realtime.on("conversation.updated", handle_audio_delta)
     openai_realtime.on("conversation.item.completed", handle_item_completed)
+    openai_realtime.on("conversation.interrupted", handle_audio_interrupt)
     openai_realtime.on("conversation.interrupted", handle_conversation_interrupt)
     openai_realtime.on("error", handle_error)
 
@@ -176,6 +218,10 @@ async def setup_openai_realtime():
     # Register the main assistant
     openai_realtime.assistant.register_agent(main_assistant)
 
+    # Pre-connect pooled sessions on the root agent config before audio starts
+    if session_pool:
+        session_pool.start(openai_realtime.get_root_session())
+
     # Store the openai_realtime client for use in other callbacks
     cl.user_session.set("openai_realtime", openai_realtime)
 
@@ -238,6 +284,10 @@ async def on_audio_chunk(chunk: cl.InputAudioChunk):
 @cl.on_stop
 async def on_end():
     """Clean up resources and disconnect the RealtimeClient when the application stops."""
+    audio_streamer: OutputAudioStreamer = cl.user_session.get("audio_streamer")
+    if audio_streamer:
+        audio_streamer.close()
     openai_realtime: RealtimeClient = cl.user_session.get("openai_realtime")
-    if openai_realtime and openai_realtime.is_connected():
+    if openai_realtime:
+        # Also stops a reconnect in progress, while the client is not connected
         await openai_realtime.disconnect()
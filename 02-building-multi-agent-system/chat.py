@@ -1,9 +1,15 @@
+import os
 import chainlit as cl
 from uuid import uuid4
 from chainlit.logger import logger
 from dotenv import load_dotenv
 
-from realtime2 import RealtimeClient
+from realtime2 import (
+    OutputAudioStreamer,
+    RealtimeClient,
+    RealtimeSessionPool,
+    SessionRecorder,
+)
 
 from agents.activation import activation_assistant
 from agents.sales import sales_assistant
@@ -12,6 +18,15 @@ from agents.technical import technical_assistant
 
 load_dotenv(override=True)
 
+# Optional pool of pre-connected sessions shared by every chat in this process.
+POOL_SIZE = int(os.getenv("REALTIME_POOL_SIZE", "0"))
+session_pool = RealtimeSessionPool(POOL_SIZE) if POOL_SIZE > 0 else None
+
+# Optional folder where every chat session is recorded, for SessionReplayer.
+RECORD_DIR = os.getenv("REALTIME_RECORD_DIR")
+if RECORD_DIR:
+    os.makedirs(RECORD_DIR, exist_ok=True)
+
 
 async def setup_openai_realtime():
     """
@@ -25,12 +40,42 @@ async def setup_openai_realtime():
 
     It also registers all available agents (activation, sales, technical, root) with the client.
     """
+    # Record the session when REALTIME_RECORD_DIR is set.
+    recorder = None
+    if RECORD_DIR:
+        recorder = SessionRecorder(
+            os.path.join(RECORD_DIR, f"{cl.user_session.get('id')}.jsonl")
+        )
+
     # Create a RealtimeClient with an empty system prompt.
-    openai_realtime = RealtimeClient(system_prompt="")
+    openai_realtime = RealtimeClient(
+        system_prompt="", session_pool=session_pool, recorder=recorder
+    )
 
     # Generate and store a unique track ID for audio streaming.
     cl.user_session.set("track_id", str(uuid4()))
 
+    async def send_audio_chunk(data):
+        """
+        Send a paced chunk of assistant audio to the current playback track.
+
+        Args:
+            data (bytes): PCM 16-bit audio bytes
+        """
+        await cl.context.emitter.send_audio_chunk(
+            cl.OutputAudioChunk(
+                mimeType="pcm16",
+                data=data,
+                track=cl.user_session.get("track_id"),
+            )
+        )
+
+    # Pace assistant audio to the browser through a small jitter buffer.
+    audio_streamer = OutputAudioStreamer(
+        send_audio_chunk, openai_realtime.conversation.default_frequency
+    )
+    cl.user_session.set("audio_streamer", audio_streamer)
+
     async def handle_conversation_updated(event):
         """
         Handle real-time updates to the conversation.
@@ -42,7 +87,6 @@ async def setup_openai_realtime():
 
         This handler is primarily used for:
         - Processing audio transcriptions and sending them to the client
-        - Streaming audio back to the client
         - Managing function arguments as they arrive
         """
         item = event.get("item")
@@ -59,17 +103,8 @@ async def setup_openai_realtime():
             msg.type = "user_message"
             await msg.send()
 
-        # Handle streaming audio, transcripts, and function arguments.
+        # Handle streaming transcripts and function arguments.
         if delta:
-            if "audio" in delta:
-                audio_chunk = delta["audio"]  # PCM 16-bit audio bytes
-                await cl.context.emitter.send_audio_chunk(
-                    cl.OutputAudioChunk(
-                        mimeType="pcm16",
-                        data=audio_chunk,
-                        track=cl.user_session.get("track_id"),
-                    )
-                )
             if "transcript" in delta:
                 # Potential future handling of incremental transcripts.
                 pass
@@ -77,6 +112,20 @@ async def setup_openai_realtime():
                 # Potential future handling of function arguments.
                 pass
 
+    def handle_audio_delta(event):
+        """
+        Queue streamed assistant audio for playback.
+
+        Args:
+            event (dict): Event data containing 'item' and 'delta' information
+
+        This handler is synchronous so chunks are queued in the order they
+        arrive; the audio streamer paces them out to the client.
+        """
+        delta = event.get("delta")
+        if delta and "audio" in delta:
+            audio_streamer.push(delta["audio"])
+
     async def handle_item_completed(item):
         """
         Process completed conversation items and update the chat context.
@@ -92,6 +141,15 @@ async def setup_openai_realtime():
             if content["type"] == "audio":
                 await cl.Message(content=content["transcript"]).send()
 
+    def handle_audio_interrupt(event):
+        """
+        Drop queued assistant audio as soon as the user interrupts.
+
+        Args:
+            event (dict): The interruption event (currently unused)
+        """
+        audio_streamer.interrupt()
+
     async def handle_conversation_interrupt(event):
         """
         Handle conversation interruptions by resetting audio playback.
@@ -115,7 +173,9 @@ async def setup_openai_realtime():
 
     # Register event handlers with the RealtimeClient.
     openai_realtime.on("conversation.updated", handle_conversation_updated)
+    openai_realtime.on("conversation.updated", handle_audio_delta)
     openai_realtime.on("conversation.item.completed", handle_item_completed)
+    openai_realtime.on("conversation.interrupted", handle_audio_interrupt)
     openai_realtime.on("conversation.interrupted", handle_conversation_interrupt)
     openai_realtime.on("error", handle_error)
 
@@ -129,6 +189,10 @@ async def setup_openai_realtime():
 
     # Register the root agent last to ensure every agent knows each other.
     openai_realtime.assistant.register_root_agent(root_assistant)
+
+    # Pre-connect pooled sessions on the root agent config before audio starts.
+    if session_pool:
+        session_pool.start(openai_realtime.get_root_session())
     # coros = [openai_realtime.add_tool(tool_def, tool_handler) for tool_def, tool_handler in root_tools]
     # await asyncio.gather(*coros)
 
@@ -219,7 +283,12 @@ async def on_end():
     This handler ensures proper cleanup of the realtime client connection
     when the audio streaming session is terminated.
     """
+    audio_streamer: OutputAudioStreamer = cl.user_session.get("audio_streamer")
+    if audio_streamer:
+        audio_streamer.close()
+
     openai_realtime: RealtimeClient = cl.user_session.get("openai_realtime")
 
-    if openai_realtime and openai_realtime.is_connected():
+    # Also stops a reconnect in progress, while the client is not connected.
+    if openai_realtime:
         await openai_realtime.disconnect()
@@ -3,31 +3,88 @@
 import os
 import re
 import json
+import logging
 import base64
+import binascii
+import bisect
+import contextvars
+import math
+import random
+import time
 import asyncio
 import inspect
+import itertools
 import traceback
 from datetime import datetime, timezone
-from collections import defaultdict
+from collections import defaultdict, deque
+from collections.abc import Mapping, Sequence
+from types import MappingProxyType
 
 import numpy as np
 import websockets
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+from azure.core.credentials import AccessToken
+from azure.identity import DefaultAzureCredential
 from chainlit.logger import logger
 from chainlit.config import config
 
+try:
+    import orjson
+except ImportError:  # Optional, faster JSON backend
+    orjson = None
+
 from assistant_service import AssistantService
 
 
-def float_to_16bit_pcm(float32_array):
+# The Realtime API streams pcm16 audio at 24 kHz in both directions
+API_SAMPLE_RATE = 24000
+
+# Sample rate of each audio format the Realtime API accepts
+AUDIO_FORMAT_SAMPLE_RATES = {
+    "pcm16": API_SAMPLE_RATE,
+    "g711_ulaw": 8000,
+    "g711_alaw": 8000,
+}
+
+
+def float_to_16bit_pcm(float32_array, out=None):
     """
     Converts a numpy array of float32 amplitude data to a numpy array in int16 format.
+    Raw buffers (bytes, memoryview) of float32 samples are read in place.
 
-    :param float32_array: Numpy array of dtype float32.
+    :param float32_array: Numpy array of dtype float32, or a buffer of float32 samples.
+    :param out: Optional preallocated numpy array of dtype int16 to write into.
     :return: Numpy array of dtype int16.
     """
-    int16_array = np.clip(float32_array, -1, 1) * 32767
-    return int16_array.astype(np.int16)
+    if not isinstance(float32_array, np.ndarray):
+        float32_array = np.frombuffer(float32_array, dtype=np.float32)
+    if out is None:
+        out = np.empty(float32_array.shape, dtype=np.int16)
+
+    # Scale straight into the int16 output instead of materializing a scaled float copy
+    np.multiply(np.clip(float32_array, -1, 1), 32767, out=out, casting="unsafe")
+    return out
+
+
+def pcm16_memoryview(array_buffer):
+    """
+    Returns a flat byte memoryview over 16-bit PCM data without copying it.
+    float32 numpy arrays are converted to PCM first; bytes, bytearray,
+    memoryview and int16 arrays are viewed in place.
+
+    :param array_buffer: Any object supporting the buffer protocol.
+    :return: A memoryview of format "B" over the PCM bytes.
+    """
+    if (
+        isinstance(array_buffer, memoryview)
+        and array_buffer.format == "B"
+        and array_buffer.c_contiguous
+    ):
+        return array_buffer
+    if isinstance(array_buffer, np.ndarray):
+        if array_buffer.dtype == np.float32:
+            array_buffer = float_to_16bit_pcm(array_buffer)
+        array_buffer = np.ascontiguousarray(array_buffer)
+    return memoryview(array_buffer).cast("B")
 
 
 def base64_to_array_buffer(base64_string):
@@ -41,22 +98,112 @@ def base64_to_array_buffer(base64_string):
     return np.frombuffer(binary_data, dtype=np.uint8)
 
 
+def base64_to_pcm16_view(base64_string):
+    """
+    Decodes a base64 audio payload to a read-only memoryview, without extra copies.
+
+    binascii decodes straight into a new bytes object and the view wraps it, so the
+    payload is copied exactly once. Ownership: the bytes are immutable and are never
+    reused or recycled, so any consumer may keep the view (or slices of it) for as
+    long as it likes and share it without copying. Consumers that need a mutable
+    buffer must copy it themselves.
+
+    :param base64_string: Base64-encoded string.
+    :return: Read-only memoryview of the decoded bytes.
+    """
+    return memoryview(binascii.a2b_base64(base64_string))
+
+
 def array_buffer_to_base64(array_buffer):
     """
-    Converts a numpy array buffer to a base64-encoded string.
-    If the array is float32, it is first converted to 16-bit PCM.
+    Converts an audio buffer to a base64-encoded string.
+    If the buffer is a float32 array, it is first converted to 16-bit PCM.
+    Everything else is encoded straight from its buffer, without a tobytes() copy.
 
-    :param array_buffer: A numpy array (float32, int16, or any type).
+    :param array_buffer: A numpy array (float32, int16, or any type), bytes, bytearray or memoryview.
     :return: Base64-encoded string.
     """
-    if array_buffer.dtype == np.float32:
-        # Convert float32 data to int16 PCM before encoding
-        array_buffer = float_to_16bit_pcm(array_buffer)
-    else:
-        # Otherwise just grab its bytes
-        array_buffer = array_buffer.tobytes()
+    return base64.b64encode(pcm16_memoryview(array_buffer)).decode("ascii")
 
-    return base64.b64encode(array_buffer).decode("utf-8")
+
+def _build_g711_tables():
+    """
+    Builds the G.711 lookup tables once at import time: 65536-entry encode tables
+    indexed by the int16 sample reinterpreted as uint16, and 256-entry decode tables.
+    """
+    samples = np.arange(-32768, 32768, dtype=np.int32)
+
+    # mu-law works on 14-bit magnitudes, biased so every segment has a leading one
+    value = samples >> 2
+    mask = np.where(value < 0, 0x7F, 0xFF)
+    value = np.minimum(np.abs(value), 8159) + 0x21
+    segment = np.digitize(
+        value, [0x40, 0x80, 0x100, 0x200, 0x400, 0x800, 0x1000, 0x2000]
+    )
+    ulaw = (segment << 4) | ((value >> (segment + 1)) & 0x0F)
+    ulaw = np.where(segment >= 8, 0x7F, ulaw) ^ mask
+
+    # A-law works on 13-bit magnitudes and flips every other bit on the wire
+    value = samples >> 3
+    mask = np.where(value >= 0, 0xD5, 0x55)
+    value = np.where(value >= 0, value, -value - 1)
+    segment = np.digitize(value, [0x20, 0x40, 0x80, 0x100, 0x200, 0x400, 0x800, 0x1000])
+    shift = np.where(segment < 2, 1, segment)
+    alaw = (segment << 4) | ((value >> shift) & 0x0F)
+    alaw = np.where(segment >= 8, 0x7F, alaw) ^ mask
+
+    # Reorder from -32768..32767 to the uint16 bit pattern of each sample
+    order = np.arange(-32768, 32768, dtype=np.int32).astype(np.int16).view(np.uint16)
+    encode = {}
+    for name, table in (("g711_ulaw", ulaw), ("g711_alaw", alaw)):
+        encode[name] = np.empty(65536, dtype=np.uint8)
+        encode[name][order] = table
+
+    # Decoding expands every code back to the centre of its quantization step
+    codes = np.arange(256, dtype=np.int32)
+    inverted = ~codes & 0xFF
+    exponent = (inverted >> 4) & 0x07
+    value = ((((inverted & 0x0F) << 3) + 0x84) << exponent) - 0x84
+    ulaw_decode = np.where(inverted & 0x80, -value, value)
+
+    toggled = codes ^ 0x55
+    segment = (toggled & 0x70) >> 4
+    value = ((toggled & 0x0F) << 4) + np.where(segment == 0, 8, 0x108)
+    value = np.where(segment > 1, value << np.maximum(segment - 1, 0), value)
+    alaw_decode = np.where(toggled & 0x80, value, -value)
+
+    decode = {
+        "g711_ulaw": ulaw_decode.astype(np.int16),
+        "g711_alaw": alaw_decode.astype(np.int16),
+    }
+    return encode, decode
+
+
+_G711_ENCODE, _G711_DECODE = _build_g711_tables()
+
+
+def encode_g711(pcm, audio_format):
+    """
+    Encodes 16-bit PCM to G.711 with a single table lookup per sample.
+
+    :param pcm: bytes-like object holding 16-bit PCM.
+    :param audio_format: "g711_ulaw" or "g711_alaw".
+    :return: bytes with one G.711 code per sample.
+    """
+    samples = np.frombuffer(pcm, dtype=np.uint16)
+    return _G711_ENCODE[audio_format][samples].tobytes()
+
+
+def decode_g711(data, audio_format):
+    """
+    Decodes G.711 to 16-bit PCM with a single table lookup per sample.
+
+    :param data: bytes-like object with one G.711 code per sample.
+    :param audio_format: "g711_ulaw" or "g711_alaw".
+    :return: bytes holding 16-bit PCM.
+    """
+    codes = np.frombuffer(data, dtype=np.uint8)
+    return _G711_DECODE[audio_format][codes].tobytes()
 
 
 def merge_int16_arrays(left, right):
@@ -79,61 +226,1343 @@ def merge_int16_arrays(left, right):
         raise ValueError("Both items must be numpy arrays of int16")
 
 
+class PCMRingBuffer:
+    """
+    Fixed-capacity history of 16-bit mono PCM audio, addressed by millisecond
+    timestamps measured from the start of the stream.
+
+    Only the last retention_ms of audio is kept, so memory stays flat however long
+    the session runs. Segments are returned as memoryviews over the ring storage
+    and stay valid until another retention_ms of audio has been appended; copy them
+    with bytes() to keep them longer. A segment that straddles the wrap point is
+    the only case that gets copied.
+    """
+
+    def __init__(self, sample_rate, retention_ms=30000):
+        self.sample_rate = sample_rate
+        self.retention_ms = retention_ms
+        self.capacity = (sample_rate * retention_ms // 1000) * 2
+        self._buffer = bytearray(self.capacity)
+        self._view = memoryview(self._buffer)
+        self.clear()
+
+    def __len__(self):
+        """
+        Number of bytes currently retained.
+        """
+        return min(self.total_bytes, self.capacity)
+
+    @property
+    def end_ms(self):
+        """
+        Timestamp of the end of the stream, in milliseconds.
+        """
+        return (self.total_bytes // 2) * 1000 // self.sample_rate
+
+    @property
+    def uncommitted_bytes(self):
+        """
+        Number of bytes appended since the last commit().
+        """
+        return self.total_bytes - self.committed_bytes
+
+    def clear(self):
+        """
+        Forget all audio and restart the timeline at 0 ms.
+        """
+        self.total_bytes = 0
+        self.committed_bytes = 0
+
+    def append(self, data):
+        """
+        Append PCM bytes, overwriting the oldest audio once the ring is full.
+
+        :param data: Any bytes-like object holding 16-bit PCM.
+        """
+        data = memoryview(data).cast("B")
+        size = len(data)
+        if size >= self.capacity:
+            # Only the tail can survive anyway
+            self.total_bytes += size - self.capacity
+            data = data[size - self.capacity :]
+            size = self.capacity
+
+        position = self.total_bytes % self.capacity
+        first = min(size, self.capacity - position)
+        self._view[position : position + first] = data[:first]
+        if first < size:
+            self._view[: size - first] = data[first:]
+        self.total_bytes += size
+
+    def view(self, start_ms, end_ms=None):
+        """
+        Return the audio between two timestamps without copying it.
+        Parts that have already left the retention window are clipped off.
+
+        :param start_ms: Start of the segment in milliseconds.
+        :param end_ms: End of the segment in milliseconds, defaults to the end of the stream.
+        :return: A memoryview of the PCM bytes.
+        """
+        start = max(self._offset(start_ms), self.total_bytes - len(self))
+        end = (
+            self.total_bytes
+            if end_ms is None
+            else min(self._offset(end_ms), self.total_bytes)
+        )
+        return self._slice(start, end)
+
+    def commit(self):
+        """
+        Return the audio appended since the previous commit and mark it as committed.
+
+        :return: A memoryview of the PCM bytes.
+        """
+        start = max(self.committed_bytes, self.total_bytes - len(self))
+        self.committed_bytes = self.total_bytes
+        return self._slice(start, self.total_bytes)
+
+    def _offset(self, ms):
+        return (ms * self.sample_rate // 1000) * 2
+
+    def _slice(self, start, end):
+        if start >= end:
+            return memoryview(b"")
+        first = start % self.capacity
+        last = first + (end - start)
+        if last <= self.capacity:
+            return self._view[first:last]
+        return memoryview(
+            bytes(self._view[first:]) + bytes(self._view[: last - self.capacity])
+        )
+
+
+class PCMAudioStore:
+    """
+    Append-only store for 16-bit PCM audio that arrives in many small deltas.
+
+    Deltas are kept as a list of chunks, so appending is O(1) no matter how long
+    the answer gets, unlike concatenating arrays on every delta. The chunks are
+    only joined when the audio is read, and the joined bytes replace them so
+    repeated reads are not paid for twice. Every item keeps its audio in one,
+    user speech included; bytes(store) and len(store) work as on bytes.
+    """
+
+    def __init__(self, chunks=None):
+        self._chunks = []
+        self._size = 0
+        for chunk in chunks or []:
+            self.append(chunk)
+
+    def __len__(self):
+        """
+        Number of bytes stored.
+        """
+        return self._size
+
+    def __bytes__(self):
+        """
+        The stored audio, as returned by tobytes().
+        """
+        return self.tobytes()
+
+    @property
+    def num_samples(self):
+        """
+        Number of 16-bit samples stored.
+        """
+        return self._size // 2
+
+    def append(self, chunk):
+        """
+        Append a chunk of PCM bytes.
+
+        :param chunk: bytes holding 16-bit PCM; kept by reference, not copied.
+        """
+        if len(chunk) > 0:
+            self._chunks.append(chunk)
+            self._size += len(chunk)
+
+    def truncate(self, num_samples):
+        """
+        Drop all audio after the given number of samples.
+
+        :param num_samples: Number of samples to keep.
+        """
+        keep = max(num_samples, 0) * 2
+        if keep >= self._size:
+            return
+        data = self.tobytes()
+        self._chunks = [data[:keep]] if keep else []
+        self._size = keep
+
+    def tobytes(self):
+        """
+        Materialize the stored audio as a single bytes object.
+        """
+        if not self._chunks:
+            return b""
+        if len(self._chunks) > 1 or not isinstance(self._chunks[0], bytes):
+            self._chunks = [b"".join(self._chunks)]
+        return self._chunks[0]
+
+    def to_array(self):
+        """
+        Materialize the stored audio as a numpy array of int16, sharing memory
+        with the bytes returned by tobytes().
+        """
+        return np.frombuffer(self.tobytes(), dtype=np.int16)
+
+
+class StreamingResampler:
+    """
+    Streaming polyphase resampler for 16-bit mono PCM.
+
+    Converts between two sample rates by the rational factor up/down with a
+    Kaiser-windowed sinc low-pass split into up phases of taps_per_phase taps.
+    Each output sample is one dot product over the phase it falls on, evaluated
+    for a whole chunk at once in NumPy. The tail of the previous chunk and the
+    output phase are carried over, so chunk boundaries are seamless.
+    """
+
+    def __init__(self, input_rate, output_rate, taps_per_phase=16):
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        divisor = math.gcd(input_rate, output_rate)
+        self.up = output_rate // divisor
+        self.down = input_rate // divisor
+        self.taps_per_phase = taps_per_phase
+
+        # Low-pass below the lower of the two Nyquist frequencies, in the upsampled domain
+        num_taps = taps_per_phase * self.up
+        cutoff = 0.45 / max(self.up, self.down)
+        n = np.arange(num_taps) - (num_taps - 1) / 2
+        taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(num_taps, 8.0)
+        taps *= self.up / taps.sum()
+
+        # bank[phase, j] weights the input sample j steps back from the current one
+        self._bank = taps.reshape(taps_per_phase, self.up).T.astype(np.float32)
+        self._steps_back = np.arange(taps_per_phase)
+        self.reset()
+
+    @property
+    def passthrough(self):
+        """
+        True when both rates are equal and process() has nothing to do.
+        """
+        return self.up == self.down
+
+    def reset(self):
+        """
+        Drop the filter history, e.g. when a new stream starts.
+        """
+        self._history = np.zeros(self.taps_per_phase - 1, dtype=np.float32)
+        # Upsampled index of the next output sample, relative to the start of the history
+        self._position = (self.taps_per_phase - 1) * self.up
+
+    def process(self, data):
+        """
+        Resample one chunk.
+
+        :param data: bytes-like object holding 16-bit PCM at input_rate.
+        :return: bytes holding 16-bit PCM at output_rate.
+        """
+        if self.passthrough:
+            return bytes(data)
+
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        window = np.concatenate((self._history, samples))
+        limit = len(window) * self.up
+        count = max(0, -(-(limit - self._position) // self.down))
+
+        positions = self._position + self.down * np.arange(count)
+        current = positions // self.up
+        frames = window[current[:, None] - self._steps_back]
+        output = np.einsum("ij,ij->i", frames, self._bank[positions % self.up])
+
+        # Keep just enough input for the next chunk's first outputs
+        consumed = len(window) - len(self._history)
+        self._history = window[consumed:]
+        self._position += self.down * count - consumed * self.up
+
+        return np.clip(np.rint(output), -32768, 32767).astype(np.int16).tobytes()
+
+
+class EnergyVADGate:
+    """
+    Client-side energy gate that keeps long stretches of silence off the wire.
+
+    Audio is scored in short frames by RMS level. Voiced frames are forwarded
+    together with up to prefix_padding_ms of the silence before them, so the
+    server VAD still sees the onset. After speech, hangover_ms of silence keeps
+    flowing so the server can detect the end of the turn. Anything else is
+    dropped.
+
+    The server's audio_start_ms/audio_end_ms timestamps count only the audio it
+    received. Everything returned by process() must therefore go to the server
+    and into the local input history, so both timelines stay aligned.
+    """
+
+    def __init__(
+        self,
+        sample_rate,
+        threshold_db=-45.0,
+        frame_ms=10,
+        prefix_padding_ms=300,
+        hangover_ms=800,
+    ):
+        self.frame_bytes = (sample_rate * frame_ms // 1000) * 2
+        self.frame_ms = frame_ms
+        self.threshold = 32768.0**2 * 10 ** (threshold_db / 10)
+        self.prefix_frames = max(prefix_padding_ms // frame_ms, 0)
+        self.hangover_frames = max(hangover_ms // frame_ms, 0)
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the pre-roll, hangover state and counters for a new stream.
+        """
+        self.bytes_suppressed = 0
+        self._preroll = deque()
+        self._preroll_bytes = 0
+        self._hangover = 0
+
+    def process(self, data):
+        """
+        Gate one chunk of audio.
+
+        :param data: bytes-like object holding 16-bit PCM.
+        :return: bytes that should be sent; empty while the input is silent.
+        """
+        data = memoryview(data).cast("B")
+
+        # Mean energy of every frame in one vectorized pass; a short tail is its own frame
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        frame_samples = self.frame_bytes // 2
+        full = len(samples) // frame_samples * frame_samples
+        energy = list(
+            np.mean(np.square(samples[:full].reshape(-1, frame_samples)), axis=1)
+        )
+        if full < len(samples):
+            energy.append(np.mean(np.square(samples[full:])))
+
+        output = bytearray()
+        for index, frame_energy in enumerate(energy):
+            frame = data[index * self.frame_bytes : (index + 1) * self.frame_bytes]
+            if frame_energy >= self.threshold:
+                self._hangover = self.hangover_frames
+                while self._preroll:
+                    output += self._preroll.popleft()
+                self._preroll_bytes = 0
+                output += frame
+            elif self._hangover > 0:
+                self._hangover -= 1
+                output += frame
+            else:
+                self._preroll.append(bytes(frame))
+                self._preroll_bytes += len(frame)
+                if len(self._preroll) > self.prefix_frames:
+                    dropped = self._preroll.popleft()
+                    self._preroll_bytes -= len(dropped)
+                    self.bytes_suppressed += len(dropped)
+
+        return bytes(output)
+
+
+class OutputAudioStreamer:
+    """
+    Paces assistant audio to a listener at playback speed through a small jitter buffer.
+
+    push() is synchronous and meant to be called straight from event dispatch, so
+    chunks are queued in the order the deltas arrived. A single sender task drains
+    the queue: when playback is idle it first lets prebuffer_ms of audio build up,
+    it merges tiny deltas into chunks of at least min_chunk_ms while playback still
+    has audio left, and it never runs more than lead_ms ahead of real time.
+    interrupt() drops everything that has not been sent yet.
+    """
+
+    def __init__(
+        self,
+        send,
+        sample_rate,
+        prebuffer_ms=60,
+        min_chunk_ms=40,
+        max_chunk_ms=200,
+        lead_ms=250,
+    ):
+        self.send = send
+        self.bytes_per_ms = sample_rate * 2 / 1000
+        self.prebuffer_ms = prebuffer_ms
+        self.min_chunk_ms = min_chunk_ms
+        self.max_chunk_ms = max_chunk_ms
+        self.lead_ms = lead_ms
+        self.chunks_received = 0
+        self.chunks_sent = 0
+        self.interrupts = 0
+        self._buffer = bytearray()
+        self._data_ready = asyncio.Event()
+        self._playhead = 0.0
+        self._task = None
+
+    @property
+    def buffered_ms(self):
+        """
+        Milliseconds of audio waiting to be sent.
+        """
+        return len(self._buffer) / self.bytes_per_ms
+
+    def push(self, chunk):
+        """
+        Queue a chunk of PCM16 audio behind everything pushed before it.
+
+        :param chunk: bytes-like object holding 16-bit PCM at sample_rate.
+        """
+        self._buffer += chunk
+        self.chunks_received += 1
+        self._data_ready.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def interrupt(self):
+        """
+        Drop all queued audio at once, e.g. when the user barges in.
+        """
+        self._buffer.clear()
+        self._playhead = 0.0
+        self.interrupts += 1
+
+    def close(self):
+        """
+        Drop queued audio and stop the sender task.
+        """
+        self.interrupt()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _wait_for_data(self, timeout):
+        self._data_ready.clear()
+        try:
+            await asyncio.wait_for(self._data_ready.wait(), max(timeout, 0))
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._buffer:
+                self._data_ready.clear()
+                await self._data_ready.wait()
+
+            now = loop.time()
+            if self._playhead <= now:
+                # Playback has drained: let the jitter buffer fill before restarting
+                deadline = now + self.prebuffer_ms / 1000
+                while self._buffer and self.buffered_ms < self.prebuffer_ms:
+                    if loop.time() >= deadline:
+                        break
+                    await self._wait_for_data(deadline - loop.time())
+            else:
+                # Stay at most lead_ms ahead of what the listener is playing
+                ahead = self._playhead - now - self.lead_ms / 1000
+                if ahead > 0:
+                    await asyncio.sleep(ahead)
+
+                # Coalesce tiny deltas while playback still has audio to play
+                deadline = self._playhead - self.min_chunk_ms / 1000
+                while self._buffer and self.buffered_ms < self.min_chunk_ms:
+                    if loop.time() >= deadline:
+                        break
+                    await self._wait_for_data(deadline - loop.time())
+
+            if not self._buffer:
+                # Interrupted while waiting
+                continue
+
+            size = min(len(self._buffer), int(self.max_chunk_ms * self.bytes_per_ms))
+            size -= size % 2
+            chunk = bytes(self._buffer[:size])
+            del self._buffer[:size]
+
+            self._playhead = max(self._playhead, loop.time()) + (
+                size / self.bytes_per_ms / 1000
+            )
+            self.chunks_sent += 1
+            await self.send(chunk)
+
+
+HANDLER_OVERFLOW_POLICIES = ("block", "drop_oldest", "coalesce")
+
+# Seconds a full "block" subscriber may pause its producer before its oldest
+# queued events are dropped instead
+HANDLER_BLOCK_TIMEOUT = 5.0
+
+
+class SerialHandlerWorker:
+    """
+    Runs one async subscriber's events one at a time, in dispatch order.
+
+    Events wait in a bounded queue. When it is full the overflow policy decides:
+    "block" still queues the event but marks the worker as out of capacity, so a
+    producer that awaits wait_for_capacity() (the socket receive loop) pauses;
+    "drop_oldest" discards the oldest queued event; "coalesce" merges the event
+    into the newest queued one with coalesce(previous, event), which defaults to
+    keeping the latest.
+
+    A "block" handler must not wait for a later event from the producer it
+    pauses, since that event is only read once the handler makes room. If its
+    queue stays full for HANDLER_BLOCK_TIMEOUT, wait_for_capacity() gives up and
+    drops the oldest queued events, as "drop_oldest" would.
+    """
+
+    def __init__(
+        self, event_name, handler, max_queue=256, overflow="block", coalesce=None
+    ):
+        if overflow not in HANDLER_OVERFLOW_POLICIES:
+            raise Exception(f'Unknown overflow policy "{overflow}"')
+        self.event_name = event_name
+        self.handler = handler
+        self.max_queue = max(max_queue, 1)
+        self.overflow = overflow
+        self.coalesce = coalesce or (lambda previous, event: event)
+        self.queue = deque()
+        self.has_capacity = asyncio.Event()
+        self.has_capacity.set()
+        self.processed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self._ready = asyncio.Event()
+        self._task = None
+        self._closed = False
+
+    def put(self, event):
+        """
+        Queue an event for the handler, applying the overflow policy when full.
+
+        :param event: The event data.
+        """
+        if self._closed:
+            return
+        queue = self.queue
+        if len(queue) >= self.max_queue:
+            if self.overflow == "drop_oldest":
+                queue.popleft()
+                self.dropped += 1
+            elif self.overflow == "coalesce":
+                queue[-1] = self.coalesce(queue[-1], event)
+                self.coalesced += 1
+                return
+        queue.append(event)
+        if len(queue) > self.max_depth:
+            self.max_depth = len(queue)
+        if len(queue) >= self.max_queue and self.overflow == "block":
+            self.has_capacity.clear()
+
+        self._ready.set()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def shed(self):
+        """
+        Drop the oldest queued events until the queue has room again.
+        """
+        excess = len(self.queue) - self.max_queue + 1
+        if excess > 0:
+            for _ in range(excess):
+                self.queue.popleft()
+            self.dropped += excess
+            logger.warning(
+                "Handler %s for %s stayed full, dropped %d events",
+                getattr(self.handler, "__qualname__", repr(self.handler)),
+                self.event_name,
+                excess,
+            )
+        self.has_capacity.set()
+
+    def stats(self):
+        """
+        Queue depth and counters for this subscriber.
+        """
+        return {
+            "event_name": self.event_name,
+            "handler": getattr(self.handler, "__qualname__", repr(self.handler)),
+            "depth": len(self.queue),
+            "max_depth": self.max_depth,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+    def close(self):
+        """
+        Drop queued events and stop the worker task. When called from the
+        handler itself, the current event finishes and the worker then exits.
+        """
+        self._closed = True
+        self.queue.clear()
+        self.has_capacity.set()
+        self._ready.set()
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._task = None
+
+    async def _run(self):
+        while not self._closed:
+            if not self.queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            event = self.queue.popleft()
+            if len(self.queue) < self.max_queue:
+                self.has_capacity.set()
+            try:
+                await self.handler(event)
+            except Exception:
+                logger.error(traceback.format_exc())
+            self.processed += 1
+
+
 class RealtimeEventHandler:
     """
     A generic event dispatcher/handler system.
     Allows registration and asynchronous or synchronous dispatching of event handlers.
+
+    Handlers are classified as sync or async once, when they are registered, and
+    the handlers for each event name are compiled into a cached route the first
+    time that name is dispatched. A name ending in "*" subscribes to every event
+    starting with the part before it (e.g. "server.*"), so a single dispatch
+    reaches both exact and wildcard subscribers. Coroutine handlers are not run
+    as a task per event: each gets a SerialHandlerWorker that runs its events in
+    order, one at a time, from a bounded queue.
     """
 
     def __init__(self):
         self.event_handlers = defaultdict(list)
+        self.handler_workers = []
+        self._routes = {}
+        # Running coroutine handlers of once(), kept so they are not collected
+        self._once_tasks = set()
 
-    def on(self, event_name, handler):
+    def on(self, event_name, handler, max_queue=256, overflow="block", coalesce=None):
         """
         Register a handler for a specific event name.
 
-        :param event_name: The event name string (e.g. "server.*", "client.*").
+        :param event_name: The event name string, or a prefix ending in "*"
+                           (e.g. "server.*", "client.*").
         :param handler: A callable to be triggered upon the event.
+        :param max_queue: Queue bound when the handler is a coroutine.
+        :param overflow: Policy when that queue is full: "block", "drop_oldest"
+                         or "coalesce" (see SerialHandlerWorker). A "block"
+                         handler must not wait for a later event of the same
+                         stream, or the stream stalls until HANDLER_BLOCK_TIMEOUT.
+        :param coalesce: Optional merge(previous, event) for the "coalesce" policy.
+        """
+        worker = None
+        if inspect.iscoroutinefunction(handler):
+            worker = SerialHandlerWorker(
+                event_name, handler, max_queue, overflow, coalesce
+            )
+            self.handler_workers.append(worker)
+        self.event_handlers[event_name].append((handler, worker))
+        self._routes.clear()
+
+    def off(self, event_name, handler=None):
+        """
+        Unregister a handler from an event name.
+
+        :param event_name: The event name string or prefix it was registered with.
+        :param handler: The handler to remove. If None, every handler registered
+                        under event_name is removed.
+        """
+        handlers = self.event_handlers.get(event_name)
+        if not handlers:
+            return
+        remaining = []
+        for entry in handlers:
+            if handler is None or entry[0] == handler:
+                if entry[1] is not None:
+                    entry[1].close()
+                    self.handler_workers.remove(entry[1])
+            else:
+                remaining.append(entry)
+        if remaining:
+            self.event_handlers[event_name] = remaining
+        else:
+            del self.event_handlers[event_name]
+        self._routes.clear()
+
+    def once(self, event_name, handler):
+        """
+        Register a handler that is called for the next matching event only, then
+        removed. A coroutine handler is scheduled as a single task, since it has
+        no stream of events to order.
+
+        :param event_name: The event name string, or a prefix ending in "*".
+        :param handler: A callable to be triggered once.
+        :return: The registered wrapper; pass it to off() to cancel.
         """
-        self.event_handlers[event_name].append(handler)
+        fired = False
+
+        def once_handler(event):
+            nonlocal fired
+            if fired:
+                return
+            fired = True
+            self.off(event_name, once_handler)
+            if inspect.iscoroutinefunction(handler):
+                task = asyncio.create_task(handler(event))
+                self._once_tasks.add(task)
+                task.add_done_callback(self._once_tasks.discard)
+            else:
+                handler(event)
+
+        self.on(event_name, once_handler)
+        return once_handler
 
     def clear_event_handlers(self):
         """
         Clear all registered event handlers.
         """
+        for worker in self.handler_workers:
+            worker.close()
         self.event_handlers = defaultdict(list)
+        self.handler_workers = []
+        self._routes.clear()
+
+    def has_subscribers(self, event_name):
+        """
+        Returns True if any handler would receive event_name, so callers can skip
+        building events nobody listens to.
+
+        :param event_name: The event name.
+        :return: bool
+        """
+        return bool(self._route(event_name))
+
+    def _route(self, event_name):
+        route = self._routes.get(event_name)
+        if route is None:
+            route = tuple(self.event_handlers.get(event_name, ()))
+            for pattern, handlers in self.event_handlers.items():
+                if (
+                    pattern != event_name
+                    and pattern.endswith("*")
+                    and event_name.startswith(pattern[:-1])
+                ):
+                    route += tuple(handlers)
+            self._routes[event_name] = route
+        return route
 
     def dispatch(self, event_name, event):
         """
-        Dispatch an event to all handlers that are registered under event_name.
-        If the handler is a coroutine, it is scheduled with create_task.
+        Dispatch an event to all handlers whose name or prefix matches event_name.
+        Exact subscribers run first, then wildcard subscribers in registration order.
+        If the handler is a coroutine, the event is queued on its worker.
         Otherwise, it is called directly.
 
         :param event_name: The event name.
         :param event: The event data (usually a dictionary).
         """
-        for handler in self.event_handlers[event_name]:
-            if inspect.iscoroutinefunction(handler):
-                asyncio.create_task(handler(event))
-            else:
+        for handler, worker in self._route(event_name):
+            if worker is None:
                 handler(event)
+            else:
+                worker.put(event)
+
+    def get_queue_stats(self):
+        """
+        Queue depth and counters for every coroutine subscriber.
+
+        :return: List of dicts, see SerialHandlerWorker.stats().
+        """
+        return [worker.stats() for worker in self.handler_workers]
+
+    async def wait_for_capacity(self, timeout=HANDLER_BLOCK_TIMEOUT):
+        """
+        Wait until no "block" subscriber has a full queue. A subscriber that is
+        still full after timeout seconds sheds its oldest events instead.
+
+        :param timeout: Seconds to wait for each subscriber, or None to wait
+                        indefinitely.
+        """
+        for worker in self.handler_workers:
+            if not worker.has_capacity.is_set():
+                try:
+                    await asyncio.wait_for(worker.has_capacity.wait(), timeout)
+                except asyncio.TimeoutError:
+                    worker.shed()
 
-    async def wait_for_next(self, event_name):
+    async def wait_for_next(self, event_name, timeout=None):
         """
         Wait (async) for the next occurrence of a particular event name,
         and return that event's data once it arrives.
 
+        The waiter is a one-shot subscription: it is removed when the event
+        arrives, when the timeout expires, or when the waiting task is cancelled,
+        so abandoned waits do not pile up in the handler table.
+
         :param event_name: The event name to wait for.
+        :param timeout: Optional number of seconds to wait before giving up.
         :return: The event data.
+        :raises asyncio.TimeoutError: If the event does not arrive within timeout.
         """
-        future = asyncio.Future()
+        future = asyncio.get_running_loop().create_future()
 
         def handler(event):
             if not future.done():
                 future.set_result(event)
 
-        self.on(event_name, handler)
-        return await future
+        once_handler = self.once(event_name, handler)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.off(event_name, once_handler)
+
+
+class JSONCodec:
+    """
+    Encodes and decodes Realtime API frames with the standard library json module.
+    """
+
+    name = "json"
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj):
+        # Text frames: the API does not accept JSON in binary frames
+        return json.dumps(obj)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    Encodes and decodes frames with orjson, when it is installed.
+    """
+
+    name = "orjson"
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+    def dumps(self, obj):
+        return orjson.dumps(obj).decode("utf-8")
+
+
+JSON_CODECS = {"json": JSONCodec, "orjson": OrjsonCodec}
+
+
+def get_json_codec(name=None):
+    """
+    Returns a JSON codec by name, from REALTIME_JSON_CODEC, or the fastest available.
+
+    :param name: "json", "orjson", or None to pick automatically.
+    :return: A codec instance with loads() and dumps().
+    :raises Exception: If the codec is unknown or its package is not installed.
+    """
+    name = name or os.getenv("REALTIME_JSON_CODEC") or ("orjson" if orjson else "json")
+    if name not in JSON_CODECS:
+        raise Exception(f'Unknown JSON codec "{name}"')
+    if name == "orjson" and orjson is None:
+        raise Exception('JSON codec "orjson" requires the orjson package')
+    return JSON_CODECS[name]()
+
+
+class LazyEvent(Mapping):
+    """
+    Read-only server event that is only fully decoded when a handler needs it.
+
+    The string fields the API puts first in every frame (type and the ids) are
+    located on first access with str.find in the first HEADER_SCAN_CHARS of the raw
+    frame, stopping at the first nested object or array so nested "type" keys are
+    never picked up. Reading
+    any other key, iterating, or repr() decodes the whole frame once and caches it.
+    Events nobody subscribes to, or whose handlers only look at the header, are
+    never decoded at all.
+    """
+
+    HEADER_SCAN_CHARS = 512
+    HEADER_KEYS = ("type", "event_id", "item_id", "response_id", "previous_item_id")
+    _header_tokens = {key: f'"{key}":' for key in HEADER_KEYS}
+
+    __slots__ = ("raw", "_codec", "_header", "_data", "_header_end")
+
+    def __init__(self, raw, codec):
+        self.raw = raw
+        self._codec = codec
+        self._data = None
+        self._header = {}
+
+        end = min(len(raw), self.HEADER_SCAN_CHARS)
+        for bracket in "{[":
+            nested = raw.find(bracket, 1, end)
+            if nested != -1:
+                end = nested
+        self._header_end = end
+
+    def _read_header(self, key):
+        header = self._header
+        if key in header:
+            return header[key]
+
+        raw, end, value = self.raw, self._header_end, None
+        token = self._header_tokens[key]
+        start = raw.find(token, 0, end)
+        if start != -1:
+            start += len(token)
+            if raw[start : start + 1] == " ":
+                start += 1
+            stop = raw.find('"', start + 1, end)
+            # Values with escapes are left to the full decode
+            if raw[start : start + 1] == '"' and stop != -1:
+                value = raw[start + 1 : stop]
+                if "\\" in value:
+                    value = None
+        header[key] = value
+        return value
+
+    def materialize(self):
+        """
+        Decodes the full frame (once) and returns it as a dict.
+        """
+        if self._data is None:
+            self._data = self._codec.loads(self.raw)
+        return self._data
+
+    def __getitem__(self, key):
+        if self._data is None and key in self._header_tokens:
+            value = self._read_header(key)
+            if value is not None:
+                return value
+        return self.materialize()[key]
+
+    def __iter__(self):
+        return iter(self.materialize())
+
+    def __len__(self):
+        return len(self.materialize())
+
+    def __repr__(self):
+        return repr(self.materialize())
+
+
+# High-rate event types: only every log_sample_every-th one is debug-logged
+LOG_SAMPLED_EVENT_TYPES = {
+    "input_audio_buffer.append",
+    "response.audio.delta",
+    "response.audio_transcript.delta",
+    "response.text.delta",
+    "response.function_call_arguments.delta",
+}
+LOG_SAMPLE_EVERY = 50
+LOG_MAX_FIELD_CHARS = 200
+
+
+def redact_event(event, max_chars=LOG_MAX_FIELD_CHARS):
+    """
+    Returns a copy of an event that is safe to log. Audio payloads ("audio" and
+    "delta" fields) longer than max_chars are replaced by their size, and other
+    long strings are truncated, at any depth.
+
+    :param event: Event mapping.
+    :param max_chars: Longest string kept as is.
+    :return: A new dict.
+    """
+
+    def redact(key, value):
+        if isinstance(value, str):
+            if len(value) <= max_chars:
+                return value
+            if key in ("audio", "delta"):
+                return f"<{len(value)} chars>"
+            return value[:max_chars] + "..."
+        if isinstance(value, Mapping):
+            return {k: redact(k, v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [redact(key, v) for v in value]
+        return value
+
+    return redact(None, event)
+
+
+# Client event -> server event that acknowledges it. Item events are matched by
+# item id, the others in FIFO order.
+CORRELATED_EVENTS = {
+    "session.update": "session.updated",
+    "input_audio_buffer.commit": "input_audio_buffer.committed",
+    "input_audio_buffer.clear": "input_audio_buffer.cleared",
+    "response.create": "response.created",
+    "conversation.item.create": "conversation.item.created",
+    "conversation.item.truncate": "conversation.item.truncated",
+    "conversation.item.delete": "conversation.item.deleted",
+}
+KEYED_EVENTS = {
+    "conversation.item.create",
+    "conversation.item.truncate",
+    "conversation.item.delete",
+}
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class EventCorrelator:
+    """
+    Matches client events to the server events they trigger and keeps a
+    round-trip latency histogram per client event type.
+
+    response.create, session.update and buffer commits/clears are matched in FIFO
+    order; item create/truncate/delete by item id. Server errors are attributed
+    to the client event named by error.event_id, looked up among the last
+    max_recent sent events. Pending entries older than max_age seconds are
+    dropped from every lane, so events the server never acknowledges cannot pile
+    up, and reset() drops them all when a new connection starts.
+    """
+
+    def __init__(self, max_age=60.0, max_recent=1024):
+        self.max_age = max_age
+        self.max_recent = max_recent
+        self._pending = {server_type: {} for server_type in CORRELATED_EVENTS.values()}
+        self._recent = {}
+        self._histograms = {}
+        self.errors = defaultdict(int)
+
+    @staticmethod
+    def _item_id(event):
+        item = event.get("item")
+        return event.get("item_id") or (item.get("id") if item else None)
+
+    def sent(self, event):
+        """
+        Record a client event as it is sent.
+
+        :param event: The client event, with event_id and type.
+        """
+        now = time.monotonic()
+        event_id, event_type = event["event_id"], event["type"]
+        recent = self._recent
+        recent[event_id] = (event_type, now)
+        if len(recent) > self.max_recent:
+            del recent[next(iter(recent))]
+
+        server_type = CORRELATED_EVENTS.get(event_type)
+        if server_type:
+            self._prune(now)
+            key = self._item_id(event) if event_type in KEYED_EVENTS else None
+            pending = self._pending[server_type]
+            # Re-sending a key moves it to the back, keeping send order
+            pending.pop(key or event_id, None)
+            pending[key or event_id] = (event_type, event_id, now)
+
+    def reset(self):
+        """
+        Forget the client events still waiting for the server, e.g. because the
+        socket they were sent on is gone. Histograms and error counts are kept.
+        """
+        for pending in self._pending.values():
+            pending.clear()
+        self._recent.clear()
+
+    def received(self, event):
+        """
+        Match a server event to the client event that caused it, if any, and
+        record the round trip.
+
+        :param event: The server event.
+        :return: (client event type, client event_id), or None.
+        """
+        event_type = event["type"]
+        if event_type == "error":
+            event_id = (event.get("error") or {}).get("event_id")
+            source = self._recent.get(event_id)
+            if not source:
+                return None
+            client_type = source[0]
+            self.errors[client_type] += 1
+            pending = self._pending.get(CORRELATED_EVENTS.get(client_type), {})
+            for key, entry in list(pending.items()):
+                if entry[1] == event_id:
+                    del pending[key]
+            return client_type, event_id
+
+        pending = self._pending.get(event_type)
+        if not pending:
+            return None
+        now = time.monotonic()
+        self._prune(now)
+
+        key = self._item_id(event) if event_type.startswith("conversation.") else None
+        if key is None:
+            key = next(iter(pending), None)
+        entry = pending.pop(key, None)
+        if entry is None:
+            return None
+        client_type, event_id, sent_at = entry
+        self._record(client_type, (now - sent_at) * 1000)
+        return client_type, event_id
+
+    def _prune(self, now):
+        for pending in self._pending.values():
+            while pending:
+                # Entries are in send order, so stale ones are at the front
+                oldest = next(iter(pending))
+                if now - pending[oldest][2] <= self.max_age:
+                    break
+                del pending[oldest]
+
+    def _record(self, event_type, latency_ms):
+        histogram = self._histograms.get(event_type)
+        if histogram is None:
+            histogram = self._histograms[event_type] = {
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+            }
+        histogram["count"] += 1
+        histogram["total_ms"] += latency_ms
+        histogram["max_ms"] = max(histogram["max_ms"], latency_ms)
+        index = next(
+            (i for i, bound in enumerate(LATENCY_BUCKETS_MS) if latency_ms <= bound),
+            len(LATENCY_BUCKETS_MS),
+        )
+        histogram["buckets"][index] += 1
+
+    def stats(self):
+        """
+        Round-trip latency per client event type: count, average, max, p50/p95
+        (upper bound of the bucket they fall in) and the bucket counts keyed by
+        their upper bound in ms. Also the error count per type.
+        """
+        stats = {}
+        for event_type, histogram in self._histograms.items():
+            count = histogram["count"]
+            bounds = LATENCY_BUCKETS_MS + (float("inf"),)
+
+            def percentile(fraction):
+                seen = 0
+                for bound, bucket in zip(bounds, histogram["buckets"]):
+                    seen += bucket
+                    if seen >= fraction * count:
+                        return bound
+                return bounds[-1]
+
+            stats[event_type] = {
+                "count": count,
+                "avg_ms": histogram["total_ms"] / count,
+                "max_ms": histogram["max_ms"],
+                "p50_ms": percentile(0.5),
+                "p95_ms": percentile(0.95),
+                "buckets": dict(zip(bounds, histogram["buckets"])),
+                "errors": self.errors.get(event_type, 0),
+            }
+        for event_type, errors in self.errors.items():
+            stats.setdefault(event_type, {"count": 0, "errors": errors})
+        return stats
+
+
+# Outbound priority lanes, highest first. Urgent events (barge-in) jump every
+# queue, control events jump queued audio, and input audio goes last.
+SEND_LANES = ("urgent", "control", "media")
+URGENT_EVENT_TYPES = {"response.cancel", "conversation.item.truncate"}
+# Media events that later control events must not overtake (e.g. response.create
+# right after a manual commit)
+MEDIA_BARRIER_EVENT_TYPES = {"input_audio_buffer.commit", "input_audio_buffer.clear"}
+MAX_SEND_QUEUE_BYTES = 4 * 1024 * 1024
+
+
+# websockets.connect options for each transport profile. permessage-deflate
+# shrinks base64 PCM audio to about three quarters of its size, and transcripts,
+# text and tool calls several times over, but it costs CPU and latency on every
+# frame. "audio" turns compression off to save that CPU and latency, giving up
+# the quarter of audio bandwidth deflate saves; "text" keeps it on.
+TRANSPORT_PROFILES = {
+    # Library defaults: deflate, 1 MiB messages, 16 queued frames, 32 KiB write buffer
+    "default": {},
+    "audio": {
+        "compression": None,
+        # response.done carries every transcript of a long answer
+        "max_size": 8 * 1024 * 1024,
+        # Deltas arrive in bursts faster than real time
+        "max_queue": 64,
+        "write_limit": 256 * 1024,
+        "ping_interval": 20,
+        "ping_timeout": 20,
+    },
+    "text": {
+        "compression": "deflate",
+        "max_size": 8 * 1024 * 1024,
+        "max_queue": 64,
+        "write_limit": 256 * 1024,
+        "ping_interval": 20,
+        "ping_timeout": 20,
+    },
+}
+
+
+def _is_timeout(value):
+    return value is None or (isinstance(value, (int, float)) and value > 0)
+
+
+def _is_limit(value):
+    # A size, or a (high, low) pair of water marks
+    if isinstance(value, tuple):
+        return len(value) == 2 and all(isinstance(v, int) and v >= 0 for v in value)
+    return isinstance(value, int) and value > 0
+
+
+# Options a profile may set, with a check for each value
+TRANSPORT_OPTIONS = {
+    "compression": lambda value: value in ("deflate", None),
+    "max_size": lambda value: value is None or (isinstance(value, int) and value > 0),
+    "max_queue": lambda value: value is None or _is_limit(value),
+    "write_limit": _is_limit,
+    "ping_interval": _is_timeout,
+    "ping_timeout": _is_timeout,
+    "open_timeout": _is_timeout,
+    "close_timeout": _is_timeout,
+}
+
+
+def get_transport_profile(profile=None):
+    """
+    Returns validated websockets.connect options for a transport profile.
+
+    :param profile: A name from TRANSPORT_PROFILES, a dict of options, or None for
+        REALTIME_TRANSPORT_PROFILE or "default".
+    :return: A new dict of keyword arguments for websockets.connect.
+    :raises Exception: If the profile is unknown or an option is unknown or invalid.
+    """
+    if profile is None:
+        profile = os.getenv("REALTIME_TRANSPORT_PROFILE") or "default"
+    if isinstance(profile, str):
+        if profile not in TRANSPORT_PROFILES:
+            raise Exception(f'Unknown transport profile "{profile}"')
+        profile = TRANSPORT_PROFILES[profile]
+
+    for name, value in profile.items():
+        if name not in TRANSPORT_OPTIONS:
+            raise Exception(f'Unknown transport option "{name}"')
+        if not TRANSPORT_OPTIONS[name](value):
+            raise Exception(f'Invalid value {value!r} for transport option "{name}"')
+    return dict(profile)
+
+
+# Scope of the bearer token for Azure OpenAI
+COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+
+class StaticTokenSource:
+    """
+    Token source that always returns the same bearer token, for tests and local
+    servers. Any callable that takes a scope and returns an AccessToken, such as
+    an azure.identity credential's get_token, can be used as a token source.
+    """
+
+    def __init__(self, token, ttl=3600.0):
+        self.token = token
+        self.ttl = ttl
+
+    def __call__(self, scope):
+        return AccessToken(self.token, int(time.time() + self.ttl))
+
+
+class SharedTokenProvider:
+    """
+    Caches a bearer token for every RealtimeAPI in the process.
+
+    Tokens are fetched from the token source in a worker thread, so the event
+    loop never blocks on the credential, and one fetch is shared by all callers.
+    Each token is refreshed in the background refresh_margin seconds before it
+    expires (or halfway through its lifetime, if that is sooner), so callers
+    only ever wait for the very first token or after a refresh failed until expiry.
+    """
+
+    def __init__(
+        self, token_source=None, scope=COGNITIVE_SERVICES_SCOPE, refresh_margin=300.0
+    ):
+        """
+        :param token_source: Callable taking a scope and returning an AccessToken.
+            Defaults to DefaultAzureCredential().get_token, created on first use.
+        :param scope: Scope the token is requested for.
+        :param refresh_margin: Seconds before expiry to refresh the token.
+        """
+        self.token_source = token_source
+        self.scope = scope
+        self.refresh_margin = refresh_margin
+        self.refreshes = 0
+        self._token = None
+        self._refresh_at = 0.0
+        self._refresh_task = None
+        self._refresh_timer = None
+
+    async def get_token(self):
+        """
+        Returns a valid bearer token, waiting only if none is cached or it expired.
+        """
+        now = time.time()
+        if self._token is None or self._token.expires_on <= now:
+            return (await asyncio.shield(self._start_refresh())).token
+        if now >= self._refresh_at:
+            self._start_refresh()
+        return self._token.token
+
+    def close(self):
+        """
+        Stops the scheduled background refresh.
+        """
+        if self._refresh_timer:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
+    def _start_refresh(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._fetch())
+            self._refresh_task.add_done_callback(self._on_refresh_done)
+        return self._refresh_task
+
+    def _on_refresh_done(self, task):
+        if not task.cancelled() and task.exception():
+            logger.warning("Bearer token refresh failed: %s", task.exception())
+
+    async def _fetch(self):
+        if self.token_source is None:
+            self.token_source = DefaultAzureCredential().get_token
+        token = await asyncio.to_thread(self.token_source, self.scope)
+        now = time.time()
+        lifetime = max(token.expires_on - now, 0)
+        self._token = token
+        self._refresh_at = token.expires_on - min(self.refresh_margin, lifetime / 2)
+        self.refreshes += 1
+
+        self.close()
+        self._refresh_timer = asyncio.get_running_loop().call_later(
+            max(self._refresh_at - now, 0), self._start_refresh
+        )
+        return token
+
+
+_shared_token_provider = None
+
+
+def get_token_provider():
+    """
+    Returns the process-wide SharedTokenProvider, created on first use.
+    """
+    global _shared_token_provider
+    if _shared_token_provider is None:
+        _shared_token_provider = SharedTokenProvider()
+    return _shared_token_provider
+
+
+def set_token_provider(provider):
+    """
+    Replaces the process-wide token provider, e.g. with
+    SharedTokenProvider(StaticTokenSource("token")) in tests.
+
+    :param provider: A SharedTokenProvider, or None to create a default one on next use.
+    """
+    global _shared_token_provider
+    if _shared_token_provider is not None:
+        _shared_token_provider.close()
+    _shared_token_provider = provider
 
 
 class RealtimeAPI(RealtimeEventHandler):
@@ -141,11 +1570,33 @@ class RealtimeAPI(RealtimeEventHandler):
     Handles the low-level connection to the Realtime WebSocket API for
     Azure-based or OpenAI-based streaming events. Inherits from RealtimeEventHandler
     for dispatching received events.
+
+    Frames are encoded and decoded by a pluggable JSON codec (stdlib json, or
+    orjson when installed). When lazy_events is set, received events are
+    dispatched as LazyEvent objects, so frames nobody reads past their type and
+    ids are never fully decoded.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        json_codec=None,
+        lazy_events=False,
+        token_provider=None,
+        transport_profile=None,
+    ):
+        """
+        :param json_codec: Codec name for get_json_codec(), or None for the default.
+        :param lazy_events: Dispatch received events as LazyEvent objects.
+        :param token_provider: SharedTokenProvider for bearer tokens, or None for
+            the process-wide one.
+        :param transport_profile: Name or dict for get_transport_profile(), or None
+            for the default.
+        """
         super().__init__()
 
+        self.json_codec = get_json_codec(json_codec)
+        self.lazy_events = lazy_events
+
         # Default to OpenAI's URL if no environment variable is set, though Azure usage is typical
         self.default_url = "wss://api.openai.com/v1/realtime"
 
@@ -155,108 +1606,756 @@ class RealtimeAPI(RealtimeEventHandler):
             endpoint = endpoint.replace("https://", "wss://")
         self.url = endpoint
         self.api_key = os.getenv("AZURE_OPENAI_API_KEY", "")
-        self.credentials = DefaultAzureCredential()
-        self.acquire_token = get_bearer_token_provider(
-            self.credentials, "https://cognitiveservices.azure.com/.default"
-        )
+        # Shared by every RealtimeAPI in the process, see get_token_provider()
+        self.token_provider = token_provider or get_token_provider()
+        # Keyword arguments for websockets.connect, see TRANSPORT_PROFILES
+        self.transport_options = get_transport_profile(transport_profile)
 
         # API version and deployment for Azure
         self.api_version = "2024-10-01-preview"
         self.azure_deployment = os.environ["AZURE_OPENAI_DEPLOYMENT"]
         self.ws = None
 
+        # Event handlers whose full "block" queues pause reading from the socket
+        self.paced_handlers = [self]
+
+        self.log_sample_every = LOG_SAMPLE_EVERY
+        self._log_counts = defaultdict(int)
+
+        self._id_salt = os.urandom(3).hex()
+        self._id_counter = itertools.count(1)
+        self.correlator = EventCorrelator()
+
+        self.max_send_queue_bytes = MAX_SEND_QUEUE_BYTES
+        self._send_lanes = {lane: deque() for lane in SEND_LANES}
+        self._send_ready = asyncio.Event()
+        self._send_space = asyncio.Event()
+        self._writer_task = None
+        self._reset_send_queue()
+
+        self._receiver_task = None
+        # (event_name, event) pairs held while the session sits in a pool
+        self._held_events = None
+
     def is_connected(self):
         """
         Checks if the WebSocket connection is currently established.
         """
         return self.ws is not None
 
+    def is_open(self):
+        """
+        Checks that the WebSocket is connected and still open, i.e. the server
+        has not closed the connection, whether or not its events are being read.
+        """
+        return self.ws is not None and self.ws.state is websockets.State.OPEN
+
+    def hold_events(self):
+        """
+        Holds every event instead of dispatching it, until release_held_events().
+        Used while a pooled session waits for a client to lease it.
+        """
+        if self._held_events is None:
+            self._held_events = []
+
+    def release_held_events(self):
+        """
+        Dispatches the held events in the order they happened and resume
+        dispatching as events arrive.
+        """
+        held, self._held_events = self._held_events or [], None
+        for event_name, event in held:
+            super().dispatch(event_name, event)
+
+    def dispatch(self, event_name, event):
+        if self._held_events is not None:
+            self._held_events.append((event_name, event))
+            return
+        super().dispatch(event_name, event)
+
     def log(self, *args):
         """
-        Helper for logging with a consistent prefix.
+        Helper for logging with a consistent prefix. Returns at once, without
+        formatting anything, unless DEBUG logging is enabled.
         """
-        logger.debug(f"[Websocket/{datetime.utcnow().isoformat()}]", *args)
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        logger.debug(
+            "[Websocket/%s] %s",
+            datetime.now(timezone.utc).isoformat(),
+            " ".join(str(arg) for arg in args),
+        )
+
+    def _log_event(self, prefix, event):
+        """
+        Debug-logs a sent or received event. Audio payloads are redacted and
+        high-rate event types (LOG_SAMPLED_EVENT_TYPES) are sampled, so enabling
+        DEBUG does not mean formatting megabytes of base64 per second.
+        """
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        event_type = event["type"]
+        if event_type in LOG_SAMPLED_EVENT_TYPES:
+            count = self._log_counts[event_type]
+            self._log_counts[event_type] = count + 1
+            if count % self.log_sample_every:
+                return
+        self.log(prefix, redact_event(event))
 
     async def connect(
         self,
         model=None,
+        receive=True,
     ):
         """
         Establishes a WebSocket connection to the specified model.
 
         :param model: Model name or deployment name to connect to.
+        :param receive: Start the receive loop now. False leaves server events
+            unread on the socket until start_receiving(), as pooled sessions do.
         :raises Exception: If already connected or if connection fails.
         """
         if not model:
             model = self.azure_deployment
 
-        if self.is_connected():
-            raise Exception("Already connected")
-        headers = (
-            {"api-key": self.api_key}
-            if self.api_key != ""
-            else {"Authorization": f"Bearer {self.acquire_token()}"}
-        )
-        self.ws = await websockets.connect(
-            f"{self.url}/openai/realtime?api-version={self.api_version}&deployment={model}",
-            additional_headers=headers,
-        )
-        self.log(f"Connected to {self.url}")
-        asyncio.create_task(self._receive_messages())
+        if self.is_connected():
+            raise Exception("Already connected")
+        headers = (
+            {"api-key": self.api_key}
+            if self.api_key != ""
+            else {"Authorization": f"Bearer {await self.token_provider.get_token()}"}
+        )
+        self.ws = await websockets.connect(
+            f"{self.url}/openai/realtime?api-version={self.api_version}&deployment={model}",
+            additional_headers=headers,
+            **self.transport_options,
+        )
+        # Events still pending were sent on a previous socket
+        self.correlator.reset()
+        self.log(f"Connected to {self.url}")
+        self._receiver_task = None
+        if receive:
+            self.start_receiving()
+
+    def start_receiving(self):
+        """
+        Starts the receive loop, unless it is already running.
+
+        The loop runs in the calling task's context, and so do the handler
+        workers it starts, so handlers see the caller's context variables (e.g.
+        Chainlit's user session) rather than those of whoever opened the socket.
+        """
+        if self._receiver_task is None or self._receiver_task.done():
+            # Bound to this socket, which may be closed before the task first runs
+            self._receiver_task = asyncio.create_task(self._receive_messages(self.ws))
+
+    async def _receive_messages(self, ws):
+        """
+        Continuously listens for incoming messages on the WebSocket,
+        dispatching them through the event system.
+        When the server or the network closes the socket, dispatches "close".
+
+        :param ws: The WebSocket to read from.
+        """
+        error = None
+        try:
+            async for message in ws:
+                if self.lazy_events and isinstance(message, str):
+                    event = LazyEvent(message, self.json_codec)
+                else:
+                    event = self.json_codec.loads(message)
+                # Match acknowledgements and errors to the client event behind them
+                source = self.correlator.received(event)
+                if event["type"] == "error":
+                    logger.error("ERROR %s (caused by %s)", message, source)
+
+                self._log_event("received:", event)
+                # Reaches "server.*" subscribers too
+                self.dispatch(f"server.{event['type']}", event)
+                for handler in self.paced_handlers:
+                    await handler.wait_for_capacity()
+        except websockets.ConnectionClosedError as e:
+            error = e
+        if self.ws is ws:
+            self._on_connection_lost(ws, error)
+
+    async def send(self, event_name, data=None):
+        """
+        Sends a message/event over the WebSocket to the server.
+
+        The event is encoded and queued for the connection's single writer task,
+        which writes urgent events (response.cancel, conversation.item.truncate)
+        first, then control events, then input audio (see SEND_LANES). A control
+        event sent while an audio commit or clear is still queued is kept behind
+        it, so it cannot overtake the audio it depends on. Input audio waits here
+        while more than max_send_queue_bytes are queued, which is the backpressure
+        for producers, and fails if the connection closes meanwhile; other events
+        are never held back by the bound.
+
+        :param event_name: The event name/type to send.
+        :param data: The event payload (must be a dictionary).
+        :raises Exception: If the WebSocket is not connected or the data is not a dictionary.
+        """
+        if not self.is_connected():
+            raise Exception("RealtimeAPI is not connected")
+
+        data = data or {}
+        if not isinstance(data, dict):
+            raise Exception("data must be a dictionary")
+        item = data.get("item")
+        if event_name == "conversation.item.create" and item and "id" not in item:
+            # A client-side item id lets the correlator match the ack exactly
+            data = {**data, "item": {**item, "id": self._generate_id("item_")}}
+
+        event = {"event_id": self._generate_id("evt_"), "type": event_name, **data}
+        self.dispatch(f"client.{event_name}", event)
+        self._log_event("sent:", event)
+        self.correlator.sent(event)
+
+        payload = self.json_codec.dumps(event)
+        lane = self._send_lane(event_name)
+        ws = self.ws
+        while lane == "media" and self._send_queue_bytes >= self.max_send_queue_bytes:
+            self._send_space.clear()
+            await self._send_space.wait()
+            # disconnect() wakes every waiter; none may queue on a later socket
+            if self.ws is not ws:
+                raise Exception("RealtimeAPI is not connected")
+
+        self._send_lanes[lane].append((payload, event_name, time.monotonic()))
+        self._send_queue_bytes += len(payload)
+        if event_name in MEDIA_BARRIER_EVENT_TYPES:
+            self._media_barriers += 1
+        self._send_ready.set()
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._write_messages())
+
+    def _send_lane(self, event_name):
+        if event_name in URGENT_EVENT_TYPES:
+            return "urgent"
+        if event_name.startswith("input_audio_buffer.") or self._media_barriers:
+            return "media"
+        return "control"
+
+    async def _write_messages(self):
+        """
+        Single writer for the connection: drains the lanes in priority order and
+        writes every ready frame in one batch before waiting again.
+        """
+        lanes = [self._send_lanes[lane] for lane in SEND_LANES]
+        stats = [self._send_stats[lane] for lane in SEND_LANES]
+        while True:
+            await self._send_ready.wait()
+            batch = 0
+            while True:
+                index = next((i for i, lane in enumerate(lanes) if lane), None)
+                if index is None:
+                    break
+                payload, event_name, enqueued_at = lanes[index].popleft()
+                self._send_queue_bytes -= len(payload)
+                if event_name in MEDIA_BARRIER_EVENT_TYPES:
+                    self._media_barriers -= 1
+                if self._send_queue_bytes < self.max_send_queue_bytes:
+                    self._send_space.set()
+
+                try:
+                    await self.ws.send(payload)
+                except Exception:
+                    logger.error(traceback.format_exc())
+                    self._reset_send_queue()
+                    self._writer_task = None
+                    return
+
+                latency = time.monotonic() - enqueued_at
+                lane_stats = stats[index]
+                lane_stats["sent"] += 1
+                lane_stats["latency_total"] += latency
+                lane_stats["latency_max"] = max(lane_stats["latency_max"], latency)
+                batch += 1
+
+            self._send_ready.clear()
+            if batch:
+                self._send_flushes += 1
+                self._send_max_batch = max(self._send_max_batch, batch)
+
+    def _reset_send_queue(self):
+        for lane in self._send_lanes.values():
+            lane.clear()
+        self._send_queue_bytes = 0
+        self._media_barriers = 0
+        self._send_space.set()
+        self._send_stats = {
+            lane: {"sent": 0, "latency_total": 0.0, "latency_max": 0.0}
+            for lane in SEND_LANES
+        }
+        self._send_flushes = 0
+        self._send_max_batch = 0
+
+    def get_send_stats(self):
+        """
+        Returns outbound queue metrics: per lane the queued frames and bytes,
+        frames sent, and average/max write latency from send() to the socket;
+        plus the number of flushes and the largest batch.
+        """
+        lanes = {}
+        for name in SEND_LANES:
+            queue, stats = self._send_lanes[name], self._send_stats[name]
+            sent = stats["sent"]
+            lanes[name] = {
+                "queued": len(queue),
+                "queued_bytes": sum(len(payload) for payload, _, _ in queue),
+                "sent": sent,
+                "latency_ms_avg": stats["latency_total"] / sent * 1000 if sent else 0.0,
+                "latency_ms_max": stats["latency_max"] * 1000,
+            }
+        return {
+            "lanes": lanes,
+            "queued_bytes": self._send_queue_bytes,
+            "flushes": self._send_flushes,
+            "max_batch": self._send_max_batch,
+        }
+
+    def get_lane_totals(self, lane):
+        """
+        Returns the number of events written from a send lane and their total
+        seconds from send() to the socket, without building get_send_stats().
+
+        :param lane: One of SEND_LANES.
+        :return: (events written, total latency in seconds)
+        """
+        stats = self._send_stats[lane]
+        return stats["sent"], stats["latency_total"]
+
+    def _generate_id(self, prefix):
+        """
+        Generates a unique event or item ID from a random per-instance salt and a
+        monotonic counter, so IDs never collide however many events are sent per
+        millisecond, and do not repeat across clients or restarts.
+
+        :param prefix: A prefix string (e.g. "evt_", "item_").
+        :return: A string ID.
+        """
+        return f"{prefix}{self._id_salt}_{next(self._id_counter)}"
+
+    async def disconnect(self):
+        """
+        Closes the WebSocket connection and sets internal state to None.
+        """
+        if self._writer_task:
+            self._writer_task.cancel()
+            self._writer_task = None
+        self._reset_send_queue()
+        if self.ws:
+            # Cleared first, so the receive loop knows the close was requested
+            ws, self.ws = self.ws, None
+            await ws.close()
+            self.log(f"Disconnected from {self.url}")
+
+    def _on_connection_lost(self, ws, error):
+        """
+        Tear down after the socket closed without disconnect() and tell subscribers.
+        """
+        self.ws = None
+        if self._writer_task:
+            self._writer_task.cancel()
+            self._writer_task = None
+        self._reset_send_queue()
+        logger.warning(
+            "Realtime connection closed (code %s, %s)", ws.close_code, ws.close_reason
+        )
+        self.dispatch(
+            "close",
+            {
+                "type": "close",
+                "error": error is not None,
+                "code": ws.close_code,
+                "reason": ws.close_reason,
+            },
+        )
+
+
+class RealtimeSessionPool:
+    """
+    A process-wide pool of pre-connected RealtimeAPI sessions.
+
+    Pooled sessions have their WebSocket open and, once a session config is
+    known, a session.update already sent, so leasing one skips the TLS
+    handshake, the token and the configuration round trip. A pooled session's
+    server events stay unread on the socket and the events it dispatches are
+    held, until the client that leases it starts the receive loop in its own
+    task, so handlers never run in the context of the chat that started the
+    pool. Sessions idle longer than max_idle or closed by the server are
+    discarded, and the pool refills in the background after every lease.
+    """
+
+    def __init__(
+        self,
+        size=2,
+        session_config=None,
+        max_idle=240.0,
+        ping_after=30.0,
+        ping_timeout=1.0,
+        check_interval=15.0,
+        retry_delay=5.0,
+        api_factory=None,
+    ):
+        """
+        :param size: Number of idle sessions to keep ready.
+        :param session_config: Session object to pre-configure sessions with.
+            Also set by start() and lease().
+        :param max_idle: Seconds a session may wait in the pool.
+        :param ping_after: Seconds idle after which a lease pings the session first.
+        :param ping_timeout: Seconds to wait for that pong.
+        :param check_interval: Seconds between sweeps for closed sessions.
+        :param retry_delay: Seconds before retrying a failed connect.
+        :param api_factory: Callable returning a new RealtimeAPI.
+        """
+        self.size = size
+        self.session_config = session_config
+        self.max_idle = max_idle
+        self.ping_after = ping_after
+        self.ping_timeout = ping_timeout
+        self.check_interval = check_interval
+        self.retry_delay = retry_delay
+        self.api_factory = api_factory or RealtimeAPI
+        # (realtime, pooled_at, session_config), oldest first
+        self._idle = deque()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.counters = {
+            "leased": 0,
+            "missed": 0,
+            "expired": 0,
+            "unhealthy": 0,
+            "failed": 0,
+        }
+
+    def start(self, session_config=None):
+        """
+        Start filling the pool in the background. Safe to call repeatedly.
+
+        :param session_config: Optional session object for new pooled sessions.
+        """
+        if session_config is not None:
+            self.session_config = session_config
+        if self._task is None or self._task.done():
+            # A fresh context, so the pool does not keep the caller's context alive
+            self._task = asyncio.create_task(
+                self._maintain(), context=contextvars.Context()
+            )
+
+    async def lease(self, session_config=None):
+        """
+        Take a healthy session out of the pool and trigger a refill.
+
+        :param session_config: The session object the caller will use; new
+            pooled sessions are pre-configured with it.
+        :return: (RealtimeAPI, session object it was configured with, or None),
+            or None if no session is ready. Held events are released by the caller.
+        """
+        self.start(session_config)
+        leased = None
+        while self._idle and leased is None:
+            realtime, pooled_at, pooled_config = self._idle.popleft()
+            idle = time.monotonic() - pooled_at
+            if idle > self.max_idle:
+                self.counters["expired"] += 1
+            elif not await self._is_healthy(realtime, idle):
+                self.counters["unhealthy"] += 1
+            else:
+                leased = (realtime, pooled_config)
+                continue
+            await self._discard(realtime)
+        self.counters["leased" if leased else "missed"] += 1
+        self._wakeup.set()
+        return leased
+
+    def stats(self):
+        """
+        Idle sessions and counters, for monitoring.
+        """
+        return {"idle": len(self._idle), "size": self.size, **self.counters}
+
+    async def close(self):
+        """
+        Stop refilling and disconnect every idle session.
+        """
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        while self._idle:
+            await self._discard(self._idle.popleft()[0])
+
+    async def _open(self, session_config):
+        realtime = self.api_factory()
+        realtime.hold_events()
+        await realtime.connect(receive=False)
+        if session_config is not None:
+            await realtime.send("session.update", {"session": session_config})
+        return realtime
+
+    async def _is_healthy(self, realtime, idle):
+        if not realtime.is_open():
+            return False
+        if idle < self.ping_after:
+            return True
+        try:
+            pong = await realtime.ws.ping()
+            await asyncio.wait_for(pong, self.ping_timeout)
+        except Exception:
+            return False
+        return True
+
+    async def _discard(self, realtime):
+        try:
+            await realtime.disconnect()
+        except Exception as e:
+            logger.debug("Error closing pooled session: %s", e)
+
+    async def _evict(self):
+        now = time.monotonic()
+        stale = []
+        for entry in list(self._idle):
+            realtime, pooled_at, _ = entry
+            if now - pooled_at > self.max_idle:
+                self.counters["expired"] += 1
+            elif not realtime.is_open():
+                self.counters["unhealthy"] += 1
+            else:
+                continue
+            self._idle.remove(entry)
+            stale.append(realtime)
+        for realtime in stale:
+            await self._discard(realtime)
+
+    async def _maintain(self):
+        while True:
+            await self._evict()
+            missing = self.size - len(self._idle)
+            if missing > 0:
+                session_config = self.session_config
+                results = await asyncio.gather(
+                    *(self._open(session_config) for _ in range(missing)),
+                    return_exceptions=True,
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        self.counters["failed"] += 1
+                        logger.warning("Could not open a pooled session: %s", result)
+                    else:
+                        self._idle.append((result, time.monotonic(), session_config))
+
+            self._wakeup.clear()
+            if len(self._idle) < self.size:
+                timeout = self.retry_delay
+            else:
+                oldest = self._idle[0][1] if self._idle else time.monotonic()
+                until_expiry = oldest + self.max_idle - time.monotonic()
+                timeout = max(min(self.check_interval, until_expiry), 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+class ConversationItemStore:
+    """
+    Conversation items in order, indexed by id.
+
+    Adding and looking up an item are O(1): items sit in a list of slots with
+    an id -> slot index, and a removed item leaves an empty slot behind instead
+    of shifting the ones after it. The empty slots are kept in a sorted list,
+    so reading by position maps the position to its slot with a binary search,
+    O(log n), without compacting. The slots are compacted into a new list only
+    once more than half of them are empty, so removing is O(1) amortized plus
+    an insertion into that sorted list, which never outgrows the items. Adding or
+    removing items while iterating is safe: an iterator that outlives a
+    compaction carries on over the items as they were then, like a copy would.
+
+    Every item is stamped with the wall-clock time it was added, kept
+    non-decreasing, so items can be paged by time with a binary search.
+    """
+
+    # Empty slots tolerated before a removal compacts
+    MIN_COMPACT_SLOTS = 32
+
+    def __init__(self):
+        self._slots = []
+        self._added_at = []
+        self._slot_of = {}
+        self._items = {}
+        # Sorted indexes of the empty slots
+        self._holes = []
+        # Read-only id -> item mapping, see RealtimeConversation.item_lookup
+        self.lookup = MappingProxyType(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, id):
+        return id in self._items
+
+    def __iter__(self):
+        return (item for item in self._slots if item is not None)
+
+    def __reversed__(self):
+        return (item for item in reversed(self._slots) if item is not None)
+
+    def get(self, id, default=None):
+        return self._items.get(id, default)
 
-    async def _receive_messages(self):
+    def view(self):
         """
-        Continuously listens for incoming messages on the WebSocket,
-        dispatching them through the event system.
+        Returns a read-only, live ConversationItemsView of the items.
         """
-        async for message in self.ws:
-            event = json.loads(message)
-            if event["type"] == "error":
-                logger.error("ERROR", message)
+        return ConversationItemsView(self)
 
-            self.log("received:", event)
-            self.dispatch(f"server.{event['type']}", event)
-            self.dispatch("server.*", event)
+    def add(self, item):
+        """
+        Appends an item.
 
-    async def send(self, event_name, data=None):
+        :param item: Item dict with an "id".
+        :raises Exception: If an item with the same id is already stored.
         """
-        Sends a message/event over the WebSocket to the server.
+        if item["id"] in self._items:
+            raise Exception(f'Item "{item["id"]}" already exists')
+        added_at = time.time()
+        if self._added_at and added_at < self._added_at[-1]:
+            added_at = self._added_at[-1]
+        self._slot_of[item["id"]] = len(self._slots)
+        self._slots.append(item)
+        self._added_at.append(added_at)
+        self._items[item["id"]] = item
 
-        :param event_name: The event name/type to send.
-        :param data: The event payload (must be a dictionary).
-        :raises Exception: If the WebSocket is not connected or the data is not a dictionary.
+    def remove(self, id):
         """
-        if not self.is_connected():
-            raise Exception("RealtimeAPI is not connected")
+        Removes an item by id.
 
-        data = data or {}
-        if not isinstance(data, dict):
-            raise Exception("data must be a dictionary")
+        :param id: Item ID.
+        :return: The removed item.
+        :raises Exception: If no item has that id.
+        """
+        item = self._items.pop(id, None)
+        if item is None:
+            raise Exception(f'Item "{id}" not found')
+        slot = self._slot_of.pop(id)
+        self._slots[slot] = None
+        bisect.insort(self._holes, slot)
+        empty = len(self._holes)
+        if empty > self.MIN_COMPACT_SLOTS and empty > len(self._items):
+            self._compact()
+        return item
 
-        event = {"event_id": self._generate_id("evt_"), "type": event_name, **data}
-        self.dispatch(f"client.{event_name}", event)
-        self.dispatch("client.*", event)
-        self.log("sent:", event)
+    def clear(self):
+        self._slots = []
+        self._added_at = []
+        self._slot_of.clear()
+        self._items.clear()
+        self._holes = []
+
+    def added_at(self, id):
+        """
+        Returns the time an item was added, in seconds since the epoch.
+        """
+        return self._added_at[self._slot_of[id]]
+
+    def at(self, index):
+        """
+        Returns the item at a position, or a list of items for a slice.
+        """
+        count = len(self._items)
+        if isinstance(index, slice):
+            positions = range(count)[index]
+            if positions.step == 1:
+                return self._take(positions.start, len(positions))
+            return [self._slots[self._slot_at(i)] for i in positions]
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("item index out of range")
+        return self._slots[self._slot_at(index)]
+
+    def page(self, offset=0, limit=None, since=None):
+        """
+        Returns a page of items, oldest first.
+
+        :param offset: Position of the first item; negative counts from the end,
+            so offset=-50 is the latest 50 items.
+        :param limit: Maximum number of items, or None for all.
+        :param since: Only items added at or after this time (seconds since the
+            epoch); offset then counts from the first of them.
+        :return: List of items.
+        """
+        start = 0
+        if since is not None:
+            slot = bisect.bisect_left(self._added_at, since)
+            start = slot - bisect.bisect_left(self._holes, slot)
+        count = len(self._items)
+        first = start + offset if offset >= 0 else max(count + offset, start)
+        return self._take(first, count - first if limit is None else limit)
+
+    def _slot_at(self, position):
+        # holes[j] - j items come before the j-th empty slot, so the slot of a
+        # position is past every empty slot with at most position items before it
+        holes = self._holes
+        low, high = 0, len(holes)
+        while low < high:
+            middle = (low + high) // 2
+            if holes[middle] - middle <= position:
+                low = middle + 1
+            else:
+                high = middle
+        return position + low
+
+    def _take(self, first, limit):
+        # Up to limit items from position first on
+        count = min(len(self._items) - first, limit)
+        if count <= 0:
+            return []
+        start = self._slot_at(first)
+        end = self._slot_at(first + count - 1) + 1
+        if end - start == count:
+            return self._slots[start:end]
+        return [item for item in self._slots[start:end] if item is not None]
+
+    def _compact(self):
+        # New lists, so iterators over the old ones carry on undisturbed
+        kept = [i for i, item in enumerate(self._slots) if item is not None]
+        self._slots = [self._slots[i] for i in kept]
+        self._added_at = [self._added_at[i] for i in kept]
+        self._slot_of.clear()
+        self._slot_of.update((item["id"], i) for i, item in enumerate(self._slots))
+        self._holes = []
+
+
+class ConversationItemsView(Sequence):
+    """
+    Read-only, live view of the items in a ConversationItemStore, in order.
+    Creating one copies nothing; slicing copies only the slice.
+    """
 
-        await self.ws.send(json.dumps(event))
+    __slots__ = ("_store",)
 
-    def _generate_id(self, prefix):
-        """
-        Generates a simple event or item ID using the current timestamp.
+    def __init__(self, store):
+        self._store = store
 
-        :param prefix: A prefix string (e.g. "evt_", "item_").
-        :return: A string ID.
-        """
-        return f"{prefix}{int(datetime.utcnow().timestamp() * 1000)}"
+    def __len__(self):
+        return len(self._store)
 
-    async def disconnect(self):
-        """
-        Closes the WebSocket connection and sets internal state to None.
-        """
-        if self.ws:
-            await self.ws.close()
-            self.ws = None
-            self.log(f"Disconnected from {self.url}")
+    def __getitem__(self, index):
+        return self._store.at(index)
+
+    def __iter__(self):
+        return iter(self._store)
+
+    def __reversed__(self):
+        return reversed(self._store)
+
+    def __contains__(self, item):
+        return isinstance(item, Mapping) and self._store.get(item.get("id")) is item
+
+    def __repr__(self):
+        return f"ConversationItemsView({list(self._store)!r})"
 
 
 class RealtimeConversation:
@@ -308,15 +2407,22 @@ class RealtimeConversation:
         ),
     }
 
-    def __init__(self):
+    def __init__(self, audio_format="pcm16"):
+        # Item audio and server timestamps are in the API's sample rate. G.711 output
+        # is decoded on arrival, so item audio is always stored as PCM16.
+        self.audio_format = audio_format
+        self.api_frequency = AUDIO_FORMAT_SAMPLE_RATES[audio_format]
+        # Items in order and by id; items and item_lookup are read-only live views
+        self.item_store = ConversationItemStore()
+        self.items = self.item_store.view()
+        self.item_lookup = self.item_store.lookup
         self.clear()
 
     def clear(self):
         """
         Resets internal conversation state, clearing all items, responses, and queued data.
         """
-        self.item_lookup = {}
-        self.items = []
+        self.item_store.clear()
         self.response_lookup = {}
         self.responses = []
         self.queued_speech_items = {}
@@ -326,8 +2432,9 @@ class RealtimeConversation:
     def queue_input_audio(self, input_audio):
         """
         Temporarily store an input audio buffer for association with a new user message item.
+        The audio is copied, since the input ring buffer overwrites it once it wraps.
         """
-        self.queued_input_audio = input_audio
+        self.queued_input_audio = bytes(input_audio)
 
     def process_event(self, event, *args):
         """
@@ -355,9 +2462,87 @@ class RealtimeConversation:
 
     def get_items(self):
         """
-        Get a shallow copy of the list of items in the conversation.
+        Returns a read-only, live view of the items in the conversation. Nothing
+        is copied; use list() for a snapshot, or get_items_page() for a page.
+        """
+        return self.items
+
+    def get_items_page(self, offset=0, limit=50, since=None):
+        """
+        Returns a page of the items in the conversation, oldest first.
+
+        :param offset: Position of the first item; negative counts from the end.
+        :param limit: Maximum number of items, or None for all.
+        :param since: Only items added at or after this time (seconds since the epoch).
+        :return: List of item dicts.
+        """
+        return self.item_store.page(offset, limit, since)
+
+    def get_compacted_items(self, max_items=50):
+        """
+        Returns the latest completed items in a form conversation.item.create
+        accepts, to rebuild the conversation on a new session. Audio is replaced by
+        its transcript, items without any text are left out, and function calls
+        are only kept together with their output.
+
+        :param max_items: Maximum number of items to return.
+        :return: List of item dicts, oldest first, keeping the original ids.
         """
-        return self.items[:]
+        call_ids = {}
+        for item in self.items:
+            if item["type"] in ("function_call", "function_call_output"):
+                call_ids.setdefault(item["call_id"], set()).add(item["type"])
+
+        compacted = []
+        for item in self.items:
+            if item.get("status") != "completed":
+                continue
+            if item.get("role"):
+                # A message, also when a transcription rewrote its type
+                text = item["formatted"]["transcript"] or item["formatted"]["text"]
+                if not text:
+                    continue
+                content_type = "text" if item["role"] == "assistant" else "input_text"
+                compacted.append(
+                    {
+                        "id": item["id"],
+                        "type": "message",
+                        "role": item["role"],
+                        "content": [{"type": content_type, "text": text}],
+                    }
+                )
+            elif item["type"] not in ("function_call", "function_call_output"):
+                continue
+            elif len(call_ids[item["call_id"]]) < 2:
+                continue
+            elif item["type"] == "function_call":
+                compacted.append(
+                    {
+                        "id": item["id"],
+                        "type": "function_call",
+                        "call_id": item["call_id"],
+                        "name": item["name"],
+                        "arguments": item["formatted"]["tool"]["arguments"],
+                    }
+                )
+            else:
+                compacted.append(
+                    {
+                        "id": item["id"],
+                        "type": "function_call_output",
+                        "call_id": item["call_id"],
+                        "output": item["output"],
+                    }
+                )
+
+        compacted = compacted[-max_items:] if max_items else []
+        # An output whose call fell off the front would be rejected
+        kept_calls = {i["call_id"] for i in compacted if i["type"] == "function_call"}
+        return [
+            i
+            for i in compacted
+            if i["type"] != "function_call_output" or i["call_id"] in kept_calls
+        ]
 
     # ------------------------------
     # Event Processor Implementations
@@ -368,18 +2553,21 @@ class RealtimeConversation:
         new_item = item.copy()
 
         # If this item has not been seen before, add it to the lookup
-        if new_item["id"] not in self.item_lookup:
-            self.item_lookup[new_item["id"]] = new_item
-            self.items.append(new_item)
+        if new_item["id"] not in self.item_store:
+            self.item_store.add(new_item)
 
         # Add a 'formatted' key to store different derived data
-        new_item["formatted"] = {"audio": [], "text": "", "transcript": ""}
+        new_item["formatted"] = {
+            "audio": PCMAudioStore(),
+            "text": "",
+            "transcript": "",
+        }
 
         # If there's queued speech for this item, attach it
         if new_item["id"] in self.queued_speech_items:
-            new_item["formatted"]["audio"] = self.queued_speech_items[new_item["id"]][
-                "audio"
-            ]
+            new_item["formatted"]["audio"] = PCMAudioStore(
+                [self.queued_speech_items[new_item["id"]]["audio"]]
+            )
             del self.queued_speech_items[new_item["id"]]
 
         # Accumulate any text content that was part of this item
@@ -403,7 +2591,9 @@ class RealtimeConversation:
                 new_item["status"] = "completed"
                 if self.queued_input_audio:
                     # If we had queued input audio, attach it and reset the queue
-                    new_item["formatted"]["audio"] = self.queued_input_audio
+                    new_item["formatted"]["audio"] = PCMAudioStore(
+                        [self.queued_input_audio]
+                    )
                     self.queued_input_audio = None
             else:
                 new_item["status"] = "in_progress"
@@ -431,11 +2621,11 @@ class RealtimeConversation:
         if not item:
             raise Exception(f'item.truncated: Item "{item_id}" not found')
 
-        end_index = (audio_end_ms * self.default_frequency) // 1000
+        end_index = (audio_end_ms * self.api_frequency) // 1000
 
         # Truncate transcript and audio
         item["formatted"]["transcript"] = ""
-        item["formatted"]["audio"] = item["formatted"]["audio"][:end_index]
+        item["formatted"]["audio"].truncate(end_index)
 
         return item, None
 
@@ -446,8 +2636,7 @@ class RealtimeConversation:
         if not item:
             raise Exception(f'item.deleted: Item "{item_id}" not found')
 
-        del self.item_lookup[item["id"]]
-        self.items.remove(item)
+        self.item_store.remove(item_id)
 
         return item, None
 
@@ -490,9 +2679,12 @@ class RealtimeConversation:
         speech["audio_end_ms"] = audio_end_ms
 
         if input_audio_buffer:
-            start_index = (speech["audio_start_ms"] * self.default_frequency) // 1000
-            end_index = (speech["audio_end_ms"] * self.default_frequency) // 1000
-            speech["audio"] = input_audio_buffer[start_index:end_index]
+            # Copied out of the ring buffer, which overwrites it once it wraps
+            speech["audio"] = bytes(
+                input_audio_buffer.view(
+                    speech["audio_start_ms"], speech["audio_end_ms"]
+                )
+            )
 
         return None, None
 
@@ -568,12 +2760,13 @@ class RealtimeConversation:
             logger.debug(f'response.audio.delta: Item "{item_id}" not found')
             return None, None
 
-        # Convert the base64 chunk to a bytes object
-        array_buffer = base64_to_array_buffer(delta)
-        append_values = array_buffer.tobytes()
+        # Decode once; the read-only view is shared by the store and listeners
+        append_values = base64_to_pcm16_view(delta)
+        if self.audio_format != "pcm16":
+            append_values = decode_g711(append_values, self.audio_format)
 
-        # Merge or append audio here if needed.
-        # item['formatted']['audio'] = merge_int16_arrays(item['formatted']['audio'], some_int16_buffer)
+        # Keep the assistant audio on the item; the store appends in O(1)
+        item["formatted"]["audio"].append(append_values)
 
         return item, {"audio": append_values}
 
@@ -607,6 +2800,257 @@ class RealtimeConversation:
         return item, {"arguments": delta}
 
 
+# Event type -> field holding base64 audio, stored as raw bytes by SessionRecorder
+RECORDED_AUDIO_FIELDS = {
+    "input_audio_buffer.append": "audio",
+    "response.audio.delta": "delta",
+}
+
+
+class SessionRecorder:
+    """
+    Records every client and server event of a RealtimeClient to an append-only
+    JSON lines file, for SessionReplayer.
+
+    Each line is [ms, source, event], with ms on the monotonic clock since the
+    segment started and source "c" or "s". Audio payloads (see
+    RECORDED_AUDIO_FIELDS) are not kept as base64: their raw bytes are appended
+    to a side stream and the event holds [offset, length] into it instead.
+    Server events that arrived as LazyEvent are written from their raw frame
+    unless they carry audio, so recording does not decode them. The files are
+    opened by the first event and closed by close(); every opening appends a
+    new segment, starting with a header line, so a client that connects again
+    after disconnect() keeps recording to the same file.
+    """
+
+    def __init__(self, path, audio_path=None, json_codec=None):
+        """
+        :param path: Events file, created or appended to.
+        :param audio_path: Side stream for audio, path + ".pcm" by default.
+        :param json_codec: Codec name for get_json_codec(), or None for the default.
+        """
+        self.path = path
+        self.audio_path = audio_path or path + ".pcm"
+        self.json_codec = get_json_codec(json_codec)
+        self.events = 0
+        self.audio_bytes = 0
+        self._file = None
+        self._audio = None
+
+    def open(self):
+        """
+        Opens the files and start a new segment, unless they are open already.
+        """
+        if self._file is not None:
+            return
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._audio = open(self.audio_path, "ab")
+        self._audio_offset = self._audio.tell()
+        self._started = time.monotonic()
+        self._write(
+            {
+                "recording": 1,
+                "audio": os.path.relpath(
+                    self.audio_path, os.path.dirname(os.path.abspath(self.path))
+                ),
+                "started": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+
+    def record_client(self, event):
+        self.record("c", event)
+
+    def record_server(self, event):
+        self.record("s", event)
+
+    def record(self, source, event):
+        """
+        Appends one event.
+
+        :param source: "c" for client events, "s" for server events.
+        :param event: The event dict or LazyEvent.
+        """
+        if self._file is None:
+            self.open()
+        ms = round((time.monotonic() - self._started) * 1000, 3)
+        field = RECORDED_AUDIO_FIELDS.get(event["type"])
+        if isinstance(event, LazyEvent):
+            if field is None and "\n" not in event.raw:
+                self._file.write(f'[{ms},"{source}",{event.raw}]\n')
+                self.events += 1
+                return
+            event = event.materialize()
+        if field is not None and isinstance(event.get(field), str):
+            audio = base64.b64decode(event[field])
+            self._audio.write(audio)
+            event = {**event, field: [self._audio_offset, len(audio)]}
+            self._audio_offset += len(audio)
+            self.audio_bytes += len(audio)
+        self._write([ms, source, event])
+        self.events += 1
+
+    def _write(self, record):
+        self._file.write(self.json_codec.dumps(record) + "\n")
+
+    def flush(self):
+        """
+        Writes buffered events and audio to disk.
+        """
+        if self._file is not None:
+            self._audio.flush()
+            self._file.flush()
+
+    def close(self):
+        """
+        Closes the files. Events recorded afterwards start a new segment.
+        """
+        if self._file is not None:
+            self._audio.close()
+            self._file.close()
+            self._file = self._audio = None
+
+
+class SessionReplayer:
+    """
+    Reads a SessionRecorder file back and feeds it into a RealtimeClient, a
+    RealtimeAPI or a RealtimeConversation, at the recorded pace or as fast as
+    possible.
+
+    Events are dispatched exactly as the receive loop and send() dispatch them,
+    so the target's handlers cannot tell a replay from a live session. Nothing
+    is sent to a server: a RealtimeClient that answers a replayed function call
+    fails to send the output, since it is not connected.
+    """
+
+    def __init__(self, path, audio_path=None, json_codec=None):
+        """
+        :param path: Events file written by SessionRecorder.
+        :param audio_path: Audio side stream, by default the one named in the file.
+        :param json_codec: Codec name for get_json_codec(), or None for the default.
+        """
+        self.path = path
+        self.audio_path = audio_path
+        self.json_codec = get_json_codec(json_codec)
+
+    def events(self):
+        """
+        Yields (ms, source, event) for every recorded event, with audio restored
+        to base64. Segments appended by later recorders follow on from the last
+        event of the previous one.
+
+        :return: Generator of (float, "client" or "server", dict).
+        """
+        sources = {"c": "client", "s": "server"}
+        audio, offset_ms, last_ms = None, 0.0, 0.0
+        with open(self.path, encoding="utf-8") as f:
+            try:
+                for line in f:
+                    record = self.json_codec.loads(line)
+                    if isinstance(record, dict):
+                        if audio is None:
+                            audio = open(self._get_audio_path(record), "rb")
+                        offset_ms = last_ms
+                        continue
+                    ms, source, event = record
+                    field = RECORDED_AUDIO_FIELDS.get(event["type"])
+                    if field is not None and isinstance(event.get(field), list):
+                        offset, length = event[field]
+                        audio.seek(offset)
+                        event[field] = base64.b64encode(audio.read(length)).decode(
+                            "ascii"
+                        )
+                    last_ms = offset_ms + ms
+                    yield last_ms, sources[source], event
+            finally:
+                if audio is not None:
+                    audio.close()
+
+    def _get_audio_path(self, header):
+        if self.audio_path:
+            return self.audio_path
+        return os.path.join(
+            os.path.dirname(os.path.abspath(self.path)), header["audio"]
+        )
+
+    async def replay(self, target, speed=1.0, sources=("client", "server")):
+        """
+        Feeds the recording into a target.
+
+        A RealtimeClient or RealtimeAPI gets every event dispatched as
+        "client.<type>" or "server.<type>", and replay waits for its "block"
+        subscribers like the receive loop does. A RealtimeConversation gets the
+        server events it has processors for. Recorded input audio is added to the
+        target's local input audio history, so user items get their audio as
+        they did live.
+
+        :param target: A RealtimeClient, RealtimeAPI or RealtimeConversation.
+        :param speed: Multiple of the recorded pace, or 0 for as fast as possible.
+        :param sources: Which events to replay, "client" and/or "server".
+        :return: Dict with the number of events replayed, the time taken and the
+            largest delay behind the recorded pace, in ms.
+        """
+        realtime = getattr(target, "realtime", target)
+        if isinstance(target, RealtimeClient):
+            conversation = target.conversation
+            input_audio_buffer = target.input_audio_buffer
+        elif isinstance(target, RealtimeConversation):
+            conversation = target
+            input_audio_buffer = PCMRingBuffer(target.api_frequency)
+        else:
+            conversation = input_audio_buffer = None
+        started = time.monotonic()
+        replayed = 0
+        max_lag_ms = 0.0
+        for ms, source, event in self.events():
+            if source not in sources:
+                continue
+            if speed:
+                delay = ms / speed / 1000 - (time.monotonic() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    max_lag_ms = max(max_lag_ms, -delay * 1000)
+            elif replayed % 100 == 0:
+                # Let handler workers run, as socket reads would
+                await asyncio.sleep(0)
+
+            if source == "client" and input_audio_buffer is not None:
+                self._replay_input_audio(event, input_audio_buffer, conversation)
+            if target is not conversation:
+                realtime.dispatch(f"{source}.{event['type']}", event)
+                if source == "server":
+                    for handler in realtime.paced_handlers:
+                        await handler.wait_for_capacity()
+            elif source == "server" and event["type"] in conversation.EventProcessors:
+                if event["type"] == "input_audio_buffer.speech_stopped":
+                    conversation.process_event(event, input_audio_buffer)
+                else:
+                    conversation.process_event(event)
+            replayed += 1
+        return {
+            "events": replayed,
+            "duration_ms": (time.monotonic() - started) * 1000,
+            "max_lag_ms": max_lag_ms,
+        }
+
+    def _replay_input_audio(self, event, input_audio_buffer, conversation):
+        """
+        Rebuilds the input audio history a client keeps next to what it sends.
+        """
+        if event["type"] == "input_audio_buffer.append":
+            pcm = base64_to_pcm16_view(event["audio"])
+            if conversation.audio_format != "pcm16":
+                pcm = decode_g711(pcm, conversation.audio_format)
+            input_audio_buffer.append(pcm)
+        elif event["type"] == "input_audio_buffer.commit":
+            conversation.queue_input_audio(input_audio_buffer.commit())
+
+
+# Session lifecycle, in order. Every state after "disconnected" is a milestone
+# backed by an asyncio.Event on RealtimeClient.session_events.
+SESSION_STATES = ("disconnected", "connecting", "created", "configured", "closing")
+
+
 class RealtimeClient(RealtimeEventHandler):
     """
     High-level client that coordinates the RealtimeAPI connection and
@@ -617,15 +3061,43 @@ class RealtimeClient(RealtimeEventHandler):
     'conversation' events to external listeners.
     """
 
-    def __init__(self, system_prompt: str):
+    def __init__(
+        self,
+        system_prompt: str,
+        audio_config=None,
+        session_pool=None,
+        reconnect_config=None,
+        recorder=None,
+    ):
         super().__init__()
         self.system_prompt = system_prompt
+
+        # Client-side audio pipeline settings
+        self.audio_config = {
+            # Wire format for both directions: "pcm16", "g711_ulaw" or "g711_alaw"
+            "audio_format": "pcm16",
+            # How much input audio history is kept for splicing user speech
+            "input_retention_ms": 30000,
+            # Drop silent microphone audio before it is encoded and sent
+            "vad_gate": False,
+            "vad_threshold_db": -45.0,
+            # Coalesce small chunks into frames sized from the measured send latency
+            "input_frame_min_ms": 80,
+            "input_frame_max_ms": 200,
+            "input_frame_max_latency_ms": 200,
+            **(audio_config or {}),
+        }
+        if self.audio_config["audio_format"] not in AUDIO_FORMAT_SAMPLE_RATES:
+            raise Exception(
+                f'Unsupported audio format "{self.audio_config["audio_format"]}"'
+            )
+
         self.default_session_config = {
             "modalities": ["text", "audio"],
             "instructions": self.system_prompt,
             "voice": "shimmer",
-            "input_audio_format": "pcm16",
-            "output_audio_format": "pcm16",
+            "input_audio_format": self.audio_config["audio_format"],
+            "output_audio_format": self.audio_config["audio_format"],
             "input_audio_transcription": {"model": "whisper-1"},
             "turn_detection": {"type": "server_vad"},
             "tools": [],
@@ -646,10 +3118,46 @@ class RealtimeClient(RealtimeEventHandler):
 
         # Realtime API wrapper and conversation state
         self.realtime = RealtimeAPI()
+        # Optional RealtimeSessionPool that connect() leases pre-connected sessions from
+        self.session_pool = session_pool
+        self.reconnect_config = {
+            # Reconnect when the socket drops without disconnect()
+            "enabled": True,
+            "max_attempts": 6,
+            # Exponential backoff with full jitter, in seconds
+            "initial_delay": 0.25,
+            "max_delay": 8.0,
+            # Most recent conversation items replayed on the new session
+            "max_replay_items": 50,
+            **(reconnect_config or {}),
+        }
+        self.reconnects = 0
+        # Optional SessionRecorder that every client and server event is written to
+        self.recorder = recorder
+        self._reconnect_task = None
+        self.realtime.paced_handlers.append(self)
         self.assistant = AssistantService()
-        self.conversation = RealtimeConversation()
+        self.conversation = RealtimeConversation(self.audio_config["audio_format"])
+
+        # Chainlit captures and plays audio at its configured rate, the API at the
+        # rate of the audio format (24 kHz for pcm16, 8 kHz for G.711)
+        self.input_resampler = StreamingResampler(
+            self.conversation.default_frequency, self.conversation.api_frequency
+        )
+        self.output_resampler = StreamingResampler(
+            self.conversation.api_frequency, self.conversation.default_frequency
+        )
 
         # Internal initialization
+        # One asyncio.Event per session milestone, see SESSION_STATES
+        self.session_events = {state: asyncio.Event() for state in SESSION_STATES[1:]}
+        self._session_timings = {}
+        # event_ids of session.update events not yet acknowledged by the server
+        self._pending_session_updates = deque()
+        # Every session.update sent on this connection merged, replayed on reconnect
+        self._active_session = {}
+        # Replayed items, whose conversation.item.created echoes are skipped
+        self._replayed_item_ids = set()
         self._reset_config()
         self._add_api_event_handlers()
 
@@ -657,22 +3165,112 @@ class RealtimeClient(RealtimeEventHandler):
         """
         Resets session flags and merges default session config.
         """
-        self.session_created = False
+        self._reset_session_state()
         self.tools = {}
         self.session_config = self.default_session_config.copy()
-        self.input_audio_buffer = bytearray()
+        self.input_audio_buffer = PCMRingBuffer(
+            self.conversation.api_frequency,
+            self.audio_config["input_retention_ms"],
+        )
+        self.input_vad_gate = self._create_vad_gate()
+        self.input_audio_bytes_sent = 0
+        self.input_audio_frames_sent = 0
+        # Input audio discarded while not connected, kept across sessions
+        self.input_audio_bytes_dropped = 0
+        self._dropping_input_audio = False
+        self.input_frame_ms = self.audio_config["input_frame_min_ms"]
+        self._input_send_ms = 0.0
+        # Media lane (frames written, seconds queued) at the last measurement
+        self._input_send_totals = (0, 0.0)
+        self._pending_input_audio = bytearray()
+        self._input_flush_timer = None
+        self._input_flush_task = None
+        self._input_send_lock = asyncio.Lock()
         return True
 
+    def _create_vad_gate(self):
+        """
+        Builds the optional input VAD gate, sized from the server VAD settings so the
+        server still receives its pre-roll and end-of-turn silence.
+        """
+        if not self.audio_config["vad_gate"]:
+            return None
+
+        turn_detection = {
+            **self.default_server_vad_config,
+            **(self.session_config.get("turn_detection") or {}),
+        }
+        return EnergyVADGate(
+            self.conversation.api_frequency,
+            threshold_db=self.audio_config["vad_threshold_db"],
+            prefix_padding_ms=turn_detection["prefix_padding_ms"],
+            # The API waits 500 ms of silence by default before ending a turn
+            hangover_ms=max(turn_detection["silence_duration_ms"], 500) + 300,
+        )
+
+    def get_input_audio_stats(self):
+        """
+        Returns per-session counters of input audio bytes sent to the server and
+        bytes suppressed by the VAD gate, and the bytes dropped because no
+        connection was open to send them since the client was created, all in the
+        session's input audio format (G.711 has one byte per sample, PCM16 two).
+        """
+        suppressed = self.input_vad_gate.bytes_suppressed if self.input_vad_gate else 0
+        if self.audio_config["audio_format"] != "pcm16":
+            # The gate sees PCM16 before it is encoded
+            suppressed //= 2
+        return {
+            "bytes_sent": self.input_audio_bytes_sent,
+            "frames_sent": self.input_audio_frames_sent,
+            "frame_ms": self.input_frame_ms,
+            "bytes_suppressed": suppressed,
+            "bytes_dropped": self.input_audio_bytes_dropped,
+        }
+
+    def _reset_resamplers(self):
+        """
+        Clears the resampler filter state so a new stream does not start with stale audio.
+        """
+        self.input_resampler.reset()
+        self.output_resampler.reset()
+
+    def _reset_input_audio(self):
+        """
+        Forgets local input audio state for a new server session: the input audio
+        timeline that speech_started/stopped offsets refer to, audio not yet sent,
+        the VAD gate, the resamplers and the per-session counters.
+        """
+        if self._input_flush_timer:
+            self._input_flush_timer.cancel()
+            self._input_flush_timer = None
+        self._pending_input_audio.clear()
+        self.input_audio_buffer.clear()
+        self.input_audio_bytes_sent = 0
+        self.input_audio_frames_sent = 0
+        if self.input_vad_gate:
+            self.input_vad_gate.reset()
+        self._reset_resamplers()
+        self._input_send_totals = (0, 0.0)
+        self.conversation.queued_input_audio = None
+        self.conversation.queued_speech_items.clear()
+
     def _add_api_event_handlers(self):
         """
         Registers handlers on the RealtimeAPI for both client and server events.
         """
         # Logging for all events
-        self.realtime.on("client.*", self._log_event)
+        self.realtime.on("client.*", lambda event: self._log_event(event, "client"))
         self.realtime.on("server.*", self._log_event)
+        if self.recorder:
+            self.realtime.on("client.*", self.recorder.record_client)
+            self.realtime.on("server.*", self.recorder.record_server)
 
         # Session
         self.realtime.on("server.session.created", self._on_session_created)
+        self.realtime.on("server.session.updated", self._on_session_updated)
+        self.realtime.on("client.session.update", self._on_session_update_sent)
+        self.realtime.on("server.error", self._on_session_error)
+        self.realtime.on("close", self._on_connection_closed)
 
         # Responses
         self.realtime.on("server.response.created", self._process_event)
@@ -711,20 +3309,53 @@ class RealtimeClient(RealtimeEventHandler):
     # Event Handlers
     # -----------------------------
 
-    def _log_event(self, event):
+    def _log_event(self, event, source="server"):
         """
-        Logs any realtime event as a structured dictionary, then dispatches
-        a 'realtime.event' for higher-level consumption.
+        Wraps any realtime event in a structured dictionary and dispatches it as
+        a 'realtime.event' for higher-level consumption. The record is only built
+        when something subscribes to 'realtime.event'.
         """
+        if not self.has_subscribers("realtime.event"):
+            return
         realtime_event = {
-            "time": datetime.utcnow().isoformat(),
-            "source": "client" if event["type"].startswith("client.") else "server",
+            "time": datetime.now(timezone.utc).isoformat(),
+            "source": source,
             "event": event,
         }
         self.dispatch("realtime.event", realtime_event)
 
     def _on_session_created(self, event):
-        self.session_created = True
+        self._mark_session_state("created")
+        self._check_session_configured()
+
+    def _on_session_update_sent(self, event):
+        """
+        Tracks a session.update until the server acknowledges it with session.updated.
+        """
+        self._pending_session_updates.append(event["event_id"])
+        self.session_events["configured"].clear()
+        self._active_session = {**self._active_session, **event["session"]}
+
+    def _on_session_updated(self, event):
+        if self._pending_session_updates:
+            self._pending_session_updates.popleft()
+        self._check_session_configured()
+
+    def _on_session_error(self, event):
+        """
+        Drops a rejected session.update, which is never acknowledged.
+        """
+        event_id = (event.get("error") or {}).get("event_id")
+        if event_id in self._pending_session_updates:
+            self._pending_session_updates.remove(event_id)
+            self._check_session_configured()
+
+    def _check_session_configured(self):
+        """
+        Marks the session configured once it exists and every session.update is applied.
+        """
+        if self.session_created and not self._pending_session_updates:
+            self._mark_session_state("configured")
 
     def _process_event(self, event, *args):
         """
@@ -732,6 +3363,9 @@ class RealtimeClient(RealtimeEventHandler):
         local conversation state. Dispatches 'conversation.updated' if an item changes.
         """
         item, delta = self.conversation.process_event(event, *args)
+        if delta and "audio" in delta and not self.output_resampler.passthrough:
+            # Stored item audio stays at the API rate, listeners get the playback rate
+            delta["audio"] = self.output_resampler.process(delta["audio"])
         if item:
             self.dispatch("conversation.updated", {"item": item, "delta": delta})
         return item, delta
@@ -741,6 +3375,8 @@ class RealtimeClient(RealtimeEventHandler):
         Called when the server indicates that speech has started in the audio buffer.
         """
         self._process_event(event)
+        # Playback is interrupted, so the next audio delta starts a fresh stream
+        self.output_resampler.reset()
         self.dispatch("conversation.interrupted", event)
 
     def _on_speech_stopped(self, event):
@@ -755,6 +3391,10 @@ class RealtimeClient(RealtimeEventHandler):
         Dispatches 'conversation.item.appended' if the item is new.
         Also checks if the item is 'completed' upon creation (like user messages).
         """
+        if event["item"]["id"] in self._replayed_item_ids:
+            # Echo of an item replayed after a reconnect, already in the conversation
+            self._replayed_item_ids.discard(event["item"]["id"])
+            return
         item, delta = self._process_event(event)
         self.dispatch("conversation.item.appended", {"item": item})
         if item and item["status"] == "completed":
@@ -851,6 +3491,78 @@ class RealtimeClient(RealtimeEventHandler):
         self._add_api_event_handlers()
         return True
 
+    def _reset_session_state(self):
+        """
+        Clears every session milestone, returning to the "disconnected" state.
+        """
+        for event in self.session_events.values():
+            event.clear()
+        self._session_timings = {}
+        self._pending_session_updates.clear()
+
+    def _mark_session_state(self, state):
+        """
+        Sets the milestone for a session state and records when it was first reached.
+        """
+        self.session_events[state].set()
+        self._session_timings.setdefault(state, time.monotonic())
+
+    @property
+    def session_state(self):
+        """
+        Returns the most advanced state of SESSION_STATES the session has reached.
+        """
+        for state in reversed(SESSION_STATES[1:]):
+            if self.session_events[state].is_set():
+                return state
+        return "disconnected"
+
+    @property
+    def session_created(self):
+        """
+        Returns whether the server has sent session.created on this connection.
+        """
+        return self.session_events["created"].is_set()
+
+    def get_session_timings(self):
+        """
+        Returns milliseconds from the start of connect() to each milestone reached:
+        "open" (socket open), "created", "configured" (time to ready) and "closing".
+        """
+        start = self._session_timings.get("connecting")
+        if start is None:
+            return {}
+        return {
+            name: round((timestamp - start) * 1000, 3)
+            for name, timestamp in self._session_timings.items()
+            if name != "connecting"
+        }
+
+    def get_root_session(self):
+        """
+        Returns the session object connect() sends for the root agent, e.g. to
+        pre-configure a RealtimeSessionPool.
+        """
+        root_agent = self.assistant.get_agent("root")
+        root_tools = self.assistant.get_tools_for_assistant("root")
+        return self._build_session(
+            {
+                **self.session_config,
+                "instructions": root_agent["system_message"],
+                "tools": root_tools,
+            }
+        )
+
+    def _adopt_realtime(self, realtime):
+        """
+        Switches to a RealtimeAPI leased from the session pool.
+        """
+        self.realtime.clear_event_handlers()
+        self.realtime = realtime
+        self._input_send_totals = (0, 0.0)
+        realtime.paced_handlers.append(self)
+        self._add_api_event_handlers()
+
     async def connect(self):
         """
         Establish a RealtimeAPI connection and set the root agent's
@@ -859,7 +3571,10 @@ class RealtimeClient(RealtimeEventHandler):
         if self.is_connected():
             raise Exception("Already connected, use .disconnect() first")
 
-        await self.realtime.connect()
+        self._reset_session_state()
+        self._mark_session_state("connecting")
+        self._active_session = {}
+        self._replayed_item_ids.clear()
 
         # Set up the root agent and its tools
         root_agent = self.assistant.get_agent("root")
@@ -870,34 +3585,164 @@ class RealtimeClient(RealtimeEventHandler):
                 "tools": root_tools,
             }
         )
-        await self.update_session()
+        session = self._build_session()
+
+        leased = await self.session_pool.lease(session) if self.session_pool else None
+        if leased:
+            realtime, pooled_session = leased
+            self._adopt_realtime(realtime)
+            self._session_timings["open"] = time.monotonic()
+            # Replays the session.update sent while pooled, then reads the
+            # session.created/session.updated waiting on the socket in this task
+            realtime.release_held_events()
+            realtime.start_receiving()
+            configured = pooled_session == session
+        else:
+            try:
+                await self.realtime.connect()
+            except Exception:
+                self._reset_session_state()
+                raise
+            self._session_timings["open"] = time.monotonic()
+            configured = False
+
+        if not configured:
+            # Pipelined: sent before session.created arrives, the server applies it
+            # in order, so the session is ready one round trip after the socket opens
+            await self.update_session()
         return True
 
-    async def wait_for_session_created(self):
+    def _on_connection_closed(self, event):
+        """
+        Starts reconnecting when the socket dropped without disconnect().
+        """
+        self._reset_session_state()
+        if not self.reconnect_config["enabled"]:
+            return
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+            self._reconnect_task.add_done_callback(self._on_reconnect_done)
+
+    def _on_reconnect_done(self, task):
+        if not task.cancelled() and task.exception():
+            logger.error(
+                "Reconnect failed: %s",
+                "".join(traceback.format_exception(task.exception())),
+            )
+
+    async def _reconnect(self):
+        """
+        Reconnects with exponential backoff and full jitter, then restores the
+        active session config and a compacted copy of the conversation.
+        Dispatches "reconnected", or "error" once every attempt failed.
+        """
+        config = self.reconnect_config
+        started = time.monotonic()
+        delay = config["initial_delay"]
+        for attempt in range(1, config["max_attempts"] + 1):
+            await asyncio.sleep(random.uniform(0, delay))
+            delay = min(delay * 2, config["max_delay"])
+            self._reset_session_state()
+            self._mark_session_state("connecting")
+            try:
+                await self.realtime.connect()
+            except Exception as e:
+                logger.warning("Reconnect attempt %d failed: %s", attempt, e)
+                continue
+            self._session_timings["open"] = time.monotonic()
+            # The new session's audio offsets start again from 0
+            self._reset_input_audio()
+            items = await self._restore_session()
+            self.reconnects += 1
+            self.dispatch(
+                "reconnected",
+                {
+                    "attempts": attempt,
+                    "items": len(items),
+                    "recover_ms": round((time.monotonic() - started) * 1000, 3),
+                },
+            )
+            return True
+
+        self._reset_session_state()
+        self.dispatch(
+            "error",
+            {
+                "type": "error",
+                "error": {
+                    "message": f"Could not reconnect after {attempt} attempts",
+                },
+            },
+        )
+        return False
+
+    async def _restore_session(self):
+        """
+        Replays the active session.update and the compacted conversation on a
+        new connection. The session.update is pipelined like in connect().
+        """
+        self._replayed_item_ids.clear()
+        if self._active_session:
+            await self.realtime.send(
+                "session.update", {"session": self._active_session}
+            )
+        items = self.conversation.get_compacted_items(
+            self.reconnect_config["max_replay_items"]
+        )
+        for item in items:
+            self._replayed_item_ids.add(item["id"])
+            await self.realtime.send("conversation.item.create", {"item": item})
+        return items
+
+    async def wait_for_session_created(self, timeout=None):
         """
         Blocks until the session creation is acknowledged by the server.
+
+        :param timeout: Seconds to wait before raising asyncio.TimeoutError, or None.
         """
         if not self.is_connected():
             raise Exception("Not connected, use .connect() first")
+        await asyncio.wait_for(self.session_events["created"].wait(), timeout)
+        return True
+
+    async def wait_for_session_configured(self, timeout=None):
+        """
+        Waits until the session exists and the server has applied every session.update.
 
-        while not self.session_created:
-            await asyncio.sleep(0.001)
+        :param timeout: Seconds to wait before raising asyncio.TimeoutError, or None.
+        """
+        if not self.is_connected():
+            raise Exception("Not connected, use .connect() first")
+        await asyncio.wait_for(self.session_events["configured"].wait(), timeout)
         return True
 
     async def disconnect(self):
         """
         Disconnect from the RealtimeAPI and clear conversation state.
         """
-        self.session_created = False
+        self._mark_session_state("closing")
+        if self._reconnect_task:
+            # Also during backoff, when the socket is already gone
+            task, self._reconnect_task = self._reconnect_task, None
+            task.cancel()
+            if task is not asyncio.current_task():
+                # A connection the attempt just opened is closed below
+                await asyncio.gather(task, return_exceptions=True)
+        self._active_session = {}
         self.conversation.clear()
+        self._reset_input_audio()
         if self.realtime.is_connected():
             await self.realtime.disconnect()
+        if self.recorder:
+            # Reopened by the next event, if the client connects again
+            self.recorder.close()
+        self._reset_session_state()
 
     def get_turn_detection_type(self):
         """
         Returns the 'type' from the current turn detection config.
         """
-        return self.session_config.get("turn_detection", {}).get("type")
+        return (self.session_config.get("turn_detection") or {}).get("type")
 
     # -----------------------------
     # Tool Management
@@ -955,24 +3800,30 @@ class RealtimeClient(RealtimeEventHandler):
         await self.realtime.send("conversation.item.delete", {"item_id": id})
         return True
 
-    async def update_session(self, **kwargs):
+    def _build_session(self, session_config=None):
         """
-        Updates the session configuration with any kwargs provided
-        and sends the updated session to the server.
-
-        :param kwargs: Session configuration overrides.
+        Builds the session object sent with session.update from a session config.
         """
-        self.session_config.update(kwargs)
-
+        session_config = session_config or self.session_config
         # Merge session tools from self.tools plus any session-configured tools
         use_tools = [
             {**tool_def, "type": "function"}
-            for tool_def in self.session_config.get("tools", [])
+            for tool_def in session_config.get("tools", [])
         ] + [
             {**self.tools[key]["definition"], "type": "function"} for key in self.tools
         ]
+        return {**session_config, "tools": use_tools}
+
+    async def update_session(self, **kwargs):
+        """
+        Updates the session configuration with any kwargs provided
+        and sends the updated session to the server.
 
-        session = {**self.session_config, "tools": use_tools}
+        :param kwargs: Session configuration overrides.
+        """
+        self.session_config.update(kwargs)
+
+        session = self._build_session()
         if self.realtime.is_connected():
             await self.realtime.send("session.update", {"session": session})
         return True
@@ -995,7 +3846,9 @@ class RealtimeClient(RealtimeEventHandler):
             for c in content:
                 if c["type"] == "input_audio":
                     if isinstance(c["audio"], (bytes, bytearray)):
-                        c["audio"] = array_buffer_to_base64(c["audio"])
+                        c["audio"] = array_buffer_to_base64(
+                            self._to_input_audio_format(c["audio"])
+                        )
 
             await self.realtime.send(
                 "conversation.item.create",
@@ -1014,32 +3867,154 @@ class RealtimeClient(RealtimeEventHandler):
     async def append_input_audio(self, array_buffer):
         """
         Appends incoming audio data to the realtime input audio buffer.
-        Internally extends self.input_audio_buffer as well.
+        Internally records it in the self.input_audio_buffer ring as well.
+        Audio is sent in coalesced frames, see flush_input_audio().
 
-        :param array_buffer: The raw audio data as a bytearray or numpy array.
+        :param array_buffer: The raw audio data as bytes, a bytearray or a numpy array.
         """
         if len(array_buffer) > 0:
-            await self.realtime.send(
-                "input_audio_buffer.append",
-                {
-                    "audio": array_buffer_to_base64(np.array(array_buffer)),
-                },
-            )
-            self.input_audio_buffer.extend(array_buffer)
+            # One view over the incoming PCM serves both the encoder and the local buffer
+            pcm = pcm16_memoryview(array_buffer)
+            if not self.input_resampler.passthrough:
+                pcm = memoryview(self.input_resampler.process(pcm))
+            if self.input_vad_gate:
+                # Only audio that reaches the server may enter the local history,
+                # otherwise speech_started/stopped timestamps would not line up
+                pcm = memoryview(self.input_vad_gate.process(pcm))
+                if len(pcm) == 0:
+                    return True
+            self.input_audio_buffer.append(pcm)
+
+            # Coalesce chunks into frames instead of one event per chunk
+            self._pending_input_audio += pcm
+            frame_bytes = (
+                self.conversation.api_frequency * self.input_frame_ms // 1000
+            ) * 2
+            if len(self._pending_input_audio) >= frame_bytes:
+                await self.flush_input_audio()
+            else:
+                self._schedule_input_flush()
+
+        return True
 
+    async def flush_input_audio(self):
+        """
+        Sends the coalesced input audio as a single input_audio_buffer.append event
+        and adapts the frame size to how long the writer takes to put media on
+        the socket.
+
+        While the client is not connected (e.g. waiting to reconnect) the audio
+        is dropped, since a new session starts a new input audio timeline; a
+        warning is logged when dropping starts and get_input_audio_stats() counts
+        the bytes.
+        """
+        if self._input_flush_timer:
+            self._input_flush_timer.cancel()
+            self._input_flush_timer = None
+
+        async with self._input_send_lock:
+            if not self._pending_input_audio:
+                return True
+            if not self.realtime.is_connected():
+                self._drop_pending_input_audio()
+                return True
+
+            payload = self._to_input_audio_format(self._pending_input_audio)
+            audio = array_buffer_to_base64(payload)
+            frame_size = len(payload)
+            self._pending_input_audio.clear()
+
+            await self.realtime.send("input_audio_buffer.append", {"audio": audio})
+            # send() only queues the frame, the writer task measures the socket write
+            send_ms = self._measure_input_send_ms()
+            if send_ms is not None:
+                self._adapt_input_frame(send_ms)
+            self.input_audio_bytes_sent += frame_size
+            self.input_audio_frames_sent += 1
+            self._dropping_input_audio = False
         return True
 
+    def _drop_pending_input_audio(self):
+        """
+        Discards the coalesced input audio that cannot be sent, counting it in
+        the session's input audio format.
+        """
+        dropped = len(self._pending_input_audio)
+        if self.audio_config["audio_format"] != "pcm16":
+            dropped //= 2
+        self.input_audio_bytes_dropped += dropped
+        self._pending_input_audio.clear()
+        if not self._dropping_input_audio:
+            self._dropping_input_audio = True
+            logger.warning("Not connected, dropping input audio until reconnected")
+
+    def _to_input_audio_format(self, pcm):
+        """
+        Converts PCM16 input audio to the session's input audio format for the wire.
+        """
+        if self.audio_config["audio_format"] == "pcm16":
+            return pcm
+        return encode_g711(pcm, self.audio_config["audio_format"])
+
+    def _schedule_input_flush(self):
+        """
+        Makes sure buffered input audio is sent within the max latency even when
+        no further chunks arrive to fill the frame.
+        """
+        if self._input_flush_timer is None:
+            self._input_flush_timer = asyncio.get_running_loop().call_later(
+                self.audio_config["input_frame_max_latency_ms"] / 1000,
+                self._start_input_flush,
+            )
+
+    def _start_input_flush(self):
+        """
+        Sends the coalesced input audio from the flush timer, keeping a reference
+        to the task until it is done.
+        """
+        self._input_flush_task = asyncio.create_task(self.flush_input_audio())
+
+    def _measure_input_send_ms(self):
+        """
+        Returns the average time from send() to the socket of the media lane
+        writes since the previous call, in ms, or None if nothing was written.
+        """
+        sent, latency = self.realtime.get_lane_totals("media")
+        last_sent, last_latency = self._input_send_totals
+        if sent < last_sent:
+            # The connection's counters restarted
+            last_sent, last_latency = 0, 0.0
+        self._input_send_totals = (sent, latency)
+        if sent == last_sent:
+            return None
+        return (latency - last_latency) / (sent - last_sent) * 1000
+
+    def _adapt_input_frame(self, send_ms):
+        """
+        Sizes input frames so that sending one takes at most a quarter of its duration.
+        """
+        self._input_send_ms = 0.8 * self._input_send_ms + 0.2 * send_ms
+        self.input_frame_ms = min(
+            max(4 * self._input_send_ms, self.audio_config["input_frame_min_ms"]),
+            self.audio_config["input_frame_max_ms"],
+        )
+
     async def create_response(self):
         """
         Sends a request to create a new response if turn detection is off
         or any audio data has arrived. This is how the server knows it's time
         for the assistant to respond.
         """
+        # Audio still waiting to be coalesced must reach the server first
+        await self.flush_input_audio()
+
         # If turn detection is disabled and we have audio, commit the buffer first
-        if self.get_turn_detection_type() is None and len(self.input_audio_buffer) > 0:
+        if (
+            self.get_turn_detection_type() is None
+            and self.input_audio_buffer.uncommitted_bytes > 0
+        ):
             await self.realtime.send("input_audio_buffer.commit")
-            self.conversation.queue_input_audio(self.input_audio_buffer)
-            self.input_audio_buffer = bytearray()
+            self.conversation.queue_input_audio(self.input_audio_buffer.commit())
 
         # Then create the response
         await self.realtime.send("response.create")
@@ -1095,20 +4070,24 @@ class RealtimeClient(RealtimeEventHandler):
     # Awaitable Helpers
     # -----------------------------
 
-    async def wait_for_next_item(self):
+    async def wait_for_next_item(self, timeout=None):
         """
         Awaits the next newly appended item in the conversation.
 
+        :param timeout: Optional number of seconds to wait.
         :return: Dictionary with the new item under the "item" key.
+        :raises asyncio.TimeoutError: If no item is appended within timeout.
         """
-        event = await self.wait_for_next("conversation.item.appended")
+        event = await self.wait_for_next("conversation.item.appended", timeout)
         return {"item": event["item"]}
 
-    async def wait_for_next_completed_item(self):
+    async def wait_for_next_completed_item(self, timeout=None):
         """
         Awaits the next item in the conversation that is marked 'completed'.
 
+        :param timeout: Optional number of seconds to wait.
         :return: Dictionary with the completed item under the "item" key.
+        :raises asyncio.TimeoutError: If no item completes within timeout.
         """
-        event = await self.wait_for_next("conversation.item.completed")
+        event = await self.wait_for_next("conversation.item.completed", timeout)
         return {"item": event["item"]}
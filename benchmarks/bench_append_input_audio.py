@@ -0,0 +1,74 @@
+"""
+Microbenchmark for the input audio encode path of RealtimeClient.append_input_audio.
+
+Compares the previous path (np.array() wrap + tobytes() + bytearray copy) with the
+buffer-protocol path, reporting time and transient allocations per chunk.
+
+    python benchmarks/bench_append_input_audio.py [--chunk-ms 20] [--chunks 2000]
+"""
+
+import argparse
+import base64
+import time
+import tracemalloc
+
+import numpy as np
+
+from common import pcm16_chunk, use_module
+
+use_module()
+
+from realtime2 import array_buffer_to_base64, pcm16_memoryview  # noqa: E402
+
+
+def legacy_encode(chunk, history):
+    array_buffer = np.array(chunk)
+    encoded = base64.b64encode(array_buffer.tobytes()).decode("utf-8")
+    history.extend(chunk)
+    return encoded
+
+
+def buffer_encode(chunk, history):
+    pcm = pcm16_memoryview(chunk)
+    encoded = array_buffer_to_base64(pcm)
+    history.extend(pcm)
+    return encoded
+
+
+def measure(encode, chunk, count):
+    history = bytearray()
+    start = time.perf_counter_ns()
+    for _ in range(count):
+        encode(chunk, history)
+    elapsed = time.perf_counter_ns() - start
+
+    # Peak traced memory above the baseline is the transient allocation for one chunk
+    history = bytearray()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    encode(chunk, history)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return elapsed / count, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunk-ms", type=int, default=20)
+    parser.add_argument("--sample-rate", type=int, default=24000)
+    parser.add_argument("--chunks", type=int, default=2000)
+    args = parser.parse_args()
+
+    chunk = pcm16_chunk(args.sample_rate * args.chunk_ms // 1000, args.sample_rate)
+    print(f"chunk: {len(chunk)} bytes ({args.chunk_ms} ms @ {args.sample_rate} Hz)")
+    for name, encode in (("legacy", legacy_encode), ("buffer", buffer_encode)):
+        ns_per_chunk, peak = measure(encode, chunk, args.chunks)
+        print(
+            f"{name:>8}: {ns_per_chunk / 1000:8.1f} us/chunk, "
+            f"{peak:7d} bytes allocated/chunk (peak)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Throughput benchmark for the response.audio.delta decode path.
+
+Replays a stream of audio deltas through RealtimeConversation and compares it
+with the previous decode (b64decode, np.frombuffer, tobytes), with keeping the
+audio by concatenating an int16 array per delta (merge_int16_arrays) and with
+the bare memoryview decode. Every path reads the whole answer's audio once at
+the end, as a QA export would. The stream is either recorded server events (JSON lines,
+e.g. a session log) or a synthetic one with the server's typical delta sizes.
+
+    python benchmarks/bench_audio_delta.py [--events session.jsonl] [--seconds 60]
+"""
+
+import argparse
+import base64
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from common import pcm16_chunk, use_module
+
+use_module()
+
+from realtime2 import (  # noqa: E402
+    PCMAudioStore,
+    RealtimeConversation,
+    base64_to_pcm16_view,
+    merge_int16_arrays,
+)
+
+# The API sends deltas of roughly 50 to 200 ms of 24 kHz audio
+SYNTHETIC_DELTA_MS = [50, 100, 200, 150, 100]
+
+
+def synthetic_deltas(seconds, sample_rate=24000):
+    deltas = []
+    total_ms = 0
+    i = 0
+    while total_ms < seconds * 1000:
+        ms = SYNTHETIC_DELTA_MS[i % len(SYNTHETIC_DELTA_MS)]
+        chunk = pcm16_chunk(sample_rate * ms // 1000, sample_rate, seed=i)
+        deltas.append(base64.b64encode(chunk).decode("ascii"))
+        total_ms += ms
+        i += 1
+    return deltas
+
+
+def recorded_deltas(path):
+    deltas = []
+    with open(path) as f:
+        for line in f:
+            event = json.loads(line)
+            if event.get("type") == "response.audio.delta":
+                deltas.append(event["delta"])
+    return deltas
+
+
+def legacy_decode(deltas):
+    store = PCMAudioStore()
+    for delta in deltas:
+        store.append(np.frombuffer(base64.b64decode(delta), dtype=np.uint8).tobytes())
+    return bytes(store)
+
+
+def merge_decode(deltas):
+    audio = np.zeros(0, dtype=np.int16)
+    for delta in deltas:
+        chunk = np.frombuffer(base64.b64decode(delta), dtype=np.int16)
+        audio = merge_int16_arrays(audio, chunk)
+    return audio.tobytes()
+
+
+def view_decode(deltas):
+    store = PCMAudioStore()
+    for delta in deltas:
+        store.append(base64_to_pcm16_view(delta))
+    return bytes(store)
+
+
+def conversation_decode(deltas):
+    conversation = RealtimeConversation()
+    conversation.process_event(
+        {
+            "type": "conversation.item.created",
+            "item": {"id": "item_1", "type": "message", "role": "assistant"},
+        }
+    )
+    for delta in deltas:
+        conversation.process_event(
+            {
+                "type": "response.audio.delta",
+                "item_id": "item_1",
+                "content_index": 0,
+                "delta": delta,
+            }
+        )
+    return bytes(conversation.get_item("item_1")["formatted"]["audio"])
+
+
+def measure(fn, deltas, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(deltas)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    fn(deltas)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", help="JSON lines file of recorded server events")
+    parser.add_argument("--seconds", type=int, default=60, help="synthetic audio")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    deltas = (
+        recorded_deltas(args.events) if args.events else synthetic_deltas(args.seconds)
+    )
+    if not deltas:
+        raise SystemExit("No response.audio.delta events found")
+    num_bytes = sum(len(base64.b64decode(delta)) for delta in deltas)
+    audio_seconds = num_bytes / 2 / 24000
+
+    print(f"{len(deltas)} deltas, {audio_seconds:.1f} s of audio")
+    print(
+        f"{'path':>13} {'MB/s':>9} {'us/delta':>9} {'x realtime':>11} {'peak KiB':>9}"
+    )
+    paths = [
+        ("legacy", legacy_decode),
+        ("merge", merge_decode),
+        ("view", view_decode),
+        ("conversation", conversation_decode),
+    ]
+    for name, fn in paths:
+        elapsed, peak = measure(fn, deltas, args.repeat)
+        print(
+            f"{name:>13} {num_bytes / elapsed / 1e6:9.1f} "
+            f"{elapsed / len(deltas) * 1e6:9.2f} {audio_seconds / elapsed:11,.0f} "
+            f"{peak / 1024:9,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
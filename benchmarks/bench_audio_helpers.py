@@ -0,0 +1,174 @@
+"""
+Benchmark suite for the realtime2 audio helpers.
+
+Runs float_to_16bit_pcm, base64_to_array_buffer, array_buffer_to_base64 and
+merge_int16_arrays on speech-like signals at several sample rates and chunk sizes,
+and reports ns/sample, allocations and peak memory per call. Results are written
+to a JSON file so runs from different releases can be diffed; pass --baseline to
+print the change against an earlier file.
+
+    python benchmarks/bench_audio_helpers.py [--output audio_helpers.json]
+        [--baseline previous.json]
+"""
+
+import argparse
+import base64
+import json
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+
+from common import speech_signal, use_module
+
+use_module()
+
+from realtime2 import (  # noqa: E402
+    array_buffer_to_base64,
+    base64_to_array_buffer,
+    float_to_16bit_pcm,
+    merge_int16_arrays,
+)
+
+SAMPLE_RATES = [16000, 24000, 48000]
+CHUNK_MS = [10, 20, 40, 100, 200]
+
+# merge_int16_arrays appends one chunk to this much history, as a buffer would
+MERGE_HISTORY_MS = 1000
+
+
+def cases(sample_rate, chunk_ms):
+    """
+    Build (name, fn, args) for every helper on one chunk of speech.
+    """
+    num_samples = sample_rate * chunk_ms // 1000
+    floats = speech_signal(num_samples, sample_rate)
+    pcm = float_to_16bit_pcm(floats)
+    encoded = base64.b64encode(pcm).decode("ascii")
+    history = np.frombuffer(
+        float_to_16bit_pcm(speech_signal(sample_rate * MERGE_HISTORY_MS // 1000)),
+        dtype=np.int16,
+    )
+    chunk = np.frombuffer(pcm, dtype=np.int16)
+    return [
+        ("float_to_16bit_pcm", float_to_16bit_pcm, (floats,)),
+        ("base64_to_array_buffer", base64_to_array_buffer, (encoded,)),
+        ("array_buffer_to_base64", array_buffer_to_base64, (pcm,)),
+        ("merge_int16_arrays", merge_int16_arrays, (history, chunk)),
+    ]
+
+
+def time_call(fn, args, num_samples, min_samples, repeat):
+    number = max(10, min_samples // num_samples)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            fn(*args)
+        elapsed = (time.perf_counter_ns() - start) / number
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def trace_call(fn, args):
+    """
+    Peak bytes allocated during one call, and blocks still held by its result.
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = fn(*args)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+
+    stats = after.compare_to(before, "lineno")
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    return peak, blocks
+
+
+def noop():
+    return None
+
+
+def run(min_samples, repeat):
+    # Blocks the measurement itself leaves behind, subtracted from every case
+    _, overhead = trace_call(noop, ())
+    results = []
+    for sample_rate in SAMPLE_RATES:
+        for chunk_ms in CHUNK_MS:
+            num_samples = sample_rate * chunk_ms // 1000
+            for name, fn, args in cases(sample_rate, chunk_ms):
+                ns_per_call = time_call(fn, args, num_samples, min_samples, repeat)
+                peak, blocks = trace_call(fn, args)
+                results.append(
+                    {
+                        "function": name,
+                        "sample_rate": sample_rate,
+                        "chunk_ms": chunk_ms,
+                        "samples": num_samples,
+                        "ns_per_call": round(ns_per_call, 1),
+                        "ns_per_sample": round(ns_per_call / num_samples, 3),
+                        "alloc_blocks": max(blocks - overhead, 0),
+                        "peak_bytes": peak,
+                    }
+                )
+    return results
+
+
+def case_key(result):
+    return result["function"], result["sample_rate"], result["chunk_ms"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default="audio_helpers.json")
+    parser.add_argument("--baseline", help="earlier results file to compare with")
+    parser.add_argument(
+        "--min-samples", type=int, default=2_000_000, help="samples per timing run"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per case")
+    args = parser.parse_args()
+
+    results = run(args.min_samples, args.repeat)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {case_key(r): r for r in json.load(f)["results"]}
+
+    print(
+        f"{'function':>23} {'rate':>6} {'ms':>4} {'ns/sample':>10} "
+        f"{'blocks':>7} {'peak B':>9} {'vs base':>8}"
+    )
+    for result in results:
+        previous = baseline.get(case_key(result))
+        change = (
+            f"{result['ns_per_sample'] / previous['ns_per_sample'] - 1:+8.1%}"
+            if previous
+            else ""
+        )
+        print(
+            f"{result['function']:>23} {result['sample_rate']:>6} "
+            f"{result['chunk_ms']:>4} {result['ns_per_sample']:>10.3f} "
+            f"{result['alloc_blocks']:>7} {result['peak_bytes']:>9} {change}"
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Cost of RealtimeConversation item reads and deletes on a long conversation.
+
+Builds a conversation of --items items through conversation.item.created
+events, then times what a dashboard polling it does (get_items(), the latest
+page), deleting every item in random order through conversation.item.deleted,
+and the same deletes each followed by a read of the latest item.
+Compares the previous list-and-dict bookkeeping (a copy per get_items(),
+list.remove per delete) with ConversationItemStore.
+
+    python benchmarks/bench_conversation_items.py [--items 500] [--polls 10000]
+"""
+
+import argparse
+import random
+import time
+
+from common import use_module
+
+use_module()
+
+from realtime2 import RealtimeConversation  # noqa: E402
+
+
+def make_item(i):
+    return {
+        "id": f"item_{i}",
+        "type": "message",
+        "role": "user" if i % 2 == 0 else "assistant",
+        "content": [{"type": "input_text", "text": f"Message {i}"}],
+    }
+
+
+def build(num_items):
+    conversation = RealtimeConversation()
+    for i in range(num_items):
+        conversation.process_event(
+            {"type": "conversation.item.created", "item": make_item(i)}
+        )
+    return conversation
+
+
+class LegacyItems:
+    """The previous bookkeeping: a list in order plus a dict by id."""
+
+    def __init__(self, items):
+        self.items = list(items)
+        self.item_lookup = {item["id"]: item for item in items}
+
+    def get_items(self):
+        return self.items[:]
+
+    def get_latest(self, limit):
+        # Through the public API, which only offered a full copy
+        return self.get_items()[-limit:]
+
+    def delete(self, item_id):
+        item = self.item_lookup.pop(item_id)
+        self.items.remove(item)
+
+    def delete_and_read(self, item_id):
+        self.delete(item_id)
+        return self.items[-1] if self.items else None
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e9
+
+
+def timed_deletes(delete, order):
+    start = time.perf_counter()
+    for item_id in order:
+        delete(item_id)
+    return (time.perf_counter() - start) / len(order) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--polls", type=int, default=10000)
+    args = parser.parse_args()
+
+    conversation = build(args.items)
+    legacy = LegacyItems(conversation.items)
+    order = [item["id"] for item in conversation.items]
+    random.Random(0).shuffle(order)
+
+    def delete(item_id):
+        conversation.process_event(
+            {"type": "conversation.item.deleted", "item_id": item_id}
+        )
+
+    mixed = build(args.items)
+    mixed_legacy = LegacyItems(mixed.items)
+
+    def delete_and_read(item_id):
+        mixed.process_event({"type": "conversation.item.deleted", "item_id": item_id})
+        return mixed.items[-1] if mixed.items else None
+
+    rows = [
+        (
+            "get_items()",
+            timed(legacy.get_items, args.polls),
+            timed(conversation.get_items, args.polls),
+        ),
+        (
+            "latest 50",
+            timed(lambda: legacy.get_latest(50), args.polls),
+            timed(lambda: conversation.get_items_page(-50), args.polls),
+        ),
+        (
+            "delete",
+            timed_deletes(legacy.delete, order),
+            timed_deletes(delete, order),
+        ),
+        (
+            "delete+read",
+            timed_deletes(mixed_legacy.delete_and_read, order),
+            timed_deletes(delete_and_read, order),
+        ),
+    ]
+
+    print(f"{args.items} items, ns per call")
+    print(f"{'':>12} {'previous':>10} {'store':>10}")
+    for name, previous, store in rows:
+        print(f"{name:>12} {previous:10.0f} {store:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Events/sec benchmark for RealtimeEventHandler.dispatch.
+
+Registers the same subscriptions RealtimeClient does on its RealtimeAPI (one
+handler per server event type it processes plus "server.*" and "client.*"
+loggers) and replays a server event mix dominated by audio deltas. Compares the
+previous dispatcher (inspect per handler per event, a second "server.*" pass)
+with the compiled router.
+
+    python benchmarks/bench_event_router.py [--events 500000]
+"""
+
+import argparse
+import asyncio
+import inspect
+import time
+from collections import defaultdict
+
+from common import use_module
+
+use_module()
+
+from realtime2 import RealtimeEventHandler  # noqa: E402
+
+SUBSCRIBED_TYPES = [
+    "session.created",
+    "response.created",
+    "response.output_item.added",
+    "response.content_part.added",
+    "input_audio_buffer.speech_started",
+    "input_audio_buffer.speech_stopped",
+    "conversation.item.created",
+    "conversation.item.truncated",
+    "conversation.item.deleted",
+    "conversation.item.input_audio_transcription.completed",
+    "response.audio_transcript.delta",
+    "response.audio.delta",
+    "response.text.delta",
+    "response.function_call_arguments.delta",
+    "response.output_item.done",
+]
+
+# Roughly what one spoken answer looks like on the wire
+EVENT_MIX = (
+    ["response.audio.delta"] * 40
+    + ["response.audio_transcript.delta"] * 20
+    + ["response.audio.done", "response.audio_transcript.done", "rate_limits.updated"]
+    + ["response.created", "response.output_item.added", "response.output_item.done"]
+)
+
+
+class LegacyEventHandler:
+    def __init__(self):
+        self.event_handlers = defaultdict(list)
+
+    def on(self, event_name, handler):
+        self.event_handlers[event_name].append(handler)
+
+    def dispatch(self, event_name, event):
+        for handler in self.event_handlers[event_name]:
+            if inspect.iscoroutinefunction(handler):
+                asyncio.create_task(handler(event))
+            else:
+                handler(event)
+
+
+def subscribe(handler):
+    def noop(event):
+        pass
+
+    handler.on("client.*", noop)
+    handler.on("server.*", noop)
+    for event_type in SUBSCRIBED_TYPES:
+        handler.on(f"server.{event_type}", noop)
+    return handler
+
+
+def legacy_receive(handler, events):
+    for event in events:
+        handler.dispatch(f"server.{event['type']}", event)
+        handler.dispatch("server.*", event)
+
+
+def router_receive(handler, events):
+    for event in events:
+        handler.dispatch(f"server.{event['type']}", event)
+
+
+def measure(receive, handler, events):
+    receive(handler, events[:1000])
+    start = time.perf_counter()
+    receive(handler, events)
+    return len(events) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=500_000)
+    args = parser.parse_args()
+
+    events = [
+        {"type": EVENT_MIX[i % len(EVENT_MIX)], "event_id": f"evt_{i}"}
+        for i in range(args.events)
+    ]
+    unsubscribed = [{"type": "rate_limits.updated"}] * args.events
+
+    print(f"{'stream':>14} {'legacy ev/s':>13} {'router ev/s':>13} {'speedup':>8}")
+    for name, stream in [("answer mix", events), ("unsubscribed", unsubscribed)]:
+        before = measure(legacy_receive, subscribe(LegacyEventHandler()), stream)
+        after = measure(router_receive, subscribe(RealtimeEventHandler()), stream)
+        print(f"{name:>14} {before:13,.0f} {after:13,.0f} {after / before:7.1f}x")
+
+    # Without any wildcard logger, events nobody handles cost a single lookup
+    bare = RealtimeEventHandler()
+    rate = measure(router_receive, bare, unsubscribed)
+    print(f"{'no listeners':>14} {'':>13} {rate:13,.0f}")
+
+
+if __name__ == "__main__":
+    main()
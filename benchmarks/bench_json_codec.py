@@ -0,0 +1,124 @@
+"""
+Decode/encode benchmark for the RealtimeAPI JSON codecs and lazy events.
+
+Decodes a recorded session (JSON lines of server events, one frame per line) or
+a synthetic one, with every available codec, eagerly and as LazyEvent objects.
+"lazy, client reads" decodes only the event types RealtimeClient subscribes to,
+as happens when lazy_events is on. Encoding is measured on 20 ms
+input_audio_buffer.append events, the bulk of what a client sends.
+
+    python benchmarks/bench_json_codec.py [--events session.jsonl] [--seconds 60]
+
+Install orjson (pip install orjson) to include the accelerated codec.
+"""
+
+import argparse
+import base64
+import time
+
+from common import pcm16_chunk, synthetic_server_frames, use_module
+
+use_module()
+
+from realtime2 import JSON_CODECS, LazyEvent, orjson  # noqa: E402
+
+# Server events RealtimeClient reads in full; everything else only needs its type
+CLIENT_READS = {
+    "session.created",
+    "response.created",
+    "response.output_item.added",
+    "response.content_part.added",
+    "input_audio_buffer.speech_started",
+    "input_audio_buffer.speech_stopped",
+    "conversation.item.created",
+    "conversation.item.truncated",
+    "conversation.item.deleted",
+    "conversation.item.input_audio_transcription.completed",
+    "response.audio_transcript.delta",
+    "response.audio.delta",
+    "response.text.delta",
+    "response.function_call_arguments.delta",
+    "response.output_item.done",
+}
+
+
+def recorded_session(path):
+    with open(path) as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+def decode_eager(codec, frames):
+    for frame in frames:
+        codec.loads(frame)["type"]
+
+
+def decode_lazy(codec, frames):
+    for frame in frames:
+        LazyEvent(frame, codec)["type"]
+
+
+def decode_lazy_client(codec, frames):
+    for frame in frames:
+        event = LazyEvent(frame, codec)
+        if event["type"] in CLIENT_READS:
+            event.materialize()
+
+
+def encode(codec, events):
+    for event in events:
+        codec.dumps(event)
+
+
+def measure(fn, codec, data, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(codec, data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", help="JSON lines file of recorded server events")
+    parser.add_argument("--seconds", type=int, default=60, help="synthetic session")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frames = (
+        recorded_session(args.events)
+        if args.events
+        else synthetic_server_frames(args.seconds)
+    )
+    num_bytes = sum(len(frame) for frame in frames)
+    appends = [
+        {
+            "event_id": f"evt_{i}",
+            "type": "input_audio_buffer.append",
+            "audio": base64.b64encode(pcm16_chunk(480, seed=i)).decode("ascii"),
+        }
+        for i in range(3000)
+    ]
+
+    codecs = [name for name in JSON_CODECS if name != "orjson" or orjson]
+    print(f"{len(frames)} frames, {num_bytes / 1e6:.1f} MB")
+    print(f"{'codec':>7} {'mode':>20} {'frames/s':>12} {'MB/s':>8}")
+    for name in codecs:
+        codec = JSON_CODECS[name]()
+        for mode, fn in [
+            ("eager", decode_eager),
+            ("lazy, type only", decode_lazy),
+            ("lazy, client reads", decode_lazy_client),
+        ]:
+            elapsed = measure(fn, codec, frames, args.repeat)
+            print(
+                f"{name:>7} {mode:>20} {len(frames) / elapsed:12,.0f} "
+                f"{num_bytes / elapsed / 1e6:8.1f}"
+            )
+        elapsed = measure(encode, codec, appends, args.repeat)
+        print(f"{name:>7} {'encode append':>20} {len(appends) / elapsed:12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
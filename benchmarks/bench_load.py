@@ -0,0 +1,143 @@
+"""
+Load and latency benchmark for concurrent RealtimeClient sessions.
+
+Starts mock_realtime_server.py in-process with a model delay before the first
+delta and audio paced like the real service, then runs a number of clients
+side by side. Each one takes turns: it sends a second of user audio, commits
+it and asks for a response, which first calls a tool (the client runs it and
+asks for another response) and then answers with audio. Reports the time from
+create_response() to the first audio of the answer and to the end of the
+answer, and the CPU used per turn by clients and server together.
+
+    python benchmarks/bench_load.py [--clients 20] [--turns 3] [--no-tool]
+        [--first-delta-ms 300] [--reply-ms 20] [--jitter-ms 10] [--speed 1]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from common import BENCH_ROOT_AGENT, pcm16_chunk, register_root_agent, use_module
+from mock_realtime_server import MockRealtimeServer
+
+use_module()
+
+from realtime2 import RealtimeClient  # noqa: E402
+
+ORDER_TOOL = {
+    "name": "get_order_status",
+    "description": "Look up the status of an order.",
+    "parameters": {
+        "type": "object",
+        "properties": {"order_id": {"type": "string"}},
+    },
+    "returns": lambda arguments: {"order_id": arguments["order_id"], "eta": "2 days"},
+}
+
+ANSWER = {
+    "transcript": "Your order is on its way and should arrive in two days.",
+    "audio_ms": 3000,
+}
+
+
+async def run_client(args, chunks):
+    client = RealtimeClient(system_prompt="")
+    register_root_agent(client.assistant, {**BENCH_ROOT_AGENT, "tools": [ORDER_TOOL]})
+    await client.update_session(turn_detection=None)
+    await client.connect()
+    await client.wait_for_session_configured(timeout=30)
+
+    first_audio = None
+    answered = asyncio.Event()
+
+    def on_updated(event):
+        nonlocal first_audio
+        if first_audio is None and "audio" in (event["delta"] or {}):
+            first_audio = time.perf_counter()
+
+    def on_response_done(event):
+        if any(item["type"] == "message" for item in event["response"]["output"]):
+            answered.set()
+
+    client.on("conversation.updated", on_updated)
+    client.realtime.on("server.response.done", on_response_done)
+
+    turns = []
+    for _ in range(args.turns):
+        for chunk in chunks:
+            await client.append_input_audio(chunk)
+        first_audio = None
+        answered.clear()
+        started = time.perf_counter()
+        await client.create_response()
+        await asyncio.wait_for(answered.wait(), 60)
+        turns.append(
+            {
+                "first_audio": (first_audio - started) * 1000,
+                "answered": (time.perf_counter() - started) * 1000,
+            }
+        )
+    await client.disconnect()
+    return turns
+
+
+def summarize(turns):
+    print(f"{'ms to':>12} {'median':>9} {'p95':>9} {'max':>9}")
+    for name in ["first_audio", "answered"]:
+        values = sorted(t[name] for t in turns)
+        p95 = values[min(int(len(values) * 0.95), len(values) - 1)]
+        print(
+            f"{name:>12} {statistics.median(values):9.1f} {p95:9.1f} {values[-1]:9.1f}"
+        )
+
+
+async def bench(args):
+    tool_call = {"function_call": {"arguments": {"order_id": "A1234"}}}
+    server = await MockRealtimeServer(
+        reply_ms=args.reply_ms,
+        jitter_ms=args.jitter_ms,
+        first_delta_ms=args.first_delta_ms,
+        speed=args.speed,
+        script=[ANSWER] if args.no_tool else [tool_call, ANSWER],
+        seed=0,
+    ).start()
+    os.environ["AZURE_OPENAI_ENDPOINT"] = server.url
+    os.environ["AZURE_OPENAI_API_KEY"] = "mock"
+    os.environ.setdefault("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-realtime-preview")
+
+    # One second of user audio per turn, in the 100 ms chunks Chainlit delivers
+    chunks = [pcm16_chunk(2400, seed=i) for i in range(10)]
+    cpu = time.process_time()
+    results = await asyncio.gather(
+        *(run_client(args, chunks) for _ in range(args.clients))
+    )
+    cpu = time.process_time() - cpu
+    turns = [turn for client_turns in results for turn in client_turns]
+
+    summarize(turns)
+    print(
+        f"\n{args.clients} clients, {len(turns)} turns, "
+        f"CPU {cpu * 1000 / len(turns):.1f} ms per turn"
+    )
+    print(f"server: {server.counters}")
+    await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--no-tool", action="store_true", help="answer without a tool")
+    parser.add_argument("--first-delta-ms", type=float, default=300)
+    parser.add_argument("--reply-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument(
+        "--speed", type=float, default=1, help="audio pace, 0 for unpaced"
+    )
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
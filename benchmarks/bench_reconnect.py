@@ -0,0 +1,117 @@
+"""
+Time-to-recover benchmark for RealtimeClient's automatic reconnect.
+
+Starts mock_realtime_server.py in-process, connects a client and builds up a
+conversation, then repeatedly drops the connection without a close frame (and
+optionally rejects the first handshakes after each drop). Reports how many
+attempts the reconnect took, when the session config and the compacted
+conversation had been replayed, and when the session was configured again.
+
+    python benchmarks/bench_reconnect.py [--trials 20] [--items 40] [--reject 0]
+        [--handshake-ms 150] [--reply-ms 20]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from common import register_root_agent, use_module
+from mock_realtime_server import MockRealtimeServer
+
+use_module()
+
+from realtime2 import RealtimeClient  # noqa: E402
+
+
+async def build_conversation(client, num_items):
+    for i in range(num_items):
+        role = "user" if i % 2 == 0 else "assistant"
+        content_type = "input_text" if role == "user" else "text"
+        await client.create_conversation_item(
+            {
+                "type": "message",
+                "role": role,
+                "content": [{"type": content_type, "text": f"Message {i}"}],
+            }
+        )
+    while len(client.conversation.items) < num_items:
+        await asyncio.sleep(0.01)
+    # Assistant items created by the client are completed as far as replay goes
+    for item in client.conversation.items:
+        item["status"] = "completed"
+
+
+async def recover(client, server, reject):
+    reconnected = asyncio.create_task(client.wait_for_next("reconnected", 60))
+    await asyncio.sleep(0)
+    server.reject_next(reject)
+    dropped_at = time.monotonic()
+    server.drop_connections()
+    event = await reconnected
+    await client.wait_for_session_configured(timeout=10)
+    return {
+        "attempts": event["attempts"],
+        "items": event["items"],
+        "replayed": event["recover_ms"],
+        "configured": (time.monotonic() - dropped_at) * 1000,
+    }
+
+
+def summarize(results):
+    print(f"{'ms after drop':>14} {'median':>9} {'p95':>9} {'max':>9}")
+    for name in ["replayed", "configured"]:
+        values = sorted(r[name] for r in results)
+        p95 = values[min(int(len(values) * 0.95), len(values) - 1)]
+        print(
+            f"{name:>14} {statistics.median(values):9.1f} {p95:9.1f} {values[-1]:9.1f}"
+        )
+    attempts = [r["attempts"] for r in results]
+    print(
+        f"\nattempts: median {statistics.median(attempts)}, max {max(attempts)}; "
+        f"items replayed: {results[-1]['items']}"
+    )
+
+
+async def bench(args):
+    server = await MockRealtimeServer(
+        handshake_ms=args.handshake_ms, reply_ms=args.reply_ms
+    ).start()
+    os.environ["AZURE_OPENAI_ENDPOINT"] = server.url
+    os.environ["AZURE_OPENAI_API_KEY"] = "mock"
+    os.environ.setdefault("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-realtime-preview")
+
+    client = RealtimeClient(
+        system_prompt="",
+        reconnect_config={"initial_delay": args.initial_delay_ms / 1000},
+    )
+    register_root_agent(client.assistant)
+    await client.connect()
+    await client.wait_for_session_configured(timeout=10)
+    await build_conversation(client, args.items)
+
+    results = [await recover(client, server, args.reject) for _ in range(args.trials)]
+    summarize(results)
+    if len(client.conversation.items) != args.items:
+        print(f"Conversation has {len(client.conversation.items)} items after replay")
+
+    await client.disconnect()
+    await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--items", type=int, default=40)
+    parser.add_argument(
+        "--reject", type=int, default=0, help="handshakes rejected after each drop"
+    )
+    parser.add_argument("--handshake-ms", type=float, default=150)
+    parser.add_argument("--reply-ms", type=float, default=20)
+    parser.add_argument("--initial-delay-ms", type=float, default=250)
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Replay throughput of a recorded session through RealtimeClient and
+RealtimeConversation, with SessionRecorder and SessionReplayer.
+
+Replays a recording made with SessionRecorder (REALTIME_RECORD_DIR in the
+Chainlit apps), or first records a synthetic one against mock_realtime_server.py,
+as fast as possible. Reports events/s and seconds of assistant audio processed
+per second, and the size of the recording next to the same events as base64
+JSON lines. With --realtime the recording is also replayed at its recorded
+pace, reporting how far behind the replay fell.
+
+    python benchmarks/bench_replay.py [--recording session.jsonl] [--turns 10]
+        [--repeat 5] [--realtime]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+
+from common import pcm16_chunk, register_root_agent, use_module
+from mock_realtime_server import MockRealtimeServer
+
+use_module()
+
+from realtime2 import (  # noqa: E402
+    RealtimeClient,
+    RealtimeConversation,
+    SessionRecorder,
+    SessionReplayer,
+)
+
+ANSWER = {"transcript": "Here is a long answer. " * 20, "audio_ms": 5000}
+
+
+async def record_session(path, turns):
+    server = await MockRealtimeServer(script=[ANSWER], speed=10).start()
+    os.environ["AZURE_OPENAI_ENDPOINT"] = server.url
+    os.environ["AZURE_OPENAI_API_KEY"] = "mock"
+    os.environ.setdefault("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-realtime-preview")
+
+    recorder = SessionRecorder(path)
+    client = RealtimeClient(system_prompt="", recorder=recorder)
+    register_root_agent(client.assistant)
+    await client.update_session(turn_detection=None)
+    await client.connect()
+    await client.wait_for_session_configured(timeout=10)
+    for turn in range(turns):
+        for i in range(20):
+            await client.append_input_audio(pcm16_chunk(2400, seed=turn * 20 + i))
+        done = asyncio.create_task(
+            client.realtime.wait_for_next("server.response.done", 30)
+        )
+        await asyncio.sleep(0)
+        await client.create_response()
+        await done
+    await client.disconnect()
+    recorder.close()
+    await server.close()
+
+
+def describe(path):
+    replayer = SessionReplayer(path)
+    events = 0
+    audio_ms = 0.0
+    json_bytes = 0
+    for _, _, event in replayer.events():
+        events += 1
+        json_bytes += len(json.dumps(event)) + 1
+        if event["type"] == "response.audio.delta":
+            # Base64 of 24 kHz PCM16: 4 characters per 3 bytes, 48 bytes per ms
+            audio_ms += len(event["delta"]) * 3 / 4 / 48
+    recorded = os.path.getsize(path) + os.path.getsize(path + ".pcm")
+    print(
+        f"{events} events, {audio_ms / 1000:.1f} s of assistant audio; recording "
+        f"{recorded / 1024:.0f} KiB, as base64 JSON lines {json_bytes / 1024:.0f} KiB"
+    )
+    return events, audio_ms
+
+
+def make_client():
+    client = RealtimeClient(system_prompt="")
+    register_root_agent(client.assistant)
+    return client
+
+
+def close(target):
+    # Stops the handler workers of a replayed client
+    if isinstance(target, RealtimeClient):
+        target.realtime.clear_event_handlers()
+        target.clear_event_handlers()
+
+
+async def bench(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.recording
+        if not path:
+            path = os.path.join(tmp, "session.jsonl")
+            await record_session(path, args.turns)
+        events, audio_ms = describe(path)
+        replayer = SessionReplayer(path)
+
+        print(f"\n{'target':>14} {'events/s':>10} {'audio x':>9} {'ms':>9}")
+        for name, make_target in [
+            ("RealtimeClient", make_client),
+            ("Conversation", RealtimeConversation),
+        ]:
+            durations = []
+            for _ in range(args.repeat):
+                target = make_target()
+                stats = await replayer.replay(target, speed=0)
+                durations.append(stats["duration_ms"])
+                close(target)
+            duration = statistics.median(durations)
+            print(
+                f"{name:>14} {events / duration * 1000:10.0f} "
+                f"{audio_ms / duration:9.0f} {duration:9.1f}"
+            )
+
+        if args.realtime:
+            client = make_client()
+            stats = await replayer.replay(client, speed=1)
+            close(client)
+            print(
+                f"\nrecorded pace: {stats['duration_ms'] / 1000:.1f} s, "
+                f"max lag {stats['max_lag_ms']:.2f} ms"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recording", help="SessionRecorder events file")
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--realtime", action="store_true")
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Throughput benchmark for StreamingResampler.
+
+Feeds speech-like PCM through the resampler in Chainlit-sized chunks and reports
+input samples per second on a single core, which is what sizes a worker.
+
+    python benchmarks/bench_resampler.py [--chunk-ms 20] [--seconds 30]
+"""
+
+import argparse
+import time
+
+from common import pcm16_chunk, use_module
+
+use_module()
+
+from realtime2 import StreamingResampler  # noqa: E402
+
+RATE_PAIRS = [
+    (16000, 24000),
+    (44100, 24000),
+    (48000, 24000),
+    (24000, 16000),
+    (24000, 44100),
+    (24000, 48000),
+]
+
+
+def measure(input_rate, output_rate, chunk_ms, seconds):
+    chunk = pcm16_chunk(input_rate * chunk_ms // 1000, input_rate)
+    resampler = StreamingResampler(input_rate, output_rate)
+    num_chunks = seconds * 1000 // chunk_ms
+
+    start = time.process_time()
+    for _ in range(num_chunks):
+        resampler.process(chunk)
+    elapsed = time.process_time() - start
+
+    samples = num_chunks * len(chunk) // 2
+    return samples / elapsed, seconds / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunk-ms", type=int, default=20)
+    parser.add_argument("--seconds", type=int, default=30, help="audio per rate pair")
+    args = parser.parse_args()
+
+    print(f"{'conversion':>16} {'samples/s/core':>16} {'x realtime':>11}")
+    for input_rate, output_rate in RATE_PAIRS:
+        rate, realtime = measure(input_rate, output_rate, args.chunk_ms, args.seconds)
+        print(f"{input_rate:>7}->{output_rate:<8} {rate:16,.0f} {realtime:11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Time-to-ready benchmark for RealtimeClient.connect with a RealtimeSessionPool.
+
+Starts mock_realtime_server.py in-process, with a handshake delay standing in
+for TLS and token set-up and a reply delay for the network round trip. Clients
+then connect, wait until their session is configured and disconnect one after
+another, as Chainlit chats starting audio would, first without a pool and then
+with one. Reports the time from connect() to socket open and to a configured
+session.
+
+    python benchmarks/bench_session_pool.py [--sessions 20] [--pool-size 2]
+        [--handshake-ms 150] [--reply-ms 20]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+
+from common import register_root_agent, use_module
+from mock_realtime_server import MockRealtimeServer
+
+use_module()
+
+from realtime2 import RealtimeClient, RealtimeSessionPool  # noqa: E402
+
+
+def make_client(session_pool):
+    client = RealtimeClient(system_prompt="", session_pool=session_pool)
+    register_root_agent(client.assistant)
+    return client
+
+
+async def run_sessions(num_sessions, session_pool, gap):
+    timings = []
+    for _ in range(num_sessions):
+        client = make_client(session_pool)
+        await client.connect()
+        await client.wait_for_session_configured(timeout=10)
+        timings.append(client.get_session_timings())
+        await client.disconnect()
+        # Time between chats starting, which the pool uses to refill
+        await asyncio.sleep(gap)
+    return timings
+
+
+def summarize(name, timings):
+    for milestone in ["open", "configured"]:
+        values = sorted(t[milestone] for t in timings)
+        p95 = values[min(int(len(values) * 0.95), len(values) - 1)]
+        print(
+            f"{name:>8} {milestone:>11} {statistics.median(values):9.1f} "
+            f"{p95:9.1f} {values[-1]:9.1f}"
+        )
+
+
+async def bench(args):
+    server = await MockRealtimeServer(
+        handshake_ms=args.handshake_ms, reply_ms=args.reply_ms
+    ).start()
+    os.environ["AZURE_OPENAI_ENDPOINT"] = server.url
+    os.environ["AZURE_OPENAI_API_KEY"] = "mock"
+    os.environ.setdefault("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-realtime-preview")
+
+    print(f"{'':>8} {'ms to':>11} {'median':>9} {'p95':>9} {'max':>9}")
+    summarize("fresh", await run_sessions(args.sessions, None, args.gap_ms / 1000))
+
+    session_pool = RealtimeSessionPool(args.pool_size)
+    session_pool.start(make_client(None).get_root_session())
+    await asyncio.sleep(args.gap_ms / 1000)
+    summarize(
+        "pooled", await run_sessions(args.sessions, session_pool, args.gap_ms / 1000)
+    )
+    print(f"\npool: {session_pool.stats()}, connections: {server.connections}")
+
+    await session_pool.close()
+    await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--handshake-ms", type=float, default=150)
+    parser.add_argument("--reply-ms", type=float, default=20)
+    parser.add_argument("--gap-ms", type=float, default=500)
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Bytes on the wire, CPU and latency of RealtimeAPI for each transport profile.
+
+Runs mock_realtime_server.py in a subprocess, replaying a recorded session
+(JSON lines of server events) or synthetic audio and text sessions for every
+response.create, and connects RealtimeAPI through a local TCP proxy that counts
+the bytes in each direction. Every response is preceded by the input audio a
+user would send for it. CPU is this process's time: the client plus the
+proxy, which only copies bytes.
+
+    python benchmarks/bench_transport.py [--events session.jsonl]
+        [--profiles default,audio,text] [--responses 5]
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import socket
+import sys
+import tempfile
+import time
+
+from common import pcm16_chunk, synthetic_server_frames, use_module
+from mock_realtime_server import load_replay
+
+use_module()
+
+from realtime2 import TRANSPORT_PROFILES, RealtimeAPI  # noqa: E402
+
+MOCK_SERVER = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "mock_realtime_server.py"
+)
+
+# Input audio sent before every response, in 100 ms frames
+INPUT_SECONDS = 3
+
+
+class CountingProxy:
+    """
+    TCP proxy that counts the bytes sent up to the server and down to the client.
+    """
+
+    def __init__(self, target_port):
+        self.target_port = target_port
+        self.up = 0
+        self.down = 0
+        self.port = None
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "localhost", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, client_reader, client_writer):
+        server_reader, server_writer = await asyncio.open_connection(
+            "localhost", self.target_port
+        )
+        await asyncio.gather(
+            self._pipe(client_reader, server_writer, "up"),
+            self._pipe(server_reader, client_writer, "down"),
+        )
+
+    async def _pipe(self, reader, writer, direction):
+        try:
+            while data := await reader.read(65536):
+                setattr(self, direction, getattr(self, direction) + len(data))
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+async def start_server(frames):
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+        f.write("\n".join(frames))
+    port = free_port()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        MOCK_SERVER,
+        "--port",
+        str(port),
+        "--replay",
+        f.name,
+        stdout=asyncio.subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection("localhost", port)
+            writer.close()
+            break
+        except OSError:
+            await asyncio.sleep(0.05)
+    return process, port, f.name
+
+
+async def run_profile(profile, frames, responses, proxy):
+    api = RealtimeAPI(transport_profile=profile)
+    received = 0
+    first_frame = None
+    done = asyncio.Event()
+
+    def on_event(event):
+        nonlocal received, first_frame
+        received += 1
+        if first_frame is None:
+            first_frame = time.perf_counter()
+        if received == len(frames):
+            done.set()
+
+    appends = [
+        base64.b64encode(pcm16_chunk(2400, seed=i)).decode("ascii")
+        for i in range(INPUT_SECONDS * 10)
+    ]
+    created = asyncio.create_task(api.wait_for_next("server.session.created", 10))
+    await asyncio.sleep(0)
+    await api.connect()
+    await created
+
+    proxy.up = proxy.down = 0
+    cpu = time.process_time()
+    first_ms = []
+    done_ms = []
+    api.on("server.*", on_event)
+    for _ in range(responses):
+        for audio in appends:
+            await api.send("input_audio_buffer.append", {"audio": audio})
+        received, first_frame = 0, None
+        done.clear()
+        started = time.perf_counter()
+        await api.send("response.create")
+        await asyncio.wait_for(done.wait(), 60)
+        first_ms.append((first_frame - started) * 1000)
+        done_ms.append((time.perf_counter() - started) * 1000)
+    cpu = time.process_time() - cpu
+    await api.disconnect()
+    return {
+        "up": proxy.up / responses,
+        "down": proxy.down / responses,
+        "cpu_ms": cpu * 1000 / responses,
+        "first_ms": sorted(first_ms)[len(first_ms) // 2],
+        "done_ms": sorted(done_ms)[len(done_ms) // 2],
+    }
+
+
+async def bench(args):
+    sessions = (
+        [("recorded", load_replay(args.events))]
+        if args.events
+        else [
+            ("audio", synthetic_server_frames(5)),
+            ("text", synthetic_server_frames(5, text_only=True)),
+        ]
+    )
+    profiles = args.profiles.split(",")
+    os.environ["AZURE_OPENAI_API_KEY"] = "mock"
+    os.environ.setdefault("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-realtime-preview")
+
+    print(
+        f"{'session':>8} {'profile':>8} {'KiB up':>9} {'KiB down':>9} "
+        f"{'CPU ms':>8} {'first ms':>9} {'done ms':>8}"
+    )
+    for name, frames in sessions:
+        process, port, path = await start_server(frames)
+        proxy = await CountingProxy(port).start()
+        os.environ["AZURE_OPENAI_ENDPOINT"] = f"ws://localhost:{proxy.port}"
+        try:
+            for profile in profiles:
+                result = await run_profile(profile, frames, args.responses, proxy)
+                print(
+                    f"{name:>8} {profile:>8} {result['up'] / 1024:9.1f} "
+                    f"{result['down'] / 1024:9.1f} {result['cpu_ms']:8.1f} "
+                    f"{result['first_ms']:9.2f} {result['done_ms']:8.1f}"
+                )
+        finally:
+            await proxy.close()
+            process.terminate()
+            await process.wait()
+            os.unlink(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", help="JSON lines file of recorded server events")
+    parser.add_argument("--profiles", default=",".join(TRANSPORT_PROFILES))
+    parser.add_argument("--responses", type=int, default=5)
+    asyncio.run(bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
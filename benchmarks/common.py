@@ -0,0 +1,156 @@
+"""Shared helpers for the benchmark scripts in this folder."""
+
+import base64
+import json
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_MODULE = "02-building-multi-agent-system"
+
+
+def use_module(module_dir=None):
+    """
+    Make a workshop module's realtime2.py importable.
+
+    Uses the current directory when it contains realtime2.py (so the Chainlit
+    config of that module is picked up), then the REALTIME_MODULE environment
+    variable, then the multi-agent module.
+
+    :param module_dir: Optional explicit module directory.
+    :return: The absolute path that was added to sys.path.
+    """
+    if module_dir is None:
+        if os.path.exists(os.path.join(os.getcwd(), "realtime2.py")):
+            module_dir = os.getcwd()
+        else:
+            module_dir = os.environ.get("REALTIME_MODULE", DEFAULT_MODULE)
+    path = os.path.abspath(os.path.join(REPO_ROOT, module_dir))
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    return path
+
+
+# Root agent for benchmarks that connect a RealtimeClient to the mock server
+BENCH_ROOT_AGENT = {
+    "id": "Bench_Root",
+    "name": "Benchmark",
+    "description": "Root agent for the connection benchmarks.",
+    "system_message": "You are a helpful assistant.",
+    "tools": [],
+}
+
+
+def register_root_agent(assistant, agent=None):
+    """
+    Register a root agent with either module's AssistantService.
+
+    The multi-agent module registers its root agent separately, the function
+    calling module treats the last registered agent as root.
+
+    :param assistant: The AssistantService of a RealtimeClient.
+    :param agent: Agent definition, a copy of BENCH_ROOT_AGENT by default.
+    """
+    register = getattr(assistant, "register_root_agent", assistant.register_agent)
+    register(agent or dict(BENCH_ROOT_AGENT))
+
+
+def pcm16_chunk(num_samples, sample_rate=24000, seed=0):
+    """
+    Build a chunk of speech-like 16-bit PCM bytes, as Chainlit hands them over.
+
+    :param num_samples: Number of samples in the chunk.
+    :param sample_rate: Sample rate used to shape the signal.
+    :param seed: Seed for the noise component.
+    :return: bytes of little-endian int16 samples.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(num_samples) / sample_rate
+    signal = 0.3 * np.sin(2 * np.pi * 180 * t) + 0.05 * rng.standard_normal(num_samples)
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16).tobytes()
+
+
+def speech_signal(num_samples, sample_rate=24000, seed=0):
+    """
+    Build a speech-like float32 signal in [-1, 1].
+
+    A 120 Hz voice with a few decaying harmonics, gated by a 4 Hz syllable
+    envelope and mixed with a little noise, so silence and loud passages both
+    show up in every chunk longer than a syllable.
+
+    :param num_samples: Number of samples.
+    :param sample_rate: Sample rate used to shape the signal.
+    :param seed: Seed for the noise component.
+    :return: numpy float32 array.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(num_samples) / sample_rate
+    voice = sum(
+        np.sin(2 * np.pi * 120 * k * t) / k
+        for k in range(1, 6)
+        if 120 * k < sample_rate / 2
+    )
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 2
+    signal = 0.4 * envelope * voice + 0.01 * rng.standard_normal(num_samples)
+    return np.clip(signal, -1, 1).astype(np.float32)
+
+
+def synthetic_server_frames(seconds, text_only=False):
+    """
+    Build the server frames of a session with answers of about 5 s each.
+
+    Every answer has audio deltas of 100 ms with transcript deltas, and the
+    bookkeeping events around a response. With text_only, answers are text
+    deltas followed by a function call instead, which compress very differently
+    from base64 audio.
+
+    :param seconds: Length of the session in seconds of answers.
+    :param text_only: Build text answers instead of audio ones.
+    :return: List of JSON strings, one per frame.
+    """
+    delta = base64.b64encode(pcm16_chunk(2400)).decode("ascii")
+    frames = []
+    for answer in range(max(seconds // 5, 1)):
+        ids = {"response_id": f"resp_{answer}", "item_id": f"item_{answer}"}
+        part = {**ids, "output_index": 0, "content_index": 0}
+        frames.append(
+            {"type": "response.created", "response": {"id": ids["response_id"]}}
+        )
+        frames.append({"type": "rate_limits.updated", "rate_limits": []})
+        for i in range(50):
+            if text_only:
+                frames.append({"type": "response.text.delta", **part, "delta": "word "})
+                continue
+            frames.append({"type": "response.audio.delta", **part, "delta": delta})
+            frames.append(
+                {"type": "response.audio_transcript.delta", **part, "delta": "word "}
+            )
+        if text_only:
+            arguments = json.dumps(
+                {"customer_id": f"C{answer:05d}", "service": "internet"}
+            )
+            for i in range(0, len(arguments), 8):
+                frames.append(
+                    {
+                        "type": "response.function_call_arguments.delta",
+                        **ids,
+                        "output_index": 1,
+                        "call_id": f"call_{answer}",
+                        "delta": arguments[i : i + 8],
+                    }
+                )
+        done_types = (
+            ["response.text.done"]
+            if text_only
+            else ["response.audio.done", "response.audio_transcript.done"]
+        )
+        for done in [*done_types, "response.content_part.done", "response.done"]:
+            frames.append({"type": done, **ids})
+    return [
+        json.dumps({"event_id": f"event_{i}", **frame})
+        for i, frame in enumerate(frames)
+    ]
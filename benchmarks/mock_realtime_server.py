@@ -0,0 +1,784 @@
+"""
+Local stand-in for the Azure OpenAI Realtime WebSocket endpoint.
+
+Speaks the part of the event protocol RealtimeClient handles, so clients can be
+load and latency tested offline:
+
+- session.created on connect, session.update answered with session.updated
+- input audio buffers: append, commit and clear, with speech_started/stopped
+  and an automatic commit and response after --turn-ms of audio when the
+  session uses server_vad, and input transcriptions when they are configured
+- conversation items: create, truncate (checked against the audio sent for
+  the item) and delete
+- response.create runs the next scripted response: an assistant message with
+  audio and transcript deltas (text deltas for text-only sessions) or a
+  function call with argument deltas, paced like the real service; and
+  response.cancel ends it early as cancelled
+- errors for unknown events, unknown items and invalid requests, with the
+  client event_id
+
+Latency and faults can be injected: a handshake delay (TLS and token set-up
+against Azure), a delay plus jitter before every reply (a network round trip),
+a delay before the first delta of a response (model latency), errors instead
+of replies, connections dropped without a close frame in the middle of
+responses or on demand, and handshakes rejected with HTTP 503. Given a
+recorded session (JSON lines of server events), every response.create replays
+it instead.
+
+    python benchmarks/mock_realtime_server.py [--port 8765] [--handshake-ms 150]
+        [--reply-ms 20] [--jitter-ms 10] [--first-delta-ms 300] [--speed 1]
+        [--script script.json] [--turn-ms 0] [--error-rate 0] [--drop-rate 0]
+        [--drop-every-s 30] [--replay session.jsonl]
+
+A script is a JSON list of responses, used in turn and from the start again,
+for example:
+
+    [{"function_call": {"name": "get_weather", "arguments": {"city": "Oslo"}}},
+     {"transcript": "It is sunny in Oslo.", "audio_ms": 1500}]
+
+A function call without a name calls the first tool of the session.
+
+Point a module at it with AZURE_OPENAI_ENDPOINT=ws://localhost:8765 and any
+AZURE_OPENAI_API_KEY. Benchmarks start it in-process with MockRealtimeServer.
+"""
+
+import argparse
+import array
+import asyncio
+import base64
+import http
+import itertools
+import json
+import math
+import random
+
+import websockets
+
+DEFAULT_SESSION = {
+    "object": "realtime.session",
+    "model": "gpt-4o-realtime-preview",
+    "modalities": ["text", "audio"],
+    "instructions": "",
+    "voice": "alloy",
+    "input_audio_format": "pcm16",
+    "output_audio_format": "pcm16",
+    "input_audio_transcription": None,
+    "turn_detection": {"type": "server_vad"},
+    "tools": [],
+}
+
+DEFAULT_SCRIPT = [
+    {"transcript": "Sure, I can help you with that. Let me take a look for you."}
+]
+
+# Transcript of every committed user turn, when transcription is configured
+USER_TRANSCRIPT = "Hello, can you help me with my order?"
+
+# Bytes per millisecond of audio in each session audio format
+AUDIO_BYTES_PER_MS = {"pcm16": 48, "g711_ulaw": 8, "g711_alaw": 8}
+
+# Spoken length of a scripted answer without audio_ms, per word
+MS_PER_WORD = 300
+
+# Characters per function_call_arguments.delta
+ARGUMENTS_CHUNK = 8
+
+
+class MockRealtimeServer:
+    def __init__(
+        self,
+        host="localhost",
+        port=0,
+        handshake_ms=0,
+        reply_ms=0,
+        replay=None,
+        script=None,
+        chunk_ms=100,
+        speed=0,
+        tokens_per_s=0,
+        first_delta_ms=0,
+        turn_ms=0,
+        jitter_ms=0,
+        error_rate=0.0,
+        drop_rate=0.0,
+        seed=None,
+    ):
+        """
+        :param host: Interface to listen on.
+        :param port: Port to listen on, 0 for any free port.
+        :param handshake_ms: Delay before accepting each WebSocket handshake.
+        :param reply_ms: Delay before replying to a client event.
+        :param replay: Server frames (JSON strings) sent for every response.create.
+        :param script: Responses used in turn, see the module docstring.
+        :param chunk_ms: Audio per response.audio.delta.
+        :param speed: Pace of audio deltas as a multiple of real time, 0 for
+            as fast as possible.
+        :param tokens_per_s: Pace of text, transcript-only and argument deltas,
+            0 for as fast as possible.
+        :param first_delta_ms: Delay between response.created and the first delta.
+        :param turn_ms: Input audio after which a server_vad session commits the
+            buffer and responds, 0 to leave turns to the client.
+        :param jitter_ms: Random extra delay of up to this much on every reply.
+        :param error_rate: Share of client events answered with an error instead.
+        :param drop_rate: Share of responses whose connection is dropped halfway.
+        :param seed: Seed for the injected jitter and faults.
+        """
+        self.host = host
+        self.port = port
+        self.handshake_ms = handshake_ms
+        self.reply_ms = reply_ms
+        self.replay = replay or []
+        self.script = script or DEFAULT_SCRIPT
+        self.chunk_ms = chunk_ms
+        self.speed = speed
+        self.tokens_per_s = tokens_per_s
+        self.first_delta_ms = first_delta_ms
+        self.turn_ms = turn_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.connections = 0
+        self.counters = {
+            "events_received": 0,
+            "events_sent": 0,
+            "responses": 0,
+            "cancelled": 0,
+            "errors": 0,
+            "injected_errors": 0,
+            "drops": 0,
+        }
+        # Handshakes still to be rejected, see reject_next()
+        self.rejects = 0
+        self._open = set()
+        self._ids = itertools.count(1)
+        self._audio_deltas = {}
+        self._server = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await websockets.serve(
+            self._handle,
+            self.host,
+            self.port,
+            process_request=self._process_request,
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def drop_connections(self):
+        """
+        Abort every open connection without a close frame, like a network failure.
+
+        :return: Number of connections dropped.
+        """
+        dropped = list(self._open)
+        for ws in dropped:
+            ws.transport.abort()
+        self.counters["drops"] += len(dropped)
+        return len(dropped)
+
+    def reject_next(self, count):
+        """
+        Answer the next count handshakes with HTTP 503.
+        """
+        self.rejects = count
+
+    def new_id(self, prefix):
+        return f"{prefix}{next(self._ids)}"
+
+    def audio_delta(self, audio_format):
+        """
+        Returns one chunk_ms audio delta in the given format, base64 encoded.
+
+        PCM16 deltas carry a quiet tone so they do not compress away, G.711
+        deltas are silence.
+        """
+        if audio_format not in self._audio_deltas:
+            if audio_format == "pcm16":
+                samples = array.array(
+                    "h",
+                    (
+                        int(6000 * math.sin(2 * math.pi * 220 * i / 24000))
+                        for i in range(24 * self.chunk_ms)
+                    ),
+                )
+                chunk = samples.tobytes()
+            else:
+                silence = b"\xff" if audio_format == "g711_ulaw" else b"\xd5"
+                chunk = silence * (8 * self.chunk_ms)
+            self._audio_deltas[audio_format] = base64.b64encode(chunk).decode("ascii")
+        return self._audio_deltas[audio_format]
+
+    async def reply_delay(self):
+        delay_ms = self.reply_ms
+        if self.jitter_ms:
+            delay_ms += self.random.uniform(0, self.jitter_ms)
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000)
+
+    async def _process_request(self, connection, request):
+        self.connections += 1
+        if self.handshake_ms:
+            await asyncio.sleep(self.handshake_ms / 1000)
+        if self.rejects:
+            self.rejects -= 1
+            return connection.respond(
+                http.HTTPStatus.SERVICE_UNAVAILABLE, "Injected failure\n"
+            )
+
+    async def _handle(self, ws):
+        connection = MockConnection(self, ws)
+        self._open.add(ws)
+        try:
+            await connection.run()
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._open.discard(ws)
+            connection.close()
+
+
+class MockConnection:
+    """
+    Session, conversation and input audio buffer of one client connection.
+    """
+
+    def __init__(self, server, ws):
+        self.server = server
+        self.ws = ws
+        self.session = {"id": server.new_id("sess_"), **DEFAULT_SESSION}
+        # Conversation items by id, in conversation order
+        self.items = {}
+        # Audio sent for each assistant item, in ms
+        self.item_audio_ms = {}
+        self.responses = 0
+        self.response_task = None
+        self.cancelled = False
+        # Input audio received since the session started, and since the last commit
+        self.input_ms = 0.0
+        self.buffer_ms = 0.0
+        self.speech_item_id = None
+
+    @property
+    def last_item_id(self):
+        return next(reversed(self.items), None)
+
+    def close(self):
+        if self.response_task:
+            self.response_task.cancel()
+
+    async def send(self, event):
+        self.server.counters["events_sent"] += 1
+        await self.ws.send(
+            json.dumps({"event_id": self.server.new_id("event_"), **event})
+        )
+
+    async def error(self, client_event, code, message, error_type=None):
+        self.server.counters["errors"] += 1
+        await self.send(
+            {
+                "type": "error",
+                "error": {
+                    "type": error_type or "invalid_request_error",
+                    "code": code,
+                    "message": message,
+                    "param": None,
+                    "event_id": client_event.get("event_id"),
+                },
+            }
+        )
+
+    async def run(self):
+        await self.server.reply_delay()
+        await self.send({"type": "session.created", "session": self.session})
+        async for message in self.ws:
+            self.server.counters["events_received"] += 1
+            event = json.loads(message)
+            handler = getattr(
+                self, "on_" + event.get("type", "").replace(".", "_"), None
+            )
+            if handler is None:
+                await self.error(
+                    event, "invalid_event", f"Unknown event type {event.get('type')!r}"
+                )
+            elif self.server.random.random() < self.server.error_rate:
+                self.server.counters["injected_errors"] += 1
+                await self.server.reply_delay()
+                await self.error(
+                    event, None, "Injected failure", error_type="server_error"
+                )
+            else:
+                await handler(event)
+
+    # -----------------------------
+    # Session
+    # -----------------------------
+
+    async def on_session_update(self, event):
+        await self.server.reply_delay()
+        self.session.update(event.get("session", {}))
+        await self.send({"type": "session.updated", "session": self.session})
+
+    # -----------------------------
+    # Input audio buffer
+    # -----------------------------
+
+    async def on_input_audio_buffer_append(self, event):
+        audio_format = self.session.get("input_audio_format") or "pcm16"
+        audio_ms = (
+            len(event.get("audio", "")) * 3 / 4 / AUDIO_BYTES_PER_MS[audio_format]
+        )
+        server_vad = (self.session.get("turn_detection") or {}).get(
+            "type"
+        ) == "server_vad"
+        if server_vad and self.speech_item_id is None and audio_ms:
+            self.speech_item_id = self.server.new_id("item_")
+            await self.send(
+                {
+                    "type": "input_audio_buffer.speech_started",
+                    "audio_start_ms": int(self.input_ms),
+                    "item_id": self.speech_item_id,
+                }
+            )
+        self.input_ms += audio_ms
+        self.buffer_ms += audio_ms
+        if server_vad and self.server.turn_ms and self.buffer_ms >= self.server.turn_ms:
+            await self.server.reply_delay()
+            await self.send(
+                {
+                    "type": "input_audio_buffer.speech_stopped",
+                    "audio_end_ms": int(self.input_ms),
+                    "item_id": self.speech_item_id,
+                }
+            )
+            await self.commit()
+            if not self.response_task:
+                self.start_response({})
+
+    async def on_input_audio_buffer_commit(self, event):
+        await self.server.reply_delay()
+        if not self.buffer_ms:
+            await self.error(
+                event, "input_audio_buffer_commit_empty", "Input audio buffer is empty"
+            )
+            return
+        await self.commit()
+
+    async def on_input_audio_buffer_clear(self, event):
+        await self.server.reply_delay()
+        self.buffer_ms = 0.0
+        self.speech_item_id = None
+        await self.send({"type": "input_audio_buffer.cleared"})
+
+    async def commit(self):
+        """
+        Turns the buffered input audio into a user message item.
+        """
+        item_id = self.speech_item_id or self.server.new_id("item_")
+        self.buffer_ms = 0.0
+        self.speech_item_id = None
+        previous_item_id = self.last_item_id
+        await self.send(
+            {
+                "type": "input_audio_buffer.committed",
+                "previous_item_id": previous_item_id,
+                "item_id": item_id,
+            }
+        )
+        item = {
+            "id": item_id,
+            "object": "realtime.item",
+            "type": "message",
+            "status": "completed",
+            "role": "user",
+            "content": [{"type": "input_audio", "transcript": None}],
+        }
+        await self.add_item(item, previous_item_id)
+        if self.session.get("input_audio_transcription"):
+            await self.send(
+                {
+                    "type": "conversation.item.input_audio_transcription.completed",
+                    "item_id": item_id,
+                    "content_index": 0,
+                    "transcript": USER_TRANSCRIPT,
+                }
+            )
+
+    # -----------------------------
+    # Conversation items
+    # -----------------------------
+
+    async def add_item(self, item, previous_item_id=None):
+        self.items[item["id"]] = item
+        await self.send(
+            {
+                "type": "conversation.item.created",
+                "previous_item_id": previous_item_id,
+                "item": item,
+            }
+        )
+
+    async def on_conversation_item_create(self, event):
+        await self.server.reply_delay()
+        item = {"id": self.server.new_id("item_"), **event["item"]}
+        if item["id"] in self.items:
+            await self.error(
+                event, "item_already_exists", f"Item {item['id']!r} already exists"
+            )
+            return
+        item.setdefault("object", "realtime.item")
+        item.setdefault("status", "completed")
+        await self.add_item(item, self.last_item_id)
+
+    async def on_conversation_item_truncate(self, event):
+        await self.server.reply_delay()
+        item_id = event.get("item_id")
+        audio_end_ms = event.get("audio_end_ms", 0)
+        if item_id not in self.items:
+            await self.error(event, "item_not_found", f"Item {item_id!r} not found")
+        elif item_id not in self.item_audio_ms:
+            await self.error(
+                event, "invalid_value", "Only assistant audio can be truncated"
+            )
+        elif audio_end_ms > self.item_audio_ms[item_id]:
+            await self.error(
+                event,
+                "invalid_value",
+                f"audio_end_ms {audio_end_ms} is longer than the audio of "
+                f"{self.item_audio_ms[item_id]} ms",
+            )
+        else:
+            self.item_audio_ms[item_id] = audio_end_ms
+            await self.send(
+                {
+                    "type": "conversation.item.truncated",
+                    "item_id": item_id,
+                    "content_index": event.get("content_index", 0),
+                    "audio_end_ms": audio_end_ms,
+                }
+            )
+
+    async def on_conversation_item_delete(self, event):
+        await self.server.reply_delay()
+        item_id = event.get("item_id")
+        if item_id not in self.items:
+            await self.error(event, "item_not_found", f"Item {item_id!r} not found")
+            return
+        del self.items[item_id]
+        self.item_audio_ms.pop(item_id, None)
+        await self.send({"type": "conversation.item.deleted", "item_id": item_id})
+
+    # -----------------------------
+    # Responses
+    # -----------------------------
+
+    async def on_response_create(self, event):
+        if self.server.replay:
+            await self.server.reply_delay()
+            for frame in self.server.replay:
+                await self.ws.send(frame)
+            self.server.counters["events_sent"] += len(self.server.replay)
+        elif self.response_task:
+            await self.error(
+                event,
+                "conversation_already_has_active_response",
+                "Conversation already has an active response",
+            )
+        else:
+            self.start_response(event.get("response") or {})
+
+    async def on_response_cancel(self, event):
+        if not self.response_task:
+            await self.error(
+                event, "response_cancel_not_active", "No active response to cancel"
+            )
+            return
+        self.cancelled = True
+
+    def start_response(self, options):
+        self.cancelled = False
+        self.response_task = asyncio.create_task(self.respond(options))
+        self.response_task.add_done_callback(self._on_response_done)
+
+    def _on_response_done(self, task):
+        self.response_task = None
+
+    async def respond(self, options):
+        """
+        Runs the next scripted response, see the module docstring.
+        """
+        server = self.server
+        spec = server.script[self.responses % len(server.script)]
+        self.responses += 1
+        server.counters["responses"] += 1
+        drop = server.random.random() < server.drop_rate
+
+        await server.reply_delay()
+        response = {
+            "id": server.new_id("resp_"),
+            "object": "realtime.response",
+            "status": "in_progress",
+            "status_details": None,
+            "output": [],
+            "usage": None,
+        }
+        await self.send({"type": "response.created", "response": response})
+        if server.first_delta_ms:
+            await asyncio.sleep(server.first_delta_ms / 1000)
+
+        function_call = spec.get("function_call")
+        tools = self.session.get("tools") or []
+        if function_call is not None and (function_call.get("name") or tools):
+            item = await self.function_call(response, function_call, tools, drop)
+        else:
+            modalities = options.get("modalities") or self.session.get("modalities")
+            item = await self.message(response, spec, "audio" in modalities, drop)
+        if item is None:
+            return
+
+        status = "cancelled" if self.cancelled else "completed"
+        if self.cancelled:
+            server.counters["cancelled"] += 1
+        item["status"] = "incomplete" if self.cancelled else "completed"
+        ids = {"response_id": response["id"], "output_index": 0}
+        await self.send({"type": "response.output_item.done", **ids, "item": item})
+        response.update(
+            {
+                "status": status,
+                "output": [item],
+                "usage": {"total_tokens": 0, "input_tokens": 0, "output_tokens": 0},
+            }
+        )
+        await self.send({"type": "response.done", "response": response})
+        await self.send(
+            {
+                "type": "rate_limits.updated",
+                "rate_limits": [
+                    {"name": "requests", "limit": 1000, "remaining": 999},
+                    {"name": "tokens", "limit": 100000, "remaining": 99000},
+                ],
+            }
+        )
+
+    async def add_output_item(self, response, item):
+        ids = {"response_id": response["id"], "output_index": 0}
+        await self.send({"type": "response.output_item.added", **ids, "item": item})
+        await self.add_item(item, self.last_item_id)
+
+    async def pace(self, ms_per_delta):
+        if ms_per_delta:
+            await asyncio.sleep(ms_per_delta / 1000)
+
+    async def message(self, response, spec, audio, drop):
+        """
+        Streams an assistant message, or drops the connection halfway through
+        it and returns None.
+        """
+        server = self.server
+        words = (spec.get("transcript") or spec.get("text") or "").split(" ")
+        item = {
+            "id": server.new_id("item_"),
+            "object": "realtime.item",
+            "type": "message",
+            "status": "in_progress",
+            "role": "assistant",
+            "content": [],
+        }
+        await self.add_output_item(response, item)
+        ids = {
+            "response_id": response["id"],
+            "item_id": item["id"],
+            "output_index": 0,
+            "content_index": 0,
+        }
+        part = (
+            {"type": "audio", "transcript": ""}
+            if audio
+            else {"type": "text", "text": ""}
+        )
+        await self.send({"type": "response.content_part.added", **ids, "part": part})
+
+        if audio:
+            audio_ms = spec.get("audio_ms") or MS_PER_WORD * len(words)
+            chunks = max(math.ceil(audio_ms / server.chunk_ms), 1)
+            delta = server.audio_delta(
+                self.session.get("output_audio_format") or "pcm16"
+            )
+            ms_per_delta = server.chunk_ms / server.speed if server.speed else 0
+            self.item_audio_ms[item["id"]] = 0
+        else:
+            chunks = len(words)
+            ms_per_delta = 1000 / server.tokens_per_s if server.tokens_per_s else 0
+
+        sent_words = 0
+        for chunk in range(chunks):
+            if self.cancelled:
+                break
+            if drop and chunk == chunks // 2:
+                server.counters["drops"] += 1
+                self.ws.transport.abort()
+                return None
+            # Transcript deltas run ahead of the audio they belong to
+            next_words = math.ceil((chunk + 1) * len(words) / chunks)
+            text = " ".join(words[sent_words:next_words])
+            if sent_words and text:
+                text = " " + text
+            sent_words = next_words
+            if audio:
+                await self.send({"type": "response.audio.delta", **ids, "delta": delta})
+                self.item_audio_ms[item["id"]] += server.chunk_ms
+                if text:
+                    await self.send(
+                        {
+                            "type": "response.audio_transcript.delta",
+                            **ids,
+                            "delta": text,
+                        }
+                    )
+            else:
+                await self.send({"type": "response.text.delta", **ids, "delta": text})
+            await self.pace(ms_per_delta)
+
+        spoken = " ".join(words[:sent_words])
+        if audio:
+            part["transcript"] = spoken
+            await self.send({"type": "response.audio.done", **ids})
+            await self.send(
+                {"type": "response.audio_transcript.done", **ids, "transcript": spoken}
+            )
+        else:
+            part["text"] = spoken
+            await self.send({"type": "response.text.done", **ids, "text": spoken})
+        await self.send({"type": "response.content_part.done", **ids, "part": part})
+        item["content"] = [part]
+        return item
+
+    async def function_call(self, response, function_call, tools, drop):
+        """
+        Streams a function call, or drops the connection halfway through it
+        and returns None.
+        """
+        server = self.server
+        arguments = function_call.get("arguments", {})
+        if not isinstance(arguments, str):
+            arguments = json.dumps(arguments)
+        item = {
+            "id": server.new_id("item_"),
+            "object": "realtime.item",
+            "type": "function_call",
+            "status": "in_progress",
+            "name": function_call.get("name") or tools[0]["name"],
+            "call_id": server.new_id("call_"),
+            "arguments": "",
+        }
+        await self.add_output_item(response, item)
+        ids = {
+            "response_id": response["id"],
+            "item_id": item["id"],
+            "output_index": 0,
+            "call_id": item["call_id"],
+        }
+        ms_per_delta = 1000 / server.tokens_per_s if server.tokens_per_s else 0
+        chunks = range(0, len(arguments), ARGUMENTS_CHUNK)
+        for chunk, start in enumerate(chunks):
+            if self.cancelled:
+                break
+            if drop and chunk == len(chunks) // 2:
+                server.counters["drops"] += 1
+                self.ws.transport.abort()
+                return None
+            delta = arguments[start : start + ARGUMENTS_CHUNK]
+            item["arguments"] += delta
+            await self.send(
+                {
+                    "type": "response.function_call_arguments.delta",
+                    **ids,
+                    "delta": delta,
+                }
+            )
+            await self.pace(ms_per_delta)
+        await self.send(
+            {
+                "type": "response.function_call_arguments.done",
+                **ids,
+                "arguments": item["arguments"],
+            }
+        )
+        return item
+
+
+def load_replay(path):
+    with open(path) as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+def load_script(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+async def serve(args):
+    server = await MockRealtimeServer(
+        args.host,
+        args.port,
+        args.handshake_ms,
+        args.reply_ms,
+        replay=load_replay(args.replay) if args.replay else None,
+        script=load_script(args.script) if args.script else None,
+        chunk_ms=args.chunk_ms,
+        speed=args.speed,
+        tokens_per_s=args.tokens_per_s,
+        first_delta_ms=args.first_delta_ms,
+        turn_ms=args.turn_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        drop_rate=args.drop_rate,
+        seed=args.seed,
+    ).start()
+    print(f"Mock Realtime API listening on {server.url}")
+    while True:
+        await asyncio.sleep(args.drop_every_s or 3600)
+        if args.drop_every_s:
+            print(f"Dropped {server.drop_connections()} connections")
+        print(server.counters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--handshake-ms", type=float, default=0)
+    parser.add_argument("--reply-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--first-delta-ms", type=float, default=0)
+    parser.add_argument("--chunk-ms", type=int, default=100)
+    parser.add_argument(
+        "--speed", type=float, default=1, help="audio pace, 0 for unpaced"
+    )
+    parser.add_argument(
+        "--tokens-per-s", type=float, default=0, help="text pace, 0 for unpaced"
+    )
+    parser.add_argument("--script", help="JSON file with a list of responses")
+    parser.add_argument(
+        "--turn-ms", type=float, default=0, help="server_vad turn length"
+    )
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--drop-rate", type=float, default=0)
+    parser.add_argument(
+        "--drop-every-s", type=float, default=0, help="drop all connections"
+    )
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--replay", help="JSON lines file of server events")
+    asyncio.run(serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
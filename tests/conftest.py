@@ -0,0 +1,27 @@
+"""
+Shared setup for the tests.
+
+realtime2.py is imported from a workshop module picked like the benchmarks do
+(REALTIME_MODULE, see benchmarks/common.py), and clients talk to
+benchmarks/mock_realtime_server.py instead of Azure OpenAI:
+
+    REALTIME_MODULE=01-getting-started-function-calling python -m pytest tests
+"""
+
+import os
+import sys
+
+BENCHMARKS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"
+)
+if BENCHMARKS_DIR not in sys.path:
+    sys.path.insert(0, BENCHMARKS_DIR)
+
+from common import use_module  # noqa: E402
+
+use_module()
+
+# RealtimeAPI reads these when it is created; tests point the endpoint at a mock
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "ws://localhost:1")
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "mock")
+os.environ.setdefault("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-realtime-preview")
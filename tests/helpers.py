@@ -0,0 +1,38 @@
+"""Helpers shared by the tests that run clients against the mock server."""
+
+import asyncio
+import time
+
+from common import register_root_agent
+from mock_realtime_server import MockRealtimeServer
+from realtime2 import RealtimeClient
+
+
+def make_client(session_pool=None, **options):
+    client = RealtimeClient(system_prompt="", session_pool=session_pool, **options)
+    register_root_agent(client.assistant)
+    return client
+
+
+async def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def run_with_server(monkeypatch, scenario, **options):
+    """
+    Run scenario(server) in a new event loop, with AZURE_OPENAI_ENDPOINT
+    pointing at a MockRealtimeServer started with options.
+    """
+
+    async def main():
+        server = await MockRealtimeServer(**options).start()
+        monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", server.url)
+        try:
+            await scenario(server)
+        finally:
+            await server.close()
+
+    asyncio.run(main())
@@ -0,0 +1,35 @@
+"""
+ConversationItemStore against a plain list of the same items.
+"""
+
+import random
+
+from realtime2 import ConversationItemStore
+
+
+def test_positional_reads_match_a_list_after_removals():
+    rng = random.Random(0)
+    store = ConversationItemStore()
+    expected = []
+    for i in range(2000):
+        if expected and rng.random() < 0.45:
+            item = expected.pop(rng.randrange(len(expected)))
+            assert store.remove(item["id"]) is item
+        else:
+            item = {"id": f"item_{i}"}
+            store.add(item)
+            expected.append(item)
+
+        items = store.view()
+        assert len(items) == len(expected)
+        if expected:
+            index = rng.randrange(-len(expected), len(expected))
+            assert items[index] is expected[index]
+        assert items[-3:] == expected[-3:]
+        assert items[1::2] == expected[1::2]
+        assert store.page(-5) == expected[-5:]
+        assert store.page(2, 4) == expected[2:6]
+
+    assert list(store) == expected
+    limit = max(ConversationItemStore.MIN_COMPACT_SLOTS, len(expected))
+    assert len(store._holes) <= limit
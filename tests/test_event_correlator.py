@@ -0,0 +1,58 @@
+"""
+EventCorrelator matching, pruning and its reset on a new RealtimeAPI connection.
+"""
+
+import asyncio
+import time
+
+from helpers import run_with_server
+from realtime2 import EventCorrelator, RealtimeAPI
+
+
+def test_reset_drops_pending_events():
+    correlator = EventCorrelator()
+    correlator.sent({"event_id": "event_1", "type": "response.create"})
+    correlator.reset()
+
+    assert correlator.received({"type": "response.created"}) is None
+    assert correlator.stats() == {}
+
+
+def test_stale_events_are_pruned_from_every_lane():
+    correlator = EventCorrelator(max_age=0.01)
+    correlator.sent({"event_id": "event_1", "type": "response.create"})
+    correlator.sent({"event_id": "event_2", "type": "session.update"})
+    time.sleep(0.02)
+    correlator.sent({"event_id": "event_3", "type": "input_audio_buffer.commit"})
+
+    assert correlator._pending["response.created"] == {}
+    assert correlator._pending["session.updated"] == {}
+    assert correlator.received({"type": "input_audio_buffer.committed"}) == (
+        "input_audio_buffer.commit",
+        "event_3",
+    )
+
+
+def test_connect_forgets_events_sent_on_the_previous_socket(monkeypatch):
+    async def scenario(server):
+        api = RealtimeAPI()
+        await api.connect()
+        # Dropped before the server acknowledges it
+        await api.send("response.create")
+        await asyncio.sleep(0.02)
+        server.drop_connections()
+        await api.wait_for_next("close", 5)
+        await api.disconnect()
+        await asyncio.sleep(0.3)
+
+        await api.connect()
+        created = asyncio.create_task(api.wait_for_next("server.response.created", 5))
+        await asyncio.sleep(0)
+        await api.send("response.create")
+        await created
+        stats = api.correlator.stats()["response.create"]
+        assert stats["count"] == 1
+        assert stats["max_ms"] < 300
+        await api.disconnect()
+
+    run_with_server(monkeypatch, scenario, reply_ms=100)
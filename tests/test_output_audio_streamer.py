@@ -0,0 +1,37 @@
+"""
+OutputAudioStreamer pacing: tiny deltas are merged into min_chunk_ms chunks.
+"""
+
+import asyncio
+
+from realtime2 import OutputAudioStreamer
+
+SAMPLE_RATE = 24000
+BYTES_PER_MS = SAMPLE_RATE * 2 // 1000
+
+
+def test_tiny_deltas_are_coalesced_to_min_chunk():
+    async def main():
+        sent = []
+
+        async def send(chunk):
+            sent.append(len(chunk))
+
+        streamer = OutputAudioStreamer(send, SAMPLE_RATE, min_chunk_ms=40)
+        # The first 100 ms start playback, then 5 ms deltas trickle in
+        streamer.push(bytes(100 * BYTES_PER_MS))
+        total = 100 * BYTES_PER_MS
+        for _ in range(60):
+            await asyncio.sleep(0.002)
+            streamer.push(bytes(5 * BYTES_PER_MS))
+            total += 5 * BYTES_PER_MS
+        while sum(sent) < total:
+            await asyncio.sleep(0.01)
+        streamer.close()
+        return sent
+
+    sent = asyncio.run(main())
+    assert sent[0] == 100 * BYTES_PER_MS
+    # Only the tail left once the deltas stop may be shorter
+    assert all(size >= 40 * BYTES_PER_MS for size in sent[1:-1])
+    assert len(sent) < 15
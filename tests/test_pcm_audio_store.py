@@ -0,0 +1,61 @@
+"""
+PCMAudioStore on conversation items, for assistant and user audio alike.
+"""
+
+import base64
+
+from realtime2 import PCMAudioStore, RealtimeConversation
+
+
+def create_item(conversation, item_id, role):
+    item, _ = conversation.process_event(
+        {
+            "type": "conversation.item.created",
+            "item": {"id": item_id, "type": "message", "role": role},
+        }
+    )
+    return item
+
+
+def truncate(conversation, item_id, audio_end_ms):
+    conversation.process_event(
+        {
+            "type": "conversation.item.truncated",
+            "item_id": item_id,
+            "audio_end_ms": audio_end_ms,
+        }
+    )
+
+
+def test_user_and_assistant_audio_share_one_type():
+    conversation = RealtimeConversation()
+    conversation.queue_input_audio(b"\x01\x00" * 24000)
+    user = create_item(conversation, "item_user", "user")
+    assistant = create_item(conversation, "item_assistant", "assistant")
+    for _ in range(10):
+        conversation.process_event(
+            {
+                "type": "response.audio.delta",
+                "item_id": "item_assistant",
+                "content_index": 0,
+                "delta": base64.b64encode(b"\x02\x00" * 2400).decode("ascii"),
+            }
+        )
+
+    for item, sample in ((user, b"\x01\x00"), (assistant, b"\x02\x00")):
+        audio = item["formatted"]["audio"]
+        assert isinstance(audio, PCMAudioStore)
+        assert len(audio) == 48000
+        assert bytes(audio) == sample * 24000
+        truncate(conversation, item["id"], 500)
+        assert bytes(audio) == sample * 12000
+
+
+def test_reads_are_joined_once():
+    store = PCMAudioStore([memoryview(b"\x01\x00" * 10)])
+    first = store.tobytes()
+    assert isinstance(first, bytes)
+    assert store.tobytes() is first
+    store.append(b"\x02\x00")
+    assert bytes(store) == b"\x01\x00" * 10 + b"\x02\x00"
+    assert store.tobytes() is store.tobytes()
@@ -0,0 +1,148 @@
+"""
+RealtimeClient's automatic reconnect against mock_realtime_server.py.
+"""
+
+import asyncio
+
+from common import pcm16_chunk
+from helpers import make_client, run_with_server, wait_until
+from mock_realtime_server import USER_TRANSCRIPT
+
+
+async def voice_turn(client, seed=0):
+    # One second of user audio, committed by create_response()
+    for i in range(10):
+        await client.append_input_audio(pcm16_chunk(2400, seed=seed * 10 + i))
+    done = asyncio.create_task(client.realtime.wait_for_next("server.response.done", 5))
+    await asyncio.sleep(0)
+    await client.create_response()
+    await done
+
+
+async def drop_and_reconnect(client, server):
+    reconnected = asyncio.create_task(client.wait_for_next("reconnected", 5))
+    await asyncio.sleep(0)
+    server.drop_connections()
+    event = await reconnected
+    await client.wait_for_session_configured(timeout=5)
+    return event
+
+
+def test_reconnect_replays_transcribed_voice_turn(monkeypatch):
+    async def scenario(server):
+        client = make_client()
+        await client.update_session(turn_detection=None)
+        await client.connect()
+        await client.wait_for_session_configured(timeout=5)
+        await voice_turn(client)
+        user_item, assistant_item = client.conversation.items
+        assert user_item["formatted"]["transcript"] == USER_TRANSCRIPT
+
+        event = await drop_and_reconnect(client, server)
+        assert event["items"] == 2
+        assert client.conversation.get_compacted_items() == [
+            {
+                "id": user_item["id"],
+                "type": "message",
+                "role": "user",
+                "content": [{"type": "input_text", "text": USER_TRANSCRIPT}],
+            },
+            {
+                "id": assistant_item["id"],
+                "type": "message",
+                "role": "assistant",
+                "content": [
+                    {"type": "text", "text": assistant_item["formatted"]["transcript"]}
+                ],
+            },
+        ]
+
+        await client.disconnect()
+
+    run_with_server(monkeypatch, scenario)
+
+
+def test_reconnect_restarts_input_audio_timeline(monkeypatch):
+    async def server_vad_turn(client, sample):
+        done = asyncio.create_task(
+            client.realtime.wait_for_next("server.response.done", 5)
+        )
+        await asyncio.sleep(0)
+        for _ in range(10):
+            await client.append_input_audio(sample * 2400)
+        await done
+        return client.conversation.items[-2]
+
+    async def scenario(server):
+        client = make_client()
+        await client.connect()
+        await client.wait_for_session_configured(timeout=5)
+        first = await server_vad_turn(client, b"\x01\x00")
+        assert bytes(first["formatted"]["audio"]) == b"\x01\x00" * 24000
+
+        await drop_and_reconnect(client, server)
+        # The new session's speech offsets start from 0 again
+        second = await server_vad_turn(client, b"\x02\x00")
+        assert second["role"] == "user"
+        assert bytes(second["formatted"]["audio"]) == b"\x02\x00" * 24000
+
+        await client.disconnect()
+
+    run_with_server(monkeypatch, scenario, turn_ms=1000)
+
+
+def test_disconnect_during_backoff_stops_reconnecting(monkeypatch):
+    async def scenario(server):
+        client = make_client(
+            reconnect_config={"initial_delay": 0.02, "max_delay": 0.02}
+        )
+        await client.connect()
+        await client.wait_for_session_configured(timeout=5)
+
+        server.reject_next(1000)
+        server.drop_connections()
+        await wait_until(lambda: server.connections >= 3)
+        assert not client.is_connected()
+
+        # A chat ending mid-reconnect, as chat.py's on_end does
+        server.reject_next(0)
+        await client.disconnect()
+        connections = server.connections
+        await asyncio.sleep(0.2)
+        assert server.connections == connections
+        assert not client.is_connected()
+        assert client.session_state == "disconnected"
+
+    run_with_server(monkeypatch, scenario)
+
+
+def test_input_audio_while_reconnecting_is_dropped_and_counted(monkeypatch, caplog):
+    async def scenario(server):
+        client = make_client(
+            reconnect_config={"initial_delay": 0.05, "max_delay": 0.05}
+        )
+        await client.update_session(turn_detection=None)
+        await client.connect()
+        await client.wait_for_session_configured(timeout=5)
+
+        server.reject_next(1000)
+        server.drop_connections()
+        await wait_until(lambda: not client.is_connected())
+        for i in range(10):
+            await client.append_input_audio(pcm16_chunk(2400, seed=i))
+        await client.flush_input_audio()
+        assert client.get_input_audio_stats()["bytes_dropped"] == 48000
+        warnings = [r for r in caplog.records if "dropping input audio" in r.message]
+        assert len(warnings) == 1
+
+        server.reject_next(0)
+        await client.wait_for_next("reconnected", 5)
+        await client.wait_for_session_configured(timeout=5)
+        await client.append_input_audio(pcm16_chunk(2400))
+        await client.flush_input_audio()
+        stats = client.get_input_audio_stats()
+        assert stats["bytes_sent"] == 4800
+        assert stats["bytes_dropped"] == 48000
+        await client.disconnect()
+
+    run_with_server(monkeypatch, scenario)
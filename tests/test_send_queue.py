@@ -0,0 +1,56 @@
+"""
+RealtimeAPI's outbound send queue and receive loop around disconnects.
+"""
+
+import asyncio
+
+import pytest
+
+from helpers import run_with_server
+from realtime2 import RealtimeAPI
+
+
+def test_send_after_disconnect_fails_at_the_call_site(monkeypatch):
+    async def scenario(server):
+        api = RealtimeAPI()
+        await api.connect()
+        await api.disconnect()
+
+        with pytest.raises(Exception, match="not connected"):
+            await api.send("input_audio_buffer.append", {"audio": "AAAA"})
+        assert api._writer_task is None
+
+    run_with_server(monkeypatch, scenario)
+
+
+def test_disconnect_fails_sends_waiting_for_queue_space(monkeypatch):
+    async def scenario(server):
+        api = RealtimeAPI()
+        await api.connect()
+        # As if the writer had fallen behind on input audio
+        api._send_queue_bytes = api.max_send_queue_bytes
+        waiting = asyncio.create_task(
+            api.send("input_audio_buffer.append", {"audio": "AAAA"})
+        )
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+
+        await api.disconnect()
+        with pytest.raises(Exception, match="not connected"):
+            await waiting
+        assert api._writer_task is None
+        assert api.get_send_stats()["queued_bytes"] == 0
+
+    run_with_server(monkeypatch, scenario)
+
+
+def test_disconnect_before_the_receive_loop_starts(monkeypatch):
+    async def scenario(server):
+        api = RealtimeAPI()
+        await api.connect()
+        receiver = api._receiver_task
+        await api.disconnect()
+        await asyncio.wait_for(receiver, 5)
+        assert receiver.exception() is None
+
+    run_with_server(monkeypatch, scenario)
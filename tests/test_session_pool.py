@@ -0,0 +1,163 @@
+"""
+RealtimeSessionPool against mock_realtime_server.py: leases, refills, idle
+eviction, health pings, and handlers running in the leasing chat's context.
+"""
+
+import asyncio
+import contextvars
+
+from helpers import make_client, run_with_server, wait_until
+from realtime2 import RealtimeAPI, RealtimeSessionPool
+
+# Stands in for Chainlit's per-chat context (cl.context, cl.user_session)
+CHAT = contextvars.ContextVar("chat", default=None)
+
+
+def fast_close_api():
+    # Closing a session whose server stopped reading would wait 10 s by default
+    return RealtimeAPI(transport_profile={"close_timeout": 0.1})
+
+
+def test_lease_configured_session_and_refill(monkeypatch):
+    async def scenario(server):
+        pool = RealtimeSessionPool(size=2)
+        client = make_client(pool)
+        pool.start(client.get_root_session())
+        await wait_until(lambda: pool.stats()["idle"] == 2)
+
+        await client.connect()
+        await client.wait_for_session_configured(timeout=5)
+        assert pool.counters["leased"] == 1
+        # The session.update sent while pooled reached the client
+        assert client._active_session == client.get_root_session()
+
+        await wait_until(lambda: pool.stats()["idle"] == 2)
+        assert server.connections == 3
+
+        await client.disconnect()
+        await pool.close()
+
+    run_with_server(monkeypatch, scenario)
+
+
+def test_connect_without_idle_session(monkeypatch):
+    async def scenario(server):
+        pool = RealtimeSessionPool(size=1, retry_delay=0.05)
+        client = make_client(pool)
+        await client.connect()
+        await client.wait_for_session_configured(timeout=5)
+        assert pool.counters["missed"] == 1
+
+        await client.disconnect()
+        await pool.close()
+
+    run_with_server(monkeypatch, scenario)
+
+
+def test_idle_sessions_expire_and_are_replaced(monkeypatch):
+    async def scenario(server):
+        pool = RealtimeSessionPool(size=1, max_idle=0.1, check_interval=0.02)
+        pool.start()
+        await wait_until(lambda: pool.counters["expired"] >= 2)
+        await wait_until(lambda: pool.stats()["idle"] == 1)
+        assert server.connections >= 3
+
+        await pool.close()
+        assert pool.stats()["idle"] == 0
+
+    run_with_server(monkeypatch, scenario)
+
+
+def test_lease_skips_closed_sessions(monkeypatch):
+    async def scenario(server):
+        pool = RealtimeSessionPool(size=1, retry_delay=0.05)
+        pool.start()
+        await wait_until(lambda: pool.stats()["idle"] == 1)
+        server.drop_connections()
+        await wait_until(lambda: not pool._idle[0][0].is_open())
+
+        assert await pool.lease() is None
+        assert pool.counters["unhealthy"] == 1
+
+        await pool.close()
+
+    run_with_server(monkeypatch, scenario)
+
+
+def test_lease_pings_idle_sessions(monkeypatch):
+    async def scenario(server):
+        pool = RealtimeSessionPool(
+            size=1, ping_after=0, ping_timeout=0.2, api_factory=fast_close_api
+        )
+        pool.start()
+        await wait_until(lambda: pool.stats()["idle"] == 1)
+        leased = await pool.lease()
+        assert leased is not None
+        await leased[0].disconnect()
+
+        # A server that stops reading never answers the ping
+        await wait_until(lambda: pool.stats()["idle"] == 1)
+        paused = list(server._open)
+        for ws in paused:
+            ws.transport.pause_reading()
+        assert await pool.lease() is None
+        assert pool.counters["unhealthy"] == 1
+        for ws in paused:
+            ws.transport.resume_reading()
+
+        await pool.close()
+
+    run_with_server(monkeypatch, scenario)
+
+
+def test_handlers_run_in_leasing_chat_context(monkeypatch):
+    async def chat(name, pool, ready):
+        CHAT.set(name)
+        client = make_client(pool)
+        if ready is None:
+            # The first chat starts the pool, as chat.py does
+            pool.start(client.get_root_session())
+            await wait_until(lambda: pool.stats()["idle"] == 2)
+        else:
+            await ready.wait()
+        seen = []
+
+        def on_event(event):
+            seen.append(("sync", CHAT.get()))
+
+        async def on_event_async(event):
+            seen.append(("async", CHAT.get()))
+
+        client.on("conversation.updated", on_event)
+        client.on("conversation.updated", on_event_async)
+        await client.connect()
+        await client.wait_for_session_configured(timeout=5)
+        done = asyncio.create_task(
+            client.realtime.wait_for_next("server.response.done", 5)
+        )
+        await asyncio.sleep(0)
+        await client.send_user_message_content([{"type": "input_text", "text": "Hi"}])
+        await done
+        await asyncio.sleep(0.05)
+        await client.disconnect()
+        client.realtime.clear_event_handlers()
+        client.clear_event_handlers()
+        return seen
+
+    async def scenario(server):
+        pool = RealtimeSessionPool(size=2)
+        ready = asyncio.Event()
+        first = asyncio.create_task(chat("A", pool, None))
+        await wait_until(lambda: pool.stats()["idle"] == 2)
+        ready.set()
+        second = asyncio.create_task(chat("B", pool, ready))
+        seen_a, seen_b = await asyncio.gather(first, second)
+        assert pool.counters["leased"] == 2
+
+        assert {kind for kind, _ in seen_b} == {"sync", "async"}
+        assert {name for _, name in seen_a} == {"A"}
+        assert {name for _, name in seen_b} == {"B"}
+
+        await pool.close()
+
+    run_with_server(monkeypatch, scenario)
@@ -0,0 +1,26 @@
+"""
+SessionRecorder on a RealtimeClient connected to mock_realtime_server.py.
+"""
+
+from helpers import make_client, run_with_server
+from realtime2 import SessionRecorder, SessionReplayer
+
+
+def test_recorder_closes_on_disconnect_and_reopens(monkeypatch, tmp_path):
+    async def scenario(server):
+        path = str(tmp_path / "session.jsonl")
+        recorder = SessionRecorder(path)
+        client = make_client(recorder=recorder)
+        for _ in range(2):
+            await client.connect()
+            await client.wait_for_session_configured(timeout=5)
+            await client.disconnect()
+            assert recorder._file is None
+
+        with open(path, encoding="utf-8") as f:
+            headers = [line for line in f if line.startswith("{")]
+        assert len(headers) == 2
+        types = [event["type"] for _, _, event in SessionReplayer(path).events()]
+        assert types.count("session.created") == 2
+
+    run_with_server(monkeypatch, scenario)